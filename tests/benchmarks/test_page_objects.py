@@ -0,0 +1,74 @@
+import pytest
+import allure
+from ..demoblaze_tests.pages.main_page import MainPage
+from ..demoblaze_tests.utils.config import Config
+from ..demoblaze_tests.utils.attachments import attach
+from ..demoblaze_tests.utils.benchmarks import benchmarks
+
+
+def run_benchmark(name, driver, action, setup=None):
+    """Замерить операцию и приложить сводку к отчету"""
+    result = benchmarks.run(name, driver, action, setup)
+    attach(
+        f"Повторов: {result['count']}\n"
+        f"Среднее: {result['mean'] * 1000:.1f} мс\n"
+        f"p95: {result['p95'] * 1000:.1f} мс\n"
+        f"Команд WebDriver: {result['commands']:.1f}",
+        name=f"Бенчмарк {name}",
+        attachment_type=allure.attachment_type.TEXT
+    )
+
+
+@allure.feature('Производительность')
+@allure.story('Операции Page Objects')
+@pytest.mark.benchmark
+@pytest.mark.browserless
+class TestPageObjectBenchmarks:
+    """
+    Бенчмарки операций MainPage на локальной копии сайта
+    Запускаются только с --bench --site=stub, с --browserless - без браузера
+    """
+
+    @allure.title("Бенчмарк: открыть главную страницу")
+    def test_open(self, driver):
+        page = MainPage(driver)
+        run_benchmark("open", driver, page.open)
+
+    @allure.title("Бенчмарк: логин через модальное окно")
+    def test_login(self, driver, account):
+        page = MainPage(driver)
+
+        def logged_out_page():
+            driver.delete_all_cookies()
+            page.open()
+
+        run_benchmark("login", driver, lambda: page.login(account.username, account.password), logged_out_page)
+
+    @allure.title("Бенчмарк: регистрация через модальное окно")
+    def test_signup(self, driver):
+        page = MainPage(driver)
+
+        def signup():
+            page.signup(Config.generate_random_username("bench"), Config.generate_random_password())
+            page.get_alert_text_and_accept()
+
+        run_benchmark("signup", driver, signup, page.open)
+
+    @allure.title("Бенчмарк: выбор категории {category}")
+    @pytest.mark.parametrize("category", ["phones", "laptops", "monitors"])
+    def test_click_category(self, driver, category):
+        page = MainPage(driver)
+        action = getattr(page, f"click_{category}_category")
+        run_benchmark(f"click_{category}_category", driver, action, page.open)
+
+    @allure.title("Бенчмарк: названия товаров")
+    def test_get_product_titles(self, driver):
+        page = MainPage(driver)
+        page.open()
+        run_benchmark("get_product_titles", driver, page.get_product_titles)
+
+    @allure.title("Бенчмарк: скриншот страницы")
+    def test_take_screenshot(self, driver):
+        page = MainPage(driver)
+        page.open()
+        run_benchmark("take_screenshot", driver, lambda: page.take_screenshot("benchmark"))
@@ -1,37 +1,800 @@
 """
 Настройки для всех тестов
-Здесь создается браузер Firefox для каждого теста
+Здесь создается пул браузеров Firefox, каждый тест берет браузер из пула
+Профиль запуска (headless, размер окна, картинки) задается параметрами командной строки
 """
 import pytest
-from selenium import webdriver
-from selenium.webdriver.firefox.service import Service
-from selenium.webdriver.firefox.options import Options
+import allure
 import os
+import time
+from selenium.common.exceptions import WebDriverException
+from .demoblaze_tests.utils.config import Config
+from .demoblaze_tests.utils.driver_pool import DriverPool
+from .demoblaze_tests.utils.browser_profile import BrowserProfile, FirefoxLauncher
+from .demoblaze_tests.pages.main_page import MainPage
+from .demoblaze_tests.utils.wait_stats import wait_stats
+from .demoblaze_tests.utils.wait_engine import WaitEngine, wait_engine_stats
+from .demoblaze_tests.utils.step_timings import step_timings
+from .demoblaze_tests.utils.driver_hooks import add_command_listener
+from .demoblaze_tests.utils.element_cache import element_cache_stats
+from .demoblaze_tests.utils.attachments import attach, attachment_pipeline
+from .demoblaze_tests.utils.stream_report import stream_report
+from .demoblaze_tests.utils.command_trace import command_tracer
+from .demoblaze_tests.utils.dom_driver import DomDriver
+from .demoblaze_tests.utils.parallel import is_worker
+from .demoblaze_tests.utils.run_history import run_history
+from .demoblaze_tests.utils.account_pool import AccountPool
+from .demoblaze_tests.utils.catalog_snapshots import CatalogSnapshots
+from .demoblaze_tests.utils.benchmarks import benchmarks
+from .demoblaze_tests.utils.retry_policy import retry_policy
+from .demoblaze_tests.utils.request_filter import FilterRules, RequestFilter, request_filter_stats
+from .demoblaze_tests.stub.server import StubServer
+
+# Корень проекта: там лежат локальный geckodriver и кеш профилей Firefox
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GECKODRIVER_PATH = os.path.join(PROJECT_ROOT, "drivers", "geckodriver")
+
+# Состояние между запусками на этой машине (история, пул аккаунтов, снимки, базовые значения
+# бенчмарков, профили Firefox). Папка не в git, в reports/ остаются только отчеты запуска
+CACHE_DIR = os.path.join(PROJECT_ROOT, ".cache")
+
+
+def pytest_addoption(parser):
+    """Дополнительные параметры запуска"""
+    parser.addoption(
+        "--driver-pool-size",
+        type=int,
+        default=1,
+        help="Сколько браузеров держать в пуле для повторного использования"
+    )
+    parser.addoption(
+        "--headless",
+        action="store_true",
+        default=False,
+        help="Запускать Firefox без графического интерфейса"
+    )
+    parser.addoption(
+        "--window-size",
+        default="1366x768",
+        help="Фиксированный размер окна браузера, например 1366x768"
+    )
+    parser.addoption(
+        "--no-images",
+        action="store_true",
+        default=False,
+        help="Отключить картинки и шрифты сайта (кроме тестов с маркером needs_images)"
+    )
+    parser.addoption(
+        "--baked-profile",
+        action="store_true",
+        default=False,
+        help="Запускать Firefox на заранее подготовленной папке профиля из .cache/"
+    )
+    parser.addoption(
+        "--site",
+        choices=["live", "stub"],
+        default="live",
+        help="live - настоящий demoblaze.com, stub - локальная копия сайта без сети"
+    )
+    parser.addoption(
+        "--browserless",
+        action="store_true",
+        default=False,
+        help="Тесты с маркером browserless выполнять без браузера (только вместе с --site=stub)"
+    )
+    parser.addoption(
+        "--wait-report",
+        action="store_true",
+        default=False,
+        help="Вывести время ожиданий по методам Page Objects"
+    )
+    parser.addoption(
+        "--wait-engine",
+        choices=["events", "polling"],
+        default="events",
+        help="Как ждать условий: events - по изменениям DOM (MutationObserver), polling - опросом"
+    )
+    parser.addoption(
+        "--element-cache",
+        action="store_true",
+        default=False,
+        help="Кешировать найденные элементы до навигации или перерисовки страницы"
+    )
+    parser.addoption(
+        "--screenshots",
+        choices=["always", "on-failure", "never"],
+        default="always",
+        help="Когда снимать скриншоты: всегда, только при падении теста или никогда"
+    )
+    parser.addoption(
+        "--screenshot-format",
+        choices=["png", "jpeg"],
+        default="png",
+        help="Формат скриншотов в отчете (jpeg требует Pillow)"
+    )
+    parser.addoption(
+        "--screenshot-scale",
+        type=float,
+        default=1.0,
+        help="Масштаб скриншотов в отчете, например 0.5 (требует Pillow)"
+    )
+    parser.addoption(
+        "--step-timings",
+        action="store_true",
+        default=False,
+        help="Замерять шаги Page Objects и сохранить p50/p95/max в reports/step_timings.json"
+    )
+    parser.addoption(
+        "--keep-order",
+        action="store_true",
+        default=False,
+        help="Не менять порядок тестов по истории запусков (.cache/test_history.json)"
+    )
+    parser.addoption(
+        "--block-requests",
+        default="",
+        help="Пропускать браузер через фильтр запросов: категории images, fonts, analytics "
+             "и/или шаблоны URL через запятую, например images,fonts,analytics"
+    )
+    parser.addoption(
+        "--step-retries",
+        type=int,
+        default=0,
+        help="Сколько раз повторить ожидание шага Page Object после таймаута (0 - без повторов)"
+    )
+    parser.addoption(
+        "--retry-budget",
+        type=float,
+        default=30.0,
+        help="Сколько секунд один тест может потратить на повторы шагов"
+    )
+    parser.addoption(
+        "--run-deadline",
+        type=float,
+        default=None,
+        help="Через сколько секунд после старта запуска шаги больше не повторяются"
+    )
+    parser.addoption(
+        "--bench",
+        action="store_true",
+        default=False,
+        help="Запустить бенчмарки Page Objects (tests/benchmarks, только с --site=stub)"
+    )
+    parser.addoption(
+        "--bench-rounds",
+        type=int,
+        default=10,
+        help="Сколько раз повторять каждую операцию в бенчмарке"
+    )
+    parser.addoption(
+        "--bench-threshold",
+        type=float,
+        default=0.2,
+        help="Допустимое замедление относительно .cache/benchmarks.json, 0.2 - на 20%%"
+    )
+    parser.addoption(
+        "--bench-save",
+        action="store_true",
+        default=False,
+        help="Сохранить результаты бенчмарков как новые базовые значения"
+    )
+    parser.addoption(
+        "--account-pool-size",
+        type=int,
+        default=4,
+        help="Сколько тестовых аккаунтов создать заранее (.cache/account_pool.json)"
+    )
+    parser.addoption(
+        "--stream-report",
+        action="store_true",
+        default=False,
+        help="Писать результаты тестов сразу после каждого теста в reports/stream/results.jsonl"
+    )
+    parser.addoption(
+        "--trace-commands",
+        action="store_true",
+        default=False,
+        help="Записывать команды WebDriver каждого теста в reports/traces/<тест>.jsonl"
+    )
+    parser.addoption(
+        "--makespan",
+        action="store_true",
+        default=False,
+        help="Вывести ожидаемое по истории и фактическое время запуска"
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    """Включить сбор статистики ожиданий, если он запрошен"""
+    wait_stats.enabled = config.getoption("--wait-report")
+    wait_engine_stats.enabled = config.getoption("--wait-report")
+    WaitEngine.use_events = config.getoption("--wait-engine") == "events"
+    step_timings.enabled = config.getoption("--step-timings")
+    element_cache_stats.enabled = config.getoption("--element-cache")
+    request_filter_stats.enabled = bool(config.getoption("--block-requests"))
+    retry_policy.configure(
+        config.getoption("--step-retries"),
+        test_budget=config.getoption("--retry-budget"),
+        run_deadline=config.getoption("--run-deadline")
+    )
+    if config.getoption("--bench"):
+        if config.getoption("--site") != "stub":
+            raise pytest.UsageError("Бенчмарки запускаются только на локальной копии сайта: добавьте --site=stub")
+        benchmarks.configure(
+            os.path.join(CACHE_DIR, "benchmarks.json"),
+            rounds=config.getoption("--bench-rounds"),
+            threshold=config.getoption("--bench-threshold"),
+            save_baseline=config.getoption("--bench-save")
+        )
+    if config.getoption("--stream-report"):
+        # Строки отчета пишет главный процесс, воркеры xdist только записывают вложения
+        stream_report.configure(os.path.join(reports_dir(config), "stream"), writer=not is_worker(config))
+        # Потоковый отчет заменяет HTML pytest-html: тот держит все результаты в памяти
+        # и пишется целиком в конце сессии (hookimpl tryfirst - до pytest_configure плагина)
+        config.option.htmlpath = None
+    if config.getoption("--trace-commands"):
+        # Трассы прошлого запуска удаляет главный процесс, до запуска воркеров
+        command_tracer.configure(os.path.join(reports_dir(config), "traces"), clean=not is_worker(config))
+    # Статистика пулов и запусков браузеров всех воркеров (при запуске через xdist)
+    config._driver_pool_stats = []
+    config._launcher_stats = {"startup_times": [], "memory_mb": []}
+    # История длительностей и падений тестов из прошлых запусков
+    run_history.load(os.path.join(CACHE_DIR, "test_history.json"))
+
+
+@pytest.fixture(scope="session")
+def request_filter_proxy(request):
+    """
+    Локальный прокси-фильтр запросов браузера (только с --block-requests)
+    Правила запуска можно дополнить для отдельного теста маркером request_filter
+    """
+    if not request_filter_stats.enabled:
+        yield None
+        return
+
+    block = [rule.strip() for rule in request.config.getoption("--block-requests").split(",") if rule.strip()]
+    proxy = RequestFilter(FilterRules(block=block)).start()
+    yield proxy
+    proxy.stop()
+
+
+@pytest.fixture(scope="session")
+def browser_profile(request, request_filter_proxy):
+    """Профиль запуска Firefox из параметров командной строки"""
+    profile = BrowserProfile.from_config(request.config)
+    if request_filter_proxy is not None:
+        profile = profile.with_proxy(request_filter_proxy.address)
+    return profile
+
+
+@pytest.fixture(scope="session")
+def firefox_launcher(request):
+    """Запуск браузеров с локальным geckodriver"""
+    launcher = FirefoxLauncher(
+        geckodriver_path=GECKODRIVER_PATH,
+        cache_dir=CACHE_DIR
+    )
+
+    yield launcher
+
+    launcher.cleanup()
+    for key, values in launcher.stats().items():
+        request.config._launcher_stats[key].extend(values)
+
+
+@pytest.fixture(scope="session")
+def base_url(request):
+    """
+    Адрес сайта для тестов
+    С --site=stub один раз за сессию запускается локальная копия сайта на свободном порту
+    """
+    if request.config.getoption("--site") == "live":
+        yield Config.BASE_URL
+        return
+
+    server = StubServer().start()
+    Config.SITE = "stub"
+    Config.BASE_URL = server.url
+    Config.API_URL = server.api_url
+
+    yield server.url
+
+    server.stop()
+    Config.SITE = "live"
+    Config.BASE_URL = Config.LIVE_URL
+    Config.API_URL = Config.LIVE_API_URL
+
+
+@pytest.fixture(scope="session")
+def driver_pools(request, base_url, firefox_launcher):
+    """
+    Пулы браузеров на всю сессию, по одному на профиль запуска
+    Браузер запускается один раз и переиспользуется между тестами
+    """
+    pools = {}
+
+    def get_pool(profile):
+        if profile.name not in pools:
+            pools[profile.name] = DriverPool(
+                lambda: firefox_launcher.launch(profile),
+                base_url,
+                size=request.config.getoption("--driver-pool-size")
+            )
+        return pools[profile.name]
+
+    yield get_pool
+
+    # Память замеряем до закрытия браузеров
+    firefox_launcher.measure_memory()
+    for pool in pools.values():
+        pool.close()
+        request.config._driver_pool_stats.append(pool.stats())
+
+
+@pytest.fixture(scope="session")
+def driver_pool(driver_pools, browser_profile):
+    """Пул браузеров с профилем по умолчанию"""
+    return driver_pools(browser_profile)
 
 
 @pytest.fixture(scope="function")
-def driver():
+def driver(request, driver_pools, browser_profile, request_filter_proxy):
     """
-    Создает браузер Firefox для теста
-    После теста автоматически закрывает браузер
+    Выдает тесту браузер из пула
+    Перед тестом состояние браузера сбрасывается, после теста браузер возвращается в пул
+    Тесты с маркером browserless при --browserless --site=stub получают драйвер без браузера
     """
-    # Настройки Firefox
-    options = Options()
+    if (request.node.get_closest_marker("browserless")
+            and request.config.getoption("--browserless") and Config.SITE == "stub"):
+        dom_driver = DomDriver()
+        dom_driver.get(Config.BASE_URL)
+        yield dom_driver
+        dom_driver.quit()
+        return
 
-    # Путь к локальному geckodriver
-    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    geckodriver_path = os.path.join(project_root, "drivers", "geckodriver")
+    if request.node.get_closest_marker("read_only"):
+        # Браузер общий на весь класс, перед тестом - только переход на главную страницу
+        lease = request.getfixturevalue("class_driver")
+        use_filter_rules(request.node, request_filter_proxy)
+        lease["driver"] = lease["pool"].reuse(lease["driver"]) if lease["used"] else lease["driver"]
+        lease["used"] = True
+        listen_commands(lease["driver"])
+        with command_tracer.recording(lease["driver"], request.node.nodeid):
+            yield lease["driver"]
+        return
 
-    # Создаем браузер с локальным geckodriver
-    service = Service(geckodriver_path)
-    driver = webdriver.Firefox(service=service, options=options)
+    driver_pool = driver_pools(profile_for(request.node, browser_profile))
 
-    # Ждем элементы максимум 10 секунд
-    driver.implicitly_wait(10)
-    driver.maximize_window()
+    use_filter_rules(request.node, request_filter_proxy)
+    driver = driver_pool.acquire()
+    listen_commands(driver)
 
     # Передаем браузер в тест
-    yield driver
+    with command_tracer.recording(driver, request.node.nodeid):
+        yield driver
+
+    # Возвращаем браузер в пул (сломанный браузер будет закрыт)
+    driver_pool.release(driver, broken=not driver_pool.is_alive(driver))
+
+
+@pytest.fixture(scope="class")
+def class_driver(request, driver_pools, browser_profile, request_filter_proxy):
+    """
+    Один браузер на все тесты класса с маркером read_only
+    Тесты такого класса не меняют состояние сайта, поэтому между ними не нужен полный сброс
+    Если тест оставил открытый alert или модальное окно, следующий тест получит другой браузер
+    """
+    driver_pool = driver_pools(profile_for(request.node, browser_profile))
+    # Браузер из пула сбрасывается переходом на главную страницу - уже с правилами класса
+    use_filter_rules(request.node, request_filter_proxy)
+    lease = {"pool": driver_pool, "driver": driver_pool.acquire(), "used": False}
+
+    yield lease
+
+    driver = lease["driver"]
+    driver_pool.release(driver, broken=not driver_pool.is_alive(driver) or not driver_pool.is_clean(driver))
+
+
+@pytest.fixture(scope="class")
+def form_page(request):
+    """
+    Главная страница с формой, общая для всех тестов класса (сценарии учетных данных)
+    Тесты класса идут подряд в одном браузере и сами решают, нужно ли открывать форму заново
+    """
+    if (request.node.get_closest_marker("browserless")
+            and request.config.getoption("--browserless") and Config.SITE == "stub"):
+        dom_driver = DomDriver()
+        yield MainPage(dom_driver)
+        dom_driver.quit()
+        return
+
+    lease = request.getfixturevalue("class_driver")
+    lease["used"] = True
+    listen_commands(lease["driver"])
+    page = MainPage(lease["driver"])
+    yield page
+    # Браузер с открытым модальным окном class_driver не вернул бы в пул
+    try:
+        page.close_modals()
+    except WebDriverException:
+        pass
+
+
+@pytest.fixture(scope="function")
+def credential_form(request, form_page, request_filter_proxy):
+    """
+    Страница с формой для одного сценария
+    Команды записываются в трассу этого теста, запросы браузера фильтруются по его правилам
+    """
+    use_filter_rules(request.node, request_filter_proxy)
+    with command_tracer.recording(form_page.driver, request.node.nodeid):
+        yield form_page
+
+
+def profile_for(node, browser_profile):
+    """Профиль браузера для теста или класса (маркер needs_images включает картинки)"""
+    if node.get_closest_marker("needs_images"):
+        return browser_profile.with_images()
+    return browser_profile
+
+
+def use_filter_rules(node, request_filter_proxy):
+    """
+    Включить правила фильтра запросов для теста или класса (только с --block-requests)
+    Вызывается до любой загрузки страницы: сброс браузера из пула тоже грузит главную страницу
+    """
+    if request_filter_proxy is not None:
+        request_filter_proxy.use(node.nodeid, rules_for(node, request_filter_proxy))
+
+
+def rules_for(node, request_filter_proxy):
+    """
+    Правила фильтра запросов для теста: правила запуска + маркер request_filter(block=[...], allow=[...])
+    Тесты с маркером needs_images всегда получают картинки
+    """
+    marker = node.get_closest_marker("request_filter")
+    block = marker.kwargs.get("block", ()) if marker else ()
+    allow = marker.kwargs.get("allow", ()) if marker else ()
+    unblock = ("images",) if node.get_closest_marker("needs_images") else ()
+    return request_filter_proxy.default_rules.merged(block, allow, unblock)
+
+
+def listen_commands(driver):
+    """Считать команды WebDriver в замерах шагов (слушатель подключается к браузеру один раз)"""
+    if step_timings.enabled:
+        add_command_listener(driver, step_timings.on_command)
+
+
+@pytest.fixture(scope="session")
+def account_pool(request, base_url):
+    """Пул заранее созданных аккаунтов, общий для всех воркеров xdist"""
+    pool = AccountPool(
+        os.path.join(CACHE_DIR, "account_pool.json"),
+        site=Config.SITE,
+        size=request.config.getoption("--account-pool-size")
+    )
+    pool.provision()
+    return pool
+
+
+@pytest.fixture(scope="session")
+def catalog_snapshots(request, base_url):
+    """Отпечатки категорий и уже проверенные товары из прошлых запусков"""
+    snapshots = CatalogSnapshots(os.path.join(CACHE_DIR, "catalog_snapshots.json"), Config.SITE)
+    yield snapshots
+    snapshots.save()
+
+
+@pytest.fixture(scope="function")
+def account(account_pool):
+    """
+    Аккаунт из пула в эксклюзивное пользование на время теста
+    Другие тесты (и другие воркеры) этот аккаунт не получат, пока тест не закончится
+    """
+    leased = account_pool.acquire()
+    yield leased
+    account_pool.release(leased)
+
+
+@pytest.fixture(autouse=True)
+def step_retries(request):
+    """Бюджет повторов шагов на тест; повторы прикладываются к отчету теста"""
+    if not retry_policy.enabled:
+        yield
+        return
+
+    retry_policy.begin_test()
+    yield
+    records = retry_policy.end_test()
+    if records:
+        request.node.user_properties.append(("step_retries", len(records)))
+        attach(
+            "\n".join(
+                f"{record['step']}: попытка {record['attempt'] + 1}, пауза {record['delay']:.1f} с, "
+                f"ожидание {record['seconds']:.2f} с, {'успешно' if record['recovered'] else 'снова таймаут'}"
+                for record in records
+            ),
+            name="Повторы шагов",
+            attachment_type=allure.attachment_type.TEXT
+        )
+
+
+@pytest.fixture(scope="function")
+def logged_in_driver(driver, account):
+    """
+    Браузер с уже залогиненным пользователем из пула аккаунтов
+    Логин выполняется через API, без модального окна
+    """
+    MainPage(driver).login_via_api(account.username, account.password)
+    return driver
+
+
+def pytest_collection_modifyitems(config, items):
+    """
+    Порядок тестов по истории запусков: сначала недавно упавшие, затем самые долгие
+    Все воркеры xdist читают один и тот же файл истории, поэтому порядок у них совпадает
+    Тесты read_only класса остаются рядом, чтобы общий браузер класса запускался один раз
+    Бенчмарки без --bench и тесты с маркером needs_browser без geckodriver пропускаются
+    """
+    if not benchmarks.enabled:
+        skip_benchmark = pytest.mark.skip(reason="Бенчмарки запускаются с --bench --site=stub")
+        for item in items:
+            if item.get_closest_marker("benchmark"):
+                item.add_marker(skip_benchmark)
+
+    if not os.path.isfile(GECKODRIVER_PATH):
+        skip_browser = pytest.mark.skip(reason=f"Нет geckodriver: {GECKODRIVER_PATH}")
+        for item in items:
+            if item.get_closest_marker("needs_browser"):
+                item.add_marker(skip_browser)
+
+    if config.getoption("--keep-order"):
+        return
+    by_nodeid = {item.nodeid: item for item in items}
+    groups = {
+        item.nodeid: item.parent.nodeid if item.get_closest_marker("read_only") else item.nodeid
+        for item in items
+    }
+    items[:] = [by_nodeid[nodeid] for nodeid in run_history.order(list(by_nodeid), groups.get)]
+
+
+def pytest_runtest_logreport(report):
+    """Длительность и результат каждой фазы теста (в главном процессе приходят отчеты всех воркеров)"""
+    run_history.record(report.nodeid, report.duration, report.failed)
+    if stream_report.enabled:
+        stream_report.write(report)
+
+
+def pytest_sessionstart(session):
+    """Настроить вложения: политику скриншотов, их формат и потоковый отчет"""
+    session.config._session_started = time.monotonic()
+    attachment_pipeline.configure(
+        screenshot_policy=session.config.getoption("--screenshots"),
+        image_format=session.config.getoption("--screenshot-format"),
+        image_scale=session.config.getoption("--screenshot-scale"),
+        stream=stream_report if stream_report.enabled else None
+    )
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """
+    Скриншот упавшего теста при --screenshots=on-failure
+    Скриншоты, перекодированные в фоне, прикладываются к отчету в конце каждой фазы теста
+    С --stream-report к отчету о фазе теста добавляются ссылки на ее вложения
+    (вместе с отчетом они приходят из воркера xdist в главный процесс)
+    """
+    outcome = yield
+    report = outcome.get_result()
+    if report.when == "call" and report.failed:
+        screenshot_on_failure(item)
+    attachment_pipeline.attach_pending()
+    if stream_report.enabled:
+        report.stream_assets = stream_report.take_assets()
+
+
+def screenshot_on_failure(item):
+    if attachment_pipeline.screenshot_policy != attachment_pipeline.ON_FAILURE:
+        return
+
+    driver = item.funcargs.get("driver") or item.funcargs.get("logged_in_driver")
+    if driver is None and item.funcargs.get("credential_form") is not None:
+        driver = item.funcargs["credential_form"].driver
+    if driver is not None:
+        try:
+            attachment_pipeline.screenshot(driver, name="failure", force=True)
+        except WebDriverException:
+            pass
+
+
+def reports_dir(config):
+    """Папка отчетов - рядом с HTML отчетом pytest-html (запоминается до того, как --stream-report его отключит)"""
+    if not hasattr(config, "_reports_dir"):
+        html_path = config.getoption("htmlpath", None) or "reports/report.html"
+        config._reports_dir = os.path.dirname(os.path.abspath(html_path))
+    return config._reports_dir
+
+
+def worker_count(config):
+    """Сколько воркеров xdist выполняют тесты (1 - запуск без xdist)"""
+    numprocesses = getattr(config.option, "numprocesses", None)
+    return numprocesses if isinstance(numprocesses, int) and numprocesses > 0 else 1
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """
+    Воркер xdist передает свою статистику в главный процесс,
+    главный процесс сохраняет замеры шагов и историю запусков
+    """
+    # Дописываем вложения, которые еще в очереди
+    attachment_pipeline.flush()
+
+    if is_worker(session.config):
+        session.config.workeroutput["driver_pool_stats"] = session.config._driver_pool_stats
+        session.config.workeroutput["launcher_stats"] = session.config._launcher_stats
+        session.config.workeroutput["wait_stats"] = wait_stats.to_dict()
+        session.config.workeroutput["wait_engine"] = wait_engine_stats.to_dict()
+        session.config.workeroutput["step_timings"] = step_timings.to_dict()
+        session.config.workeroutput["element_cache"] = element_cache_stats.to_dict()
+        session.config.workeroutput["request_filter"] = request_filter_stats.to_dict()
+        session.config.workeroutput["benchmarks"] = benchmarks.to_dict()
+        session.config.workeroutput["step_retries"] = retry_policy.to_dict()
+        return
+
+    stream_report.finish(exitstatus)
+    if step_timings.enabled:
+        step_timings.write_json(os.path.join(reports_dir(session.config), "step_timings.json"))
+    if benchmarks.save_baseline:
+        benchmarks.write_baseline()
+
+    # Прогноз считается по истории до текущего запуска, поэтому до ее сохранения
+    if not run_history.executed():
+        return
+    session.config._makespan = {
+        "predicted": run_history.predict_makespan(
+            run_history.order(run_history.executed()), worker_count(session.config)
+        ),
+        "actual": time.monotonic() - session.config._session_started,
+    }
+    run_history.save()
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """Главный процесс xdist собирает статистику завершившегося воркера"""
+    output = getattr(node, "workeroutput", {})
+    node.config._driver_pool_stats.extend(output.get("driver_pool_stats", []))
+    for key, values in output.get("launcher_stats", {}).items():
+        node.config._launcher_stats[key].extend(values)
+    wait_stats.merge(output.get("wait_stats", {}))
+    wait_engine_stats.merge(output.get("wait_engine", {}))
+    step_timings.merge(output.get("step_timings", {}))
+    element_cache_stats.merge(output.get("element_cache", {}))
+    request_filter_stats.merge(output.get("request_filter", {}))
+    benchmarks.merge(output.get("benchmarks", {}))
+    retry_policy.merge(output.get("step_retries", {}))
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """Статистика пула браузеров и ожиданий в конце запуска"""
+    if config._driver_pool_stats:
+        stats = DriverPool.merge_stats(config._driver_pool_stats)
+        terminalreporter.section("Пул браузеров")
+        terminalreporter.write_line(
+            f"Запусков браузера: {stats['starts']}, выдано тестам: {stats['leases']}, "
+            f"заменено сломанных: {stats['replaced']}, сэкономлено запусков: {stats['saved_starts']}"
+        )
+        if stats["shared_uses"] or stats["recycled"]:
+            terminalreporter.write_line(
+                f"Тестов read-only классов в общем браузере: {stats['shared_uses']}, "
+                f"браузеров заменено из-за alert/модального окна: {stats['recycled']}"
+            )
+
+    startup_times = config._launcher_stats["startup_times"]
+    if startup_times:
+        terminalreporter.write_line(
+            f"Запуск браузера: среднее {sum(startup_times) / len(startup_times):.2f} с, "
+            f"максимум {max(startup_times):.2f} с"
+        )
+    memory = config._launcher_stats["memory_mb"]
+    if memory:
+        terminalreporter.write_line(
+            f"Память на браузер: среднее {sum(memory) / len(memory):.0f} МБ, максимум {max(memory):.0f} МБ"
+        )
+
+    if wait_stats.enabled:
+        terminalreporter.section("Время ожиданий")
+        for name, count, total, maximum in wait_stats.rows():
+            terminalreporter.write_line(
+                f"{name:<28} вызовов: {count:>4}  всего: {total:8.3f} с  максимум: {maximum:6.3f} с"
+            )
+        terminalreporter.write_line(f"Итого ожиданий: {wait_stats.total():.3f} с")
+        for mode, waits, immediate, rechecks, mean, maximum in wait_engine_stats.rows():
+            terminalreporter.write_line(
+                f"Режим {mode}: ожиданий {waits}, выполнено сразу {immediate}, повторных проверок {rechecks}, "
+                f"опоздание в среднем {mean * 1000:.1f} мс, максимум {maximum * 1000:.1f} мс"
+            )
+        if wait_engine_stats.fallbacks:
+            terminalreporter.write_line(
+                f"Браузеров, перешедших на опрос из-за ошибок скрипта: {wait_engine_stats.fallbacks}"
+            )
+
+    if element_cache_stats.enabled:
+        counters = element_cache_stats.counters
+        terminalreporter.section("Кеш элементов")
+        terminalreporter.write_line(
+            f"Попаданий: {counters['hits']} (столько поисков элементов сэкономлено), "
+            f"промахов: {counters['misses']}, восстановлений после stale: {counters['stale_recoveries']}, "
+            f"сбросов кеша: {counters['invalidations']}"
+        )
+
+    if request_filter_stats.enabled:
+        totals = request_filter_stats.totals()
+        blocked = ", ".join(f"{category}: {count}" for category, count in sorted(totals["blocked"].items()))
+        terminalreporter.section("Фильтр запросов")
+        terminalreporter.write_line(
+            f"Заблокировано запросов: {blocked or 0}, {totals['blocked_bytes'] / 1024:.0f} КБ; "
+            f"пропущено: {totals['passed']} запросов, {totals['passed_bytes'] / 1024:.0f} КБ"
+        )
+        for test, entry in request_filter_stats.rows()[:10]:
+            if test is None or not entry["blocked_bytes"]:
+                continue
+            terminalreporter.write_line(
+                f"{test:<70} заблокировано: {sum(entry['blocked'].values()):>4}  "
+                f"{entry['blocked_bytes'] / 1024:8.0f} КБ"
+            )
+
+    if retry_policy.enabled:
+        totals = retry_policy.totals
+        terminalreporter.section("Повторы шагов")
+        terminalreporter.write_line(
+            f"Повторов: {totals['retries']}, шаг прошел после повтора: {totals['recovered']}, "
+            f"тестов с повторами: {totals['tests']}, потрачено на повторы: {totals['seconds']:.1f} с"
+        )
+
+    if benchmarks.results:
+        terminalreporter.section("Бенчмарки Page Objects")
+        for kind, name, result, baseline in benchmarks.rows():
+            compared = "нет базового значения"
+            if baseline is not None:
+                compared = f"базовое {baseline['mean'] * 1000:8.1f} мс ({result['mean'] / baseline['mean'] - 1:+.0%})"
+            terminalreporter.write_line(
+                f"{kind:<12} {name:<28} среднее: {result['mean'] * 1000:8.1f} мс  p95: {result['p95'] * 1000:8.1f} мс  "
+                f"команд: {result['commands']:5.1f}  {compared}"
+            )
+        if benchmarks.save_baseline:
+            terminalreporter.write_line(f"Базовые значения сохранены: {benchmarks.path}")
+
+    if step_timings.enabled:
+        summary = step_timings.summary()
+        terminalreporter.section("Самые медленные шаги (p95)")
+        slowest = sorted(summary.items(), key=lambda item: item[1]["p95"], reverse=True)[:10]
+        for name, step in slowest:
+            terminalreporter.write_line(
+                f"{name:<40} вызовов: {step['count']:>4}  p50: {step['p50']:6.3f} с  "
+                f"p95: {step['p95']:6.3f} с  max: {step['max']:6.3f} с  команд: {step['commands_mean']:5.1f}"
+            )
+        terminalreporter.write_line(f"Полная таблица: {os.path.join(reports_dir(config), 'step_timings.json')}")
+
+    makespan = getattr(config, "_makespan", None)
+    if config.getoption("--makespan") and makespan is not None:
+        terminalreporter.section("Время запуска")
+        terminalreporter.write_line(
+            f"Ожидаемое по истории: {makespan['predicted']:.1f} с, фактическое: {makespan['actual']:.1f} с "
+            f"(воркеров: {worker_count(config)})"
+        )
+
+    if stream_report.writer:
+        terminalreporter.section("Потоковый отчет")
+        terminalreporter.write_line(
+            f"{os.path.join(stream_report.directory, 'results.jsonl')}, HTML для просмотра: "
+            f"python -m tests.demoblaze_tests.utils.stream_report {stream_report.directory}"
+        )
 
-    # Закрываем браузер после теста
-    driver.quit()
+    if command_tracer.enabled and not is_worker(config):
+        terminalreporter.section("Трассы команд WebDriver")
+        terminalreporter.write_line(
+            f"{command_tracer.directory}, сводка: python -m tests.demoblaze_tests.utils.command_trace "
+            f"{command_tracer.directory}"
+        )
@@ -0,0 +1,99 @@
+import asyncio
+import json
+import ssl
+from urllib.parse import urlsplit
+
+
+class AsyncHttpClient:
+    """
+    Минимальный асинхронный HTTP/1.1 клиент на asyncio
+    Один клиент - одно соединение (один виртуальный пользователь), keep-alive, если сервер его держит
+    """
+
+    def __init__(self, base_url, timeout=10):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.ssl = ssl.create_default_context() if parts.scheme == "https" else None
+        self.base_path = parts.path or "/"
+        self.timeout = timeout
+        self._reader = None
+        self._writer = None
+
+    async def get(self, path):
+        return await self.request("GET", path)
+
+    async def post_json(self, path, data):
+        """POST с JSON; возвращает (статус, разобранный JSON или '')"""
+        status, body = await self.request("POST", path, json.dumps(data).encode())
+        return status, json.loads(body) if body else ""
+
+    async def request(self, method, path, body=b""):
+        """Выполнить запрос; возвращает (статус, тело ответа)"""
+        return await asyncio.wait_for(self._request(method, path, body), self.timeout)
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+        self._reader = self._writer = None
+
+    async def _request(self, method, path, body):
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+
+        target = self.base_path.rstrip("/") + "/" + path.lstrip("/")
+        headers = [
+            f"{method} {target} HTTP/1.1",
+            f"Host: {self.host}",
+            "Connection: keep-alive",
+            f"Content-Length: {len(body)}",
+        ]
+        if body:
+            headers.append("Content-Type: application/json")
+        self._writer.write(("\r\n".join(headers) + "\r\n\r\n").encode() + body)
+        try:
+            await self._writer.drain()
+            return await self._read_response()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            await self.close()
+            raise
+
+    async def _read_response(self):
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionError("Сервер закрыл соединение")
+        version, status = status_line.decode().split()[:2]
+
+        headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, value = line.decode().split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            body = await self._read_chunked()
+        elif "content-length" in headers:
+            body = await self._reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await self._reader.read()
+
+        # HTTP/1.0 и Connection: close - соединение больше не использовать
+        if version == "HTTP/1.0" or headers.get("connection", "").lower() == "close":
+            await self.close()
+        return int(status), body
+
+    async def _read_chunked(self):
+        chunks = []
+        while True:
+            size = int((await self._reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                await self._reader.readline()
+                return b"".join(chunks)
+            chunks.append(await self._reader.readexactly(size))
+            await self._reader.readline()
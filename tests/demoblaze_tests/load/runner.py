@@ -0,0 +1,362 @@
+"""
+Нагрузочный прогон сценариев MainPage
+Основная часть виртуальных пользователей работает на уровне HTTP (asyncio),
+несколько пользователей проходят те же сценарии в настоящем браузере для контроля.
+
+Запуск на локальной копии сайта (сервер стартует автоматически):
+    python -m tests.demoblaze_tests.load.runner --users 50 --ramp 10 --duration 30
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from selenium.common.exceptions import WebDriverException
+from .http_client import AsyncHttpClient
+from ..pages.main_page import MainPage
+from ..stub.server import StubServer
+from ..utils.account_pool import AccountPool
+from ..utils.browser_profile import BrowserProfile, FirefoxLauncher
+from ..utils.config import Config
+from ..utils.api_client import DemoblazeApi
+from ..utils.stats import percentile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+CATEGORIES = ["phone", "notebook", "monitor"]
+
+# Пауза виртуального пользователя после неудачного сценария (секунды, со случайным разбросом):
+# если сайт не принимает соединения, пользователи не должны крутиться в цикле без пауз
+ERROR_BACKOFF = 0.5
+
+
+class StepError(Exception):
+    """Шаг сценария завершился ошибкой (неожиданный ответ сайта)"""
+
+
+# Ошибки транспорта и HTTP, после которых виртуальный пользователь продолжает работу;
+# остальные исключения - ошибки самого прогона, они его останавливают
+HTTP_ERRORS = (StepError, OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, json.JSONDecodeError)
+
+
+class LoadMetrics:
+    """Время и ошибки по каждому шагу сценариев"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # шаг -> {"latencies": [...], "errors": n}
+        self.steps = {}
+
+    def record(self, step, seconds, ok):
+        with self._lock:
+            data = self.steps.setdefault(step, {"latencies": [], "errors": 0})
+            data["latencies"].append(seconds)
+            if not ok:
+                data["errors"] += 1
+
+    def summary(self, duration):
+        """Пропускная способность, перцентили и доля ошибок по шагам"""
+        rows = {}
+        for step, data in sorted(self.steps.items()):
+            latencies = data["latencies"]
+            rows[step] = {
+                "requests": len(latencies),
+                "throughput": len(latencies) / duration if duration else 0.0,
+                "p50": percentile(latencies, 50),
+                "p95": percentile(latencies, 95),
+                "p99": percentile(latencies, 99),
+                "error_rate": data["errors"] / len(latencies),
+            }
+        return rows
+
+
+async def timed(metrics, step, action):
+    """Выполнить шаг и записать его время; исключение считается ошибкой шага"""
+    start = time.perf_counter()
+    try:
+        result = await action
+        metrics.record(step, time.perf_counter() - start, True)
+        return result
+    except Exception:
+        metrics.record(step, time.perf_counter() - start, False)
+        raise
+
+
+def expect_ok(response):
+    """Ответ API без errorMessage"""
+    status, data = response
+    if status >= 400 or (isinstance(data, dict) and data.get("errorMessage")):
+        raise StepError(f"{status}: {data}")
+    return data
+
+
+# ========== СЦЕНАРИИ НА УРОВНЕ HTTP ==========
+# Повторяют запросы, которые сайт выполняет во время сценариев MainPage
+
+async def http_open(site, api, metrics):
+    async def open_page():
+        status, _ = await site.get("")
+        if status >= 400:
+            raise StepError(f"Главная страница вернула {status}")
+        return expect_ok(await api.post_json("entries", {}))
+    await timed(metrics, "http:open", open_page())
+
+
+async def http_browse(site, api, metrics):
+    await http_open(site, api, metrics)
+    for cat in CATEGORIES:
+        async def by_cat(cat=cat):
+            data = expect_ok(await api.post_json("bycat", {"cat": cat}))
+            if not data.get("Items"):
+                raise StepError(f"Категория {cat} пуста")
+        await timed(metrics, f"http:category:{cat}", by_cat())
+
+
+async def http_login(site, api, metrics, username=None, password=None):
+    username = username or Config.VALID_USERNAME
+    password = password or Config.VALID_PASSWORD
+    await http_open(site, api, metrics)
+
+    async def login():
+        data = expect_ok(await api.post_json(
+            "login", {"username": username, "password": DemoblazeApi.encode_password(password)}
+        ))
+        return data.replace("Auth_token:", "").strip()
+    token = await timed(metrics, "http:login", login())
+
+    async def check():
+        data = expect_ok(await api.post_json("check", {"token": token}))
+        if data["Item"]["username"] != username:
+            raise StepError("Токен принадлежит другому пользователю")
+    await timed(metrics, "http:check", check())
+
+
+async def http_signup(site, api, metrics):
+    username = Config.generate_random_username("load")
+    password = Config.generate_random_password()
+    await http_open(site, api, metrics)
+
+    async def signup():
+        expect_ok(await api.post_json(
+            "signup", {"username": username, "password": DemoblazeApi.encode_password(password)}
+        ))
+    await timed(metrics, "http:signup", signup())
+    await http_login(site, api, metrics, username, password)
+
+
+HTTP_JOURNEYS = {"browse": http_browse, "login": http_login, "signup": http_signup}
+
+
+# ========== СЦЕНАРИИ В БРАУЗЕРЕ ==========
+
+def browser_step(metrics, step, action):
+    start = time.perf_counter()
+    try:
+        result = action()
+        metrics.record(step, time.perf_counter() - start, True)
+        return result
+    except Exception:
+        metrics.record(step, time.perf_counter() - start, False)
+        raise
+
+
+def browser_browse(page, metrics, account):
+    browser_step(metrics, "browser:open", page.open)
+    browser_step(metrics, "browser:category:phone", page.click_phones_category)
+    browser_step(metrics, "browser:category:notebook", page.click_laptops_category)
+    browser_step(metrics, "browser:category:monitor", page.click_monitors_category)
+
+
+def browser_login(page, metrics, account):
+    browser_step(metrics, "browser:open", page.open)
+    browser_step(metrics, "browser:login", lambda: page.login(account.username, account.password))
+    if not browser_step(metrics, "browser:logged_in", page.is_user_logged_in):
+        raise StepError("Пользователь не залогинен")
+    browser_step(metrics, "browser:logout", page.logout)
+
+
+def browser_signup(page, metrics, account):
+    username = Config.generate_random_username("load")
+    browser_step(metrics, "browser:open", page.open)
+    browser_step(metrics, "browser:signup", lambda: page.signup(username, Config.generate_random_password()))
+    alert = browser_step(metrics, "browser:signup_alert", page.get_alert_text_and_accept)
+    if "Sign up successful" not in alert:
+        raise StepError(alert)
+
+
+BROWSER_JOURNEYS = {"browse": browser_browse, "login": browser_login, "signup": browser_signup}
+
+
+# ========== ЗАПУСК ==========
+
+async def http_user(index, start_delay, deadline, journeys, metrics):
+    """Виртуальный пользователь на уровне HTTP"""
+    await asyncio.sleep(start_delay)
+    site = AsyncHttpClient(Config.BASE_URL)
+    api = AsyncHttpClient(Config.API_URL)
+    rng = random.Random(index)
+    try:
+        while time.monotonic() < deadline:
+            try:
+                await HTTP_JOURNEYS[rng.choice(journeys)](site, api, metrics)
+            except HTTP_ERRORS:
+                # Ошибка уже записана в метрики шага, пользователь продолжает со следующего сценария
+                # на новом соединении после короткой паузы
+                await site.close()
+                await api.close()
+                await asyncio.sleep(ERROR_BACKOFF * (0.5 + rng.random()))
+    finally:
+        await site.close()
+        await api.close()
+
+
+def recover_browser(page, metrics, launcher, profile):
+    """
+    Вернуть браузер в исходное состояние после неудачного сценария
+    Если браузер упал или сессия потеряна, он запускается заново.
+    Возвращает страницу для следующего сценария или None, если браузер запустить не удалось
+    """
+    try:
+        page.accept_leftover_alert()
+        page.driver.delete_all_cookies()
+        return page
+    except WebDriverException:
+        pass
+
+    try:
+        page.driver.quit()
+    except WebDriverException:
+        pass
+    start = time.perf_counter()
+    try:
+        driver = launcher.launch(profile)
+    except WebDriverException:
+        metrics.record("browser:relaunch", time.perf_counter() - start, False)
+        return None
+    metrics.record("browser:relaunch", time.perf_counter() - start, True)
+    return MainPage(driver)
+
+
+def browser_user(index, start_delay, deadline, journeys, metrics, launcher, profile, account_pool):
+    """
+    Пользователь в настоящем браузере (выполняется в отдельном потоке)
+    Входит под аккаунтом из пула, арендованным на все время прогона
+    Каждый сценарий записывается в метрики целиком (browser:journey:<сценарий>), в том числе
+    ошибки вне шагов; упавший браузер перезапускается, остальные пользователи продолжают работу
+    """
+    time.sleep(start_delay)
+    account = account_pool.acquire()
+    rng = random.Random(1000 + index)
+    page = None
+    try:
+        page = MainPage(launcher.launch(profile))
+        while page is not None and time.monotonic() < deadline:
+            journey = rng.choice(journeys)
+            start = time.perf_counter()
+            try:
+                BROWSER_JOURNEYS[journey](page, metrics, account)
+                metrics.record(f"browser:journey:{journey}", time.perf_counter() - start, True)
+            except Exception:
+                metrics.record(f"browser:journey:{journey}", time.perf_counter() - start, False)
+                page = recover_browser(page, metrics, launcher, profile)
+    finally:
+        if page is not None:
+            try:
+                page.driver.quit()
+            except WebDriverException:
+                pass
+        account_pool.release(account)
+
+
+async def run_load(users, browsers, ramp, duration, journeys):
+    """Запустить нагрузку и вернуть (метрики, фактическая длительность)"""
+    metrics = LoadMetrics()
+    started = time.monotonic()
+    deadline = started + ramp + duration
+    tasks = [
+        http_user(index, ramp * index / max(users, 1), deadline, journeys, metrics)
+        for index in range(users)
+    ]
+
+    if browsers:
+        launcher = FirefoxLauncher(
+            geckodriver_path=os.path.join(PROJECT_ROOT, "drivers", "geckodriver"),
+            cache_dir=os.path.join(PROJECT_ROOT, ".cache")
+        )
+        profile = BrowserProfile(headless=True, images=False)
+        account_pool = AccountPool(
+            os.path.join(PROJECT_ROOT, ".cache", "account_pool.json"), site=Config.SITE, size=browsers
+        )
+        await asyncio.to_thread(account_pool.provision)
+        tasks += [
+            asyncio.to_thread(
+                browser_user, index, ramp * index / browsers, deadline, journeys, metrics,
+                launcher, profile, account_pool
+            )
+            for index in range(browsers)
+        ]
+
+    await asyncio.gather(*tasks)
+    return metrics, time.monotonic() - started
+
+
+def print_report(summary, duration):
+    print(f"Длительность: {duration:.1f} с")
+    print(f"{'Шаг':<28} {'Запросов':>9} {'В сек':>8} {'p50, мс':>9} {'p95, мс':>9} {'p99, мс':>9} {'Ошибки':>8}")
+    for step, row in summary.items():
+        print(
+            f"{step:<28} {row['requests']:>9} {row['throughput']:>8.1f} {row['p50'] * 1000:>9.1f} "
+            f"{row['p95'] * 1000:>9.1f} {row['p99'] * 1000:>9.1f} {row['error_rate']:>7.1%}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный прогон сценариев MainPage")
+    parser.add_argument("--url", help="Адрес сайта; по умолчанию запускается локальная копия")
+    parser.add_argument("--api-url", help="Адрес API (по умолчанию <url>api/, для demoblaze.com - его API)")
+    parser.add_argument("--users", type=int, default=20, help="Виртуальные пользователи на уровне HTTP")
+    parser.add_argument("--browsers", type=int, default=0, help="Пользователи в настоящем браузере")
+    parser.add_argument("--ramp", type=float, default=5, help="За сколько секунд запускаются все пользователи")
+    parser.add_argument("--duration", type=float, default=20, help="Сколько секунд держать полную нагрузку")
+    parser.add_argument("--journeys", default="browse,login,signup", help="Сценарии через запятую")
+    parser.add_argument("--report", help="Сохранить результаты в JSON")
+    args = parser.parse_args()
+
+    journeys = [name.strip() for name in args.journeys.split(",") if name.strip()]
+    unknown = set(journeys) - set(HTTP_JOURNEYS)
+    if unknown:
+        parser.error(f"Неизвестные сценарии: {', '.join(sorted(unknown))}")
+
+    server = None
+    if args.url:
+        Config.BASE_URL = args.url
+        if args.api_url:
+            Config.API_URL = args.api_url
+        elif args.url == Config.LIVE_URL:
+            Config.API_URL = Config.LIVE_API_URL
+        else:
+            Config.API_URL = args.url.rstrip("/") + "/api/"
+    else:
+        server = StubServer().start()
+        Config.SITE = "stub"
+        Config.BASE_URL = server.url
+        Config.API_URL = server.api_url
+        print(f"Локальная копия сайта: {server.url}")
+
+    try:
+        metrics, duration = asyncio.run(run_load(args.users, args.browsers, args.ramp, args.duration, journeys))
+    finally:
+        if server is not None:
+            server.stop()
+
+    summary = metrics.summary(duration)
+    print_report(summary, duration)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as file:
+            json.dump({"duration": duration, "steps": summary}, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,76 +1,168 @@
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
 import allure
+import time
+from ..utils.wait_stats import wait_stats
+from ..utils.element_cache import element_cache_for, element_cache_stats
+from ..utils.step_timings import instrument_page
+from ..utils.attachments import attach, attachment_pipeline
+from ..utils.retry_policy import retry_policy
+from ..utils.wait_engine import wait_engine_for
 
 
+@instrument_page
 class BasePage:
     """Базовый класс для всех Page Objects"""
 
     def __init__(self, driver):
         self.driver = driver
-        self.wait = WebDriverWait(driver, 10)
+        # Ожидания без опроса с фиксированным интервалом, общие для всех страниц этого браузера
+        self.wait_engine = wait_engine_for(driver)
+        # Кеш найденных элементов, включается параметром --element-cache
+        self.element_cache = element_cache_for(driver) if element_cache_stats.enabled else None
 
     @allure.step("Открыть URL: {url}")
     def open_url(self, url):
         """Открыть страницу по URL"""
         self.driver.get(url)
 
+    def wait_for(self, condition, timeout=10, name="wait_for"):
+        """Ждать выполнения условия и записать время ожидания"""
+        start = time.perf_counter()
+        try:
+            return self._until(condition, timeout)
+        finally:
+            wait_stats.record(name, time.perf_counter() - start)
+
+    def _until(self, condition, timeout):
+        """Ожидание условия, без повторов"""
+        return self.wait_engine.until(condition, timeout)
+
+    def _step(self, name, action, condition, timeout=10):
+        """
+        Шаг Page Object: действие (клик, переход, отправка формы) и ожидание его результата
+        Если результат не появился за timeout, шаг повторяется целиком - действие и ожидание -
+        по политике повторов (--step-retries)
+        """
+        def attempt(seconds):
+            action()
+            return self.wait_for(condition, seconds, name)
+
+        return retry_policy.call(name, attempt, timeout)
+
     @allure.step("Найти элемент: {locator}")
     def find_element(self, locator, timeout=10):
         """Найти элемент на странице"""
-        return WebDriverWait(self.driver, timeout).until(
-            EC.presence_of_element_located(locator)
-        )
+        if self.element_cache is not None:
+            element = self.element_cache.get(locator)
+            if element is not None:
+                return element
+
+        element = self._until(EC.presence_of_element_located(locator), timeout)
+        if self.element_cache is not None:
+            self.element_cache.put(locator, element)
+        return element
 
     @allure.step("Найти кликабельный элемент: {locator}")
     def find_clickable_element(self, locator, timeout=10):
         """Найти кликабельный элемент"""
-        return WebDriverWait(self.driver, timeout).until(
-            EC.element_to_be_clickable(locator)
-        )
+        if self.element_cache is not None:
+            element = self.element_cache.get(locator)
+            if element is not None:
+                try:
+                    # Элемент уже найден - проверяем только, что по нему можно кликнуть
+                    return self._until(EC.element_to_be_clickable(element), timeout)
+                except StaleElementReferenceException:
+                    self._forget_stale_element(locator)
+
+        element = self._until(EC.element_to_be_clickable(locator), timeout)
+        if self.element_cache is not None:
+            self.element_cache.put(locator, element)
+        return element
 
     @allure.step("Кликнуть по элементу: {locator}")
     def click_element(self, locator, timeout=10):
         """Кликнуть по элементу"""
-        element = self.find_clickable_element(locator, timeout)
-        element.click()
+        self._with_element(locator, lambda element: element.click(), timeout, clickable=True)
 
     @allure.step("Ввести текст '{text}' в поле: {locator}")
     def input_text(self, locator, text, timeout=10):
         """Ввести текст в поле"""
-        element = self.find_element(locator, timeout)
-        element.clear()
-        element.send_keys(text)
+        def type_text(element):
+            element.clear()
+            element.send_keys(text)
+
+        self._with_element(locator, type_text, timeout)
 
     @allure.step("Получить текст элемента: {locator}")
     def get_text(self, locator, timeout=10):
         """Получить текст элемента"""
-        element = self.find_element(locator, timeout)
-        return element.text
+        return self._with_element(locator, lambda element: element.text, timeout)
+
+    def mark_dom_changed(self):
+        """Отметить, что страница перерисовалась и найденные элементы больше не актуальны"""
+        if self.element_cache is not None:
+            self.element_cache.invalidate()
+
+    def _with_element(self, locator, action, timeout=10, clickable=False):
+        """Выполнить действие над элементом; устаревший элемент из кеша ищется заново"""
+        find = self.find_clickable_element if clickable else self.find_element
+        element = find(locator, timeout)
+        try:
+            return action(element)
+        except StaleElementReferenceException:
+            if self.element_cache is None:
+                raise
+            self._forget_stale_element(locator)
+            return action(find(locator, timeout))
+
+    def _forget_stale_element(self, locator):
+        self.element_cache.discard(locator)
+        element_cache_stats.add("stale_recoveries")
 
     @allure.step("Проверить видимость элемента: {locator}")
     def is_element_visible(self, locator, timeout=10):
         """Проверить, виден ли элемент"""
         try:
-            WebDriverWait(self.driver, timeout).until(
-                EC.visibility_of_element_located(locator)
-            )
+            self._until(EC.visibility_of_element_located(locator), timeout)
             return True
         except TimeoutException:
             return False
 
+    @allure.step("Ждать стабильного состояния страницы")
+    def wait_for_stable_page(self, timeout=10):
+        """Ждать, пока alert закрыт, запросы и анимации закончились и DOM перестал меняться"""
+        start = time.perf_counter()
+        try:
+            self.wait_engine.settle(timeout)
+        finally:
+            wait_stats.record("wait_for_stable_page", time.perf_counter() - start)
+
+    @allure.step("Проверить отсутствие элемента: {locator}")
+    def is_element_absent(self, locator, timeout=10):
+        """
+        Проверить, что элемента нет или он скрыт
+        Сначала страница доходит до стабильного состояния, затем элемент проверяется один раз:
+        отрицательная проверка не ждет полный таймаут
+        """
+        self.wait_for_stable_page(timeout)
+        try:
+            return not any(element.is_displayed() for element in self.driver.find_elements(*locator))
+        except StaleElementReferenceException:
+            # Элемент пропал между поиском и проверкой
+            return True
+
     @allure.step("Ждать появления алерта")
     def wait_for_alert(self, timeout=10):
         """Ждать появления alert"""
-        return WebDriverWait(self.driver, timeout).until(EC.alert_is_present())
+        return self._until(EC.alert_is_present(), timeout)
 
     @allure.step("Получить текст alert и принять его")
     def get_alert_text_and_accept(self):
         """Получить текст из alert и закрыть его"""
         alert = self.wait_for_alert()
         alert_text = alert.text
-        allure.attach(alert_text, name="Текст alert", attachment_type=allure.attachment_type.TEXT)
+        attach(alert_text, name="Текст alert", attachment_type=allure.attachment_type.TEXT)
         alert.accept()
         return alert_text
 
@@ -78,16 +170,16 @@ class BasePage:
     def wait_for_element_to_disappear(self, locator, timeout=10):
         """Ждать, пока элемент исчезнет"""
         try:
-            WebDriverWait(self.driver, timeout).until(
-                EC.invisibility_of_element_located(locator)
-            )
+            self._until(EC.invisibility_of_element_located(locator), timeout)
             return True
         except TimeoutException:
             return False
 
     @allure.step("Сделать скриншот")
     def take_screenshot(self, name="screenshot"):
-        """Сделать скриншот текущей страницы"""
-        screenshot = self.driver.get_screenshot_as_png()
-        allure.attach(screenshot, name=name, attachment_type=allure.attachment_type.PNG)
-        return screenshot
+        """
+        Сделать скриншот текущей страницы
+        С --screenshots=on-failure снимается только при падении теста
+        Возвращает скриншот в PNG или None, если по политике скриншотов он не снимался
+        """
+        return attachment_pipeline.screenshot(self.driver, name)
@@ -1,9 +1,17 @@
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import NoAlertPresentException
 import allure
 from .base_page import BasePage
-import time
+from ..utils.config import Config
+from ..utils.api_client import DemoblazeApi
+from ..utils.step_timings import instrument_page
+from ..utils.attachments import attach
+from ..utils.product_classifier import ProductClassifier, product_classifier
+from ..utils.dom_driver import browserless_script
 
 
+@instrument_page
 class MainPage(BasePage):
     """Главная страница сайта demoblaze.com"""
 
@@ -36,22 +44,45 @@ class MainPage(BasePage):
     PRODUCT_CARDS = (By.XPATH, "//div[@id='tbodyid']/div")
     PRODUCT_TITLES = (By.XPATH, "//div[@id='tbodyid']//h4/a")
 
+    # Первая карточка товара без неявного ожидания (None, если карточек нет)
+    FIRST_CARD_SCRIPT = "return document.querySelector('#tbodyid > div');"
+
+    # Все карточки товаров за один вызов execute_script
+    PRODUCTS_SCRIPT = """
+        return Array.from(document.querySelectorAll('#tbodyid > div')).map(function (card) {
+            var title = card.querySelector('h4 a');
+            var price = card.querySelector('h5');
+            var image = card.querySelector('img');
+            return {
+                title: title ? title.textContent.trim() : '',
+                price: price ? price.textContent.trim() : '',
+                link: title ? title.href : '',
+                image: image ? image.src : ''
+            };
+        });
+    """
+
     def __init__(self, driver):
         super().__init__(driver)
-        self.url = "https://www.demoblaze.com/"
+        self.url = Config.BASE_URL
 
     @allure.step("Открыть главную страницу")
     def open(self):
         """Открыть главную страницу"""
-        self.open_url(self.url)
+        # Ждем, пока загрузится список товаров
+        self._step("open", lambda: self.open_url(self.url), EC.presence_of_element_located(self.PRODUCT_CARDS))
 
     # ========== МЕТОДЫ ДЛЯ ЛОГИНА ==========
 
     @allure.step("Открыть модальное окно логина")
     def open_login_modal(self):
         """Кликнуть на ссылку Log in"""
-        self.click_element(self.LOGIN_LINK)
-        time.sleep(1)  # Даем время модальному окну открыться
+        # Ждем, пока модальное окно откроется
+        self._step(
+            "open_login_modal",
+            lambda: self.click_element(self.LOGIN_LINK),
+            EC.visibility_of_element_located(self.LOGIN_USERNAME_INPUT)
+        )
 
     @allure.step("Ввести данные для логина: username={username}")
     def enter_login_credentials(self, username, password):
@@ -62,8 +93,12 @@ class MainPage(BasePage):
     @allure.step("Нажать кнопку Log in")
     def click_login_button(self):
         """Нажать кнопку Log in в модальном окне"""
-        self.click_element(self.LOGIN_BUTTON)
-        time.sleep(1)  # Даем время на обработку
+        # Ждем результат: alert с ошибкой или закрытие модального окна после входа
+        self._step(
+            "click_login_button",
+            lambda: self.click_element(self.LOGIN_BUTTON),
+            EC.any_of(EC.alert_is_present(), EC.invisibility_of_element_located(self.LOGIN_MODAL))
+        )
 
     @allure.step("Выполнить логин: username={username}")
     def login(self, username, password):
@@ -72,11 +107,29 @@ class MainPage(BasePage):
         self.enter_login_credentials(username, password)
         self.click_login_button()
 
+    @allure.step("Войти через API: username={username}")
+    def login_via_api(self, username, password):
+        """
+        Быстрый логин без UI: получить токен через API и положить его в cookie браузера
+        После этого страница открывается уже залогиненной
+        """
+        token = DemoblazeApi().login(username, password)
+        # Cookie можно поставить только для открытого домена
+        if not self.driver.current_url.startswith(self.url):
+            self.open_url(self.url)
+        self.driver.add_cookie({"name": DemoblazeApi.TOKEN_COOKIE, "value": token, "path": "/"})
+        self.open()
+
     @allure.step("Проверить, что пользователь залогинен")
     def is_user_logged_in(self):
         """Проверить, виден ли элемент с именем пользователя"""
         return self.is_element_visible(self.USERNAME_DISPLAY, timeout=5)
 
+    @allure.step("Проверить, что пользователь не залогинен")
+    def is_user_logged_out(self):
+        """Проверить, что имя пользователя не отображается (без ожидания полного таймаута)"""
+        return self.is_element_absent(self.USERNAME_DISPLAY, timeout=5)
+
     @allure.step("Получить имя залогиненного пользователя")
     def get_logged_in_username(self):
         """Получить отображаемое имя пользователя"""
@@ -87,16 +140,24 @@ class MainPage(BasePage):
     @allure.step("Выполнить logout")
     def logout(self):
         """Выйти из системы"""
-        self.click_element(self.LOGOUT_LINK)
-        time.sleep(1)
+        # Ждем, пока исчезнет имя пользователя
+        self._step(
+            "logout",
+            lambda: self.click_element(self.LOGOUT_LINK),
+            EC.invisibility_of_element_located(self.USERNAME_DISPLAY)
+        )
 
     # ========== МЕТОДЫ ДЛЯ РЕГИСТРАЦИИ ==========
 
     @allure.step("Открыть модальное окно регистрации")
     def open_signup_modal(self):
         """Кликнуть на ссылку Sign up"""
-        self.click_element(self.SIGNUP_LINK)
-        time.sleep(1)  # Даем время модальному окну открыться
+        # Ждем, пока модальное окно откроется
+        self._step(
+            "open_signup_modal",
+            lambda: self.click_element(self.SIGNUP_LINK),
+            EC.visibility_of_element_located(self.SIGNUP_USERNAME_INPUT)
+        )
 
     @allure.step("Ввести данные для регистрации: username={username}")
     def enter_signup_credentials(self, username, password):
@@ -107,8 +168,8 @@ class MainPage(BasePage):
     @allure.step("Нажать кнопку Sign up")
     def click_signup_button(self):
         """Нажать кнопку Sign up в модальном окне"""
-        self.click_element(self.SIGNUP_BUTTON)
-        time.sleep(1)  # Даем время на обработку
+        # Регистрация всегда заканчивается alert с результатом
+        self._step("click_signup_button", lambda: self.click_element(self.SIGNUP_BUTTON), EC.alert_is_present())
 
     @allure.step("Выполнить регистрацию: username={username}")
     def signup(self, username, password):
@@ -122,62 +183,171 @@ class MainPage(BasePage):
         """Ждать, пока модальное окно регистрации закроется"""
         self.wait_for_element_to_disappear(self.SIGNUP_MODAL, timeout=10)
 
+    # ========== ФОРМЫ С УЧЕТНЫМИ ДАННЫМИ ==========
+
+    def _form(self, form):
+        """Модальное окно, открытие, ввод данных и отправка для формы login или signup"""
+        if form == "login":
+            return self.LOGIN_MODAL, self.open_login_modal, self.enter_login_credentials, self.click_login_button
+        if form == "signup":
+            return self.SIGNUP_MODAL, self.open_signup_modal, self.enter_signup_credentials, self.click_signup_button
+        raise ValueError(f"Неизвестная форма: {form}")
+
+    @allure.step("Подготовить форму {form}")
+    def prepare_form(self, form):
+        """
+        Открыть главную страницу и модальное окно формы, если окно еще не открыто
+        Возвращает False, если форма осталась открытой после предыдущего сценария
+        (тогда страница не перезагружается, поля просто перезаписываются при вводе)
+        """
+        modal, open_modal, _, _ = self._form(form)
+        if not self.accept_leftover_alert() and not self.is_element_absent(modal):
+            return False
+        self.open()
+        open_modal()
+        return True
+
+    @allure.step("Отправить форму {form}: username={username}")
+    def submit_credentials(self, form, username, password):
+        """Перезаписать поля открытой формы и нажать кнопку отправки"""
+        _, _, enter_credentials, submit = self._form(form)
+        enter_credentials(username, password)
+        submit()
+
+    def accept_leftover_alert(self):
+        """Закрыть alert, оставшийся от предыдущего действия; True, если alert был"""
+        try:
+            self.driver.switch_to.alert.accept()
+            return True
+        except NoAlertPresentException:
+            return False
+
+    @allure.step("Закрыть модальные окна")
+    def close_modals(self):
+        """Закрыть alert и открытые модальные окна (браузер возвращается в пул чистым)"""
+        self.accept_leftover_alert()
+        for modal, close_button in ((self.LOGIN_MODAL, self.LOGIN_CLOSE_BUTTON),
+                                    (self.SIGNUP_MODAL, self.SIGNUP_CLOSE_BUTTON)):
+            if not self.is_element_absent(modal):
+                self.click_element(close_button)
+                self.wait_for_element_to_disappear(modal)
+
     # ========== МЕТОДЫ ДЛЯ КАТЕГОРИЙ ==========
 
+    def select_category(self, locator, name):
+        """Кликнуть по категории и дождаться, пока список товаров перерисуется (он может быть пустым)"""
+        old_card = self.driver.execute_script(self.FIRST_CARD_SCRIPT)
+        if old_card is None:
+            # Перерисовку пустого списка не видно по старым карточкам - ждем конца запроса byCat(),
+            # для этого наблюдатель за страницей ставится до клика
+            self.wait_for_stable_page()
+            self.click_element(locator)
+        else:
+            # byCat() очищает #tbodyid - старые карточки пропадают из DOM
+            self._step(name, lambda: self.click_element(locator), EC.staleness_of(old_card))
+        self.wait_for_stable_page()
+        # Карточки товаров созданы заново
+        self.mark_dom_changed()
+
     @allure.step("Кликнуть по категории Phones")
     def click_phones_category(self):
         """Выбрать категорию Phones"""
-        self.click_element(self.CATEGORY_PHONES_LINK)
-        time.sleep(2)  # Даем время на загрузку товаров
+        self.select_category(self.CATEGORY_PHONES_LINK, "click_phones_category")
 
     @allure.step("Кликнуть по категории Laptops")
     def click_laptops_category(self):
         """Выбрать категорию Laptops"""
-        self.click_element(self.CATEGORY_LAPTOPS_LINK)
-        time.sleep(2)  # Даем время на загрузку товаров
+        self.select_category(self.CATEGORY_LAPTOPS_LINK, "click_laptops_category")
 
     @allure.step("Кликнуть по категории Monitors")
     def click_monitors_category(self):
         """Выбрать категорию Monitors"""
-        self.click_element(self.CATEGORY_MONITORS_LINK)
-        time.sleep(2)  # Даем время на загрузку товаров
+        self.select_category(self.CATEGORY_MONITORS_LINK, "click_monitors_category")
+
+    @allure.step("Получить все карточки товаров")
+    def get_products(self):
+        """
+        Получить все карточки из #tbodyid одним запросом к браузеру
+        Каждая карточка - словарь с ключами title, price, link, image
+        Пустой список, если карточек нет
+        """
+        # Ждем, пока список перестанет меняться: пустой список - тоже ответ, а не таймаут
+        self.wait_for_stable_page()
+        products = self.driver.execute_script(self.PRODUCTS_SCRIPT)
+        for product in products:
+            product["price"] = self._parse_price(product["price"])
+        return products
+
+    @staticmethod
+    def _parse_price(text):
+        """Цена из текста карточки: '$360' -> 360.0"""
+        try:
+            return float(text.replace("$", "").strip())
+        except ValueError:
+            return None
 
     @allure.step("Получить количество отображаемых товаров")
     def get_product_count(self):
         """Получить количество карточек товаров на странице"""
-        products = self.driver.find_elements(*self.PRODUCT_CARDS)
-        count = len(products)
-        allure.attach(str(count), name="Количество товаров", attachment_type=allure.attachment_type.TEXT)
+        count = len(self.get_products())
+        attach(str(count), name="Количество товаров", attachment_type=allure.attachment_type.TEXT)
         return count
 
     @allure.step("Получить названия всех товаров")
     def get_product_titles(self):
         """Получить список названий всех отображаемых товаров"""
-        time.sleep(1)  # Даем время на загрузку
-        title_elements = self.driver.find_elements(*self.PRODUCT_TITLES)
-        titles = [element.text for element in title_elements]
-        allure.attach("\n".join(titles), name="Названия товаров", attachment_type=allure.attachment_type.TEXT)
+        titles = [product["title"] for product in self.get_products()]
+        attach("\n".join(titles), name="Названия товаров", attachment_type=allure.attachment_type.TEXT)
         return titles
 
     @allure.step("Проверить, что все товары содержат ключевое слово: {keyword}")
     def check_products_contain_keyword(self, keyword):
-        """Проверить, что названия товаров содержат определенное ключевое слово"""
-        titles = self.get_product_titles()
-        # Преобразуем ключевое слово и названия в нижний регистр для проверки
-        keyword_lower = keyword.lower()
-        matching_products = [title for title in titles if keyword_lower in title.lower()]
+        """
+        Проверить, что названия товаров содержат определенное ключевое слово
+        keyword - слово из названия или категория классификатора (phone, notebook, monitor)
+        """
+        titles = [product["title"] for product in self.get_products()]
+        if keyword in product_classifier.categories:
+            classifier = product_classifier
+        else:
+            classifier = ProductClassifier({keyword: (keyword,)}, whole_words=False)
+        classification = classifier.classify_all(titles)
+        matching_products = [item.title for item in classification if item.category == keyword]
 
         result = {
             "total": len(titles),
             "matching": len(matching_products),
             "titles": titles,
-            "matching_titles": matching_products
+            "matching_titles": matching_products,
+            "classification": classification
         }
 
-        allure.attach(
+        attach(
             f"Всего товаров: {result['total']}\nСодержат '{keyword}': {result['matching']}",
             name="Результаты проверки",
             attachment_type=allure.attachment_type.TEXT
         )
 
         return result
+
+
+# ========== СКРИПТЫ БЕЗ БРАУЗЕРА (--browserless) ==========
+
+@browserless_script(MainPage.FIRST_CARD_SCRIPT)
+def _first_card(driver):
+    cards = driver.find_elements(*MainPage.PRODUCT_CARDS)
+    return cards[0] if cards else None
+
+
+@browserless_script(MainPage.PRODUCTS_SCRIPT)
+def _products(driver):
+    def first(card, selector, read):
+        found = card.find_elements(By.CSS_SELECTOR, selector)
+        return read(found[0]) if found else ""
+
+    return [{
+        "title": first(card, "h4 a", lambda title: title.get_property("textContent").strip()),
+        "price": first(card, "h5", lambda price: price.get_property("textContent").strip()),
+        "link": first(card, "h4 a", lambda title: title.get_property("href")),
+        "image": first(card, "img", lambda image: image.get_property("src")),
+    } for card in driver.find_elements(*MainPage.PRODUCT_CARDS)]
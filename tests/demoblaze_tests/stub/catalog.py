@@ -0,0 +1,37 @@
+"""
+Каталог товаров локальной копии demoblaze
+Повторяет товары и категории настоящего сайта
+"""
+
+PRODUCTS = [
+    {"id": 1, "title": "Samsung galaxy s6", "price": 360.0, "cat": "phone", "img": "imgs/galaxy_s6.jpg"},
+    {"id": 2, "title": "Nokia lumia 1520", "price": 820.0, "cat": "phone", "img": "imgs/Lumia_1520.jpg"},
+    {"id": 3, "title": "Nexus 6", "price": 650.0, "cat": "phone", "img": "imgs/Nexus_6.jpg"},
+    {"id": 4, "title": "Samsung galaxy s7", "price": 800.0, "cat": "phone", "img": "imgs/galaxy_s7.jpg"},
+    {"id": 5, "title": "Iphone 6 32gb", "price": 790.0, "cat": "phone", "img": "imgs/iphone_6.jpg"},
+    {"id": 6, "title": "Sony xperia z5", "price": 320.0, "cat": "phone", "img": "imgs/xperia_z5.jpg"},
+    {"id": 7, "title": "HTC One M9", "price": 700.0, "cat": "phone", "img": "imgs/HTC_M9.jpg"},
+    {"id": 8, "title": "Sony vaio i5", "price": 790.0, "cat": "notebook", "img": "imgs/sony_vaio_5.jpg"},
+    {"id": 9, "title": "Sony vaio i7", "price": 790.0, "cat": "notebook", "img": "imgs/sony_vaio_5.jpg"},
+    {"id": 10, "title": "Apple monitor 24", "price": 400.0, "cat": "monitor", "img": "imgs/apple_cinema.jpg"},
+    {"id": 11, "title": "MacBook air", "price": 700.0, "cat": "notebook", "img": "imgs/macbook_air.jpg"},
+    {"id": 12, "title": "Dell i7 8gb", "price": 700.0, "cat": "notebook", "img": "imgs/dell.jpg"},
+    {"id": 13, "title": "2017 Dell 15.6 Inch", "price": 700.0, "cat": "notebook", "img": "imgs/dell2.jpg"},
+    {"id": 14, "title": "ASUS Full HD", "price": 230.0, "cat": "monitor", "img": "imgs/asusm.jpg"},
+    {"id": 15, "title": "MacBook Pro", "price": 1100.0, "cat": "notebook", "img": "imgs/macbook_pro.jpg"},
+]
+
+# Сколько товаров показывает главная страница (остальные - на следующей странице)
+PAGE_SIZE = 9
+
+
+def entries():
+    """Ответ /entries - первая страница товаров"""
+    items = [dict(product, desc=f"{product['title']} description") for product in PRODUCTS[:PAGE_SIZE]]
+    return {"Items": items, "LastEvaluatedKey": {"id": str(PAGE_SIZE)}}
+
+
+def by_category(cat):
+    """Ответ /bycat - все товары категории"""
+    items = [dict(product, desc=f"{product['title']} description") for product in PRODUCTS if product["cat"] == cat]
+    return {"Items": items}
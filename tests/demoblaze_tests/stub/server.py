@@ -0,0 +1,192 @@
+"""
+Локальная копия demoblaze.com для запуска тестов без сети
+Отдает главную страницу и API, которые используют тесты:
+/entries, /bycat, /signup, /login, /check
+
+Запуск отдельно от тестов:
+    python -m tests.demoblaze_tests.stub.server --port 8000
+"""
+import argparse
+import base64
+import json
+import os
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from . import catalog
+from ..utils.config import Config
+
+SITE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "site")
+
+# Картинка-заглушка 1x1 для карточек товаров
+PLACEHOLDER_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8z8BQDwAEhQGAhKmMIQAAAABJRU5ErkJggg=="
+)
+
+
+class StubState:
+    """Пользователи и сессии локального сайта"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # username -> пароль в base64 (как его присылает сайт)
+        self.users = {}
+        # token -> username
+        self.tokens = {}
+
+        # Пользователи, которые на настоящем сайте созданы заранее
+        self.add_user(Config.VALID_USERNAME, Config.VALID_PASSWORD)
+        self.add_user(Config.EXISTING_USERNAME, Config.EXISTING_USERNAME)
+
+    def add_user(self, username, password):
+        """Добавить пользователя с паролем в открытом виде"""
+        self.users[username] = base64.b64encode(password.encode()).decode()
+
+    def signup(self, username, password):
+        with self.lock:
+            if username in self.users:
+                return {"errorMessage": "This user already exist."}
+            self.users[username] = password
+        return ""
+
+    def login(self, username, password):
+        with self.lock:
+            if username not in self.users:
+                return {"errorMessage": "User does not exist."}
+            if self.users[username] != password:
+                return {"errorMessage": "Wrong password."}
+            token = uuid.uuid4().hex
+            self.tokens[token] = username
+        return f"Auth_token: {token}"
+
+    def check(self, token):
+        with self.lock:
+            username = self.tokens.get(token)
+        if username is None:
+            return {"errorMessage": "Token has expired or does not exist."}
+        return {"Item": {"token": token, "username": username}}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Обработчик запросов локального сайта"""
+
+    server_version = "DemoblazeStub/1.0"
+
+    def log_message(self, format, *args):
+        # Не засоряем вывод pytest логами каждого запроса
+        pass
+
+    def _delay_api(self, path):
+        # Медленное API: первые запросы каталога идут дольше загрузки страницы
+        if path.startswith("/api/") and self.server.api_delay:
+            time.sleep(self.server.api_delay)
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        self._delay_api(path)
+        if path in ("/", "/index.html"):
+            self._send_file("index.html", "text/html; charset=utf-8")
+        elif path.startswith("/imgs/"):
+            self._send(200, PLACEHOLDER_PNG, "image/png")
+        elif path == "/api/entries":
+            self._send_json(catalog.entries())
+        else:
+            self._send(404, b"Not found", "text/plain")
+
+    def do_HEAD(self):
+        # Те же заголовки, что у GET, без тела (по ним фильтр запросов узнает размер ресурса)
+        self._head_only = True
+        self.do_GET()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            body = {}
+
+        state = self.server.state
+        path = self.path.split("?", 1)[0]
+        self._delay_api(path)
+        if path == "/api/entries":
+            self._send_json(catalog.entries())
+        elif path == "/api/bycat":
+            self._send_json(catalog.by_category(body.get("cat", "")))
+        elif path == "/api/signup":
+            self._send_json(state.signup(body.get("username", ""), body.get("password", "")))
+        elif path == "/api/login":
+            self._send_json(state.login(body.get("username", ""), body.get("password", "")))
+        elif path == "/api/check":
+            self._send_json(state.check(body.get("token", "")))
+        else:
+            self._send(404, b"Not found", "text/plain")
+
+    def _send_file(self, name, content_type):
+        with open(os.path.join(SITE_DIR, name), "rb") as file:
+            self._send(200, file.read(), content_type)
+
+    def _send_json(self, data):
+        self._send(200, json.dumps(data).encode(), "application/json")
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not getattr(self, "_head_only", False):
+            self.wfile.write(body)
+
+
+class StubServer:
+    """Локальный сервер demoblaze в фоновом потоке"""
+
+    def __init__(self, host="127.0.0.1", port=0, api_delay=0.0):
+        # port=0 - операционная система выберет свободный порт
+        # api_delay - задержка каждого ответа API в секундах
+        self.httpd = ThreadingHTTPServer((host, port), StubHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.state = StubState()
+        self.httpd.api_delay = api_delay
+        self._thread = None
+
+    @property
+    def url(self):
+        """Адрес главной страницы"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    @property
+    def api_url(self):
+        """Адрес API"""
+        return f"{self.url}api/"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Локальная копия demoblaze.com")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--api-delay", type=float, default=0.0, help="Задержка ответов API в секундах")
+    args = parser.parse_args()
+
+    server = StubServer(args.host, args.port, args.api_delay)
+    print(f"Сайт доступен по адресу {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
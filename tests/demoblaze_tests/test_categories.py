@@ -2,10 +2,36 @@ import pytest
 import allure
 from .pages.main_page import MainPage
 from .utils.config import Config
+from .utils.attachments import attach
+from .utils.product_classifier import product_classifier
+
+
+def check_titles_category(titles, titles_to_check, category, category_name):
+    """
+    Проверить, что все товары из titles_to_check относятся к категории
+    Возвращает название -> найденные классификатором слова (для снимка категории)
+    """
+    attach(
+        f"Проверяются подробно: {len(titles_to_check)} из {len(titles)}",
+        name="Снимок категории",
+        attachment_type=allure.attachment_type.TEXT
+    )
+    evidence = {}
+    for item in product_classifier.classify_all(titles_to_check):
+        attach(
+            f"Товар: {item.title}\nКатегория: {item.category}\nНайденные слова: {', '.join(item.evidence) or '-'}",
+            name=f"Проверка: {item.title}",
+            attachment_type=allure.attachment_type.TEXT
+        )
+        assert item.category == category, \
+            f"Товар '{item.title}' не похож на {category_name} (категория по названию: {item.category})"
+        evidence[item.title] = ", ".join(item.evidence)
+    return evidence
 
 
 @allure.feature('Поиск и фильтрация')
 @allure.story('Фильтрация товаров по категориям')
+@pytest.mark.read_only
 class TestCategories:
     """Тесты функциональности поиска по категориям"""
 
@@ -25,7 +51,8 @@ class TestCategories:
     """)
     @allure.severity(allure.severity_level.CRITICAL)
     @pytest.mark.smoke
-    def test_filter_by_phones_category(self, driver):
+    @pytest.mark.browserless
+    def test_filter_by_phones_category(self, driver, catalog_snapshots):
         """Проверка фильтрации по категории Phones"""
         page = MainPage(driver)
 
@@ -37,7 +64,7 @@ class TestCategories:
 
         with allure.step("Получить количество отображаемых товаров"):
             product_count = page.get_product_count()
-            allure.attach(
+            attach(
                 str(product_count),
                 name="Количество товаров в категории Phones",
                 attachment_type=allure.attachment_type.TEXT
@@ -49,19 +76,10 @@ class TestCategories:
             assert len(titles) > 0, "Не удалось получить названия товаров"
 
         with allure.step("Проверить, что товары относятся к телефонам"):
-            # Характерные слова для телефонов
-            phone_keywords = ['samsung', 'nokia', 'nexus', 'iphone', 'htc', 'sony', 'lumia']
-
-            # Проверяем, что каждый товар содержит хотя бы одно ключевое слово
-            for title in titles:
-                title_lower = title.lower()
-                has_keyword = any(keyword in title_lower for keyword in phone_keywords)
-                allure.attach(
-                    f"Товар: {title}\nСодержит ключевые слова телефонов: {has_keyword}",
-                    name=f"Проверка: {title}",
-                    attachment_type=allure.attachment_type.TEXT
-                )
-                assert has_keyword, f"Товар '{title}' не похож на телефон"
+            # Подробно проверяем только товары, которых нет в проверенном снимке категории
+            titles_to_check = catalog_snapshots.titles_to_check("phone", titles)
+            evidence = check_titles_category(titles, titles_to_check, "phone", "телефон")
+            catalog_snapshots.remember("phone", titles, evidence)
 
         with allure.step("Сделать скриншот категории Phones"):
             page.take_screenshot("phones_category")
@@ -83,7 +101,8 @@ class TestCategories:
     """)
     @allure.severity(allure.severity_level.CRITICAL)
     @pytest.mark.smoke
-    def test_filter_by_laptops_category(self, driver):
+    @pytest.mark.browserless
+    def test_filter_by_laptops_category(self, driver, catalog_snapshots):
         """Проверка фильтрации по категории Laptops"""
         page = MainPage(driver)
 
@@ -95,7 +114,7 @@ class TestCategories:
 
         with allure.step("Получить количество отображаемых товаров"):
             product_count = page.get_product_count()
-            allure.attach(
+            attach(
                 str(product_count),
                 name="Количество товаров в категории Laptops",
                 attachment_type=allure.attachment_type.TEXT
@@ -107,23 +126,10 @@ class TestCategories:
             assert len(titles) > 0, "Не удалось получить названия товаров"
 
         with allure.step("Проверить, что товары относятся к ноутбукам"):
-            # Характерные слова для ноутбуков
-            laptop_keywords = ['vaio', 'macbook', 'dell', 'sony']
-
-            # Проверяем, что каждый товар содержит хотя бы одно ключевое слово
-            for title in titles:
-                title_lower = title.lower()
-                has_keyword = any(keyword in title_lower for keyword in laptop_keywords)
-                allure.attach(
-                    f"Товар: {title}\nСодержит ключевые слова ноутбуков: {has_keyword}",
-                    name=f"Проверка: {title}",
-                    attachment_type=allure.attachment_type.TEXT
-                )
-                # Для ноутбуков можем быть менее строгими, т.к. там могут быть общие названия
-                # Просто проверяем, что это не телефон
-                phone_keywords = ['samsung galaxy', 'nokia lumia', 'nexus', 'iphone', 'htc']
-                is_phone = any(keyword in title_lower for keyword in phone_keywords)
-                assert not is_phone, f"Товар '{title}' выглядит как телефон в категории ноутбуков"
+            # Подробно проверяем только товары, которых нет в проверенном снимке категории
+            titles_to_check = catalog_snapshots.titles_to_check("notebook", titles)
+            evidence = check_titles_category(titles, titles_to_check, "notebook", "ноутбук")
+            catalog_snapshots.remember("notebook", titles, evidence)
 
         with allure.step("Сделать скриншот категории Laptops"):
             page.take_screenshot("laptops_category")
@@ -144,7 +150,8 @@ class TestCategories:
     """)
     @allure.severity(allure.severity_level.CRITICAL)
     @pytest.mark.smoke
-    def test_filter_by_monitors_category(self, driver):
+    @pytest.mark.browserless
+    def test_filter_by_monitors_category(self, driver, catalog_snapshots):
         """Проверка фильтрации по категории Monitors"""
         page = MainPage(driver)
 
@@ -156,7 +163,7 @@ class TestCategories:
 
         with allure.step("Получить количество отображаемых товаров"):
             product_count = page.get_product_count()
-            allure.attach(
+            attach(
                 str(product_count),
                 name="Количество товаров в категории Monitors",
                 attachment_type=allure.attachment_type.TEXT
@@ -167,13 +174,11 @@ class TestCategories:
             titles = page.get_product_titles()
             assert len(titles) > 0, "Не удалось получить названия товаров"
 
-        with allure.step("Проверить, что товары НЕ являются телефонами или ноутбуками"):
-            # Проверяем, что это точно не телефоны
-            phone_keywords = ['samsung galaxy', 'nokia', 'nexus', 'iphone', 'htc']
-            for title in titles:
-                title_lower = title.lower()
-                is_phone = any(keyword in title_lower for keyword in phone_keywords)
-                assert not is_phone, f"Товар '{title}' выглядит как телефон в категории мониторов"
+        with allure.step("Проверить, что товары относятся к мониторам"):
+            # Подробно проверяем только товары, которых нет в проверенном снимке категории
+            titles_to_check = catalog_snapshots.titles_to_check("monitor", titles)
+            evidence = check_titles_category(titles, titles_to_check, "monitor", "монитор")
+            catalog_snapshots.remember("monitor", titles, evidence)
 
         with allure.step("Сделать скриншот категории Monitors"):
             page.take_screenshot("monitors_category")
@@ -209,25 +214,25 @@ class TestCategories:
         with allure.step("Выбрать категорию Phones и запомнить количество"):
             page.click_phones_category()
             phones_count = page.get_product_count()
-            allure.attach(str(phones_count), name="Phones count", attachment_type=allure.attachment_type.TEXT)
+            attach(str(phones_count), name="Phones count", attachment_type=allure.attachment_type.TEXT)
             assert phones_count > 0, "В категории Phones нет товаров"
 
         with allure.step("Выбрать категорию Laptops и запомнить количество"):
             page.click_laptops_category()
             laptops_count = page.get_product_count()
-            allure.attach(str(laptops_count), name="Laptops count", attachment_type=allure.attachment_type.TEXT)
+            attach(str(laptops_count), name="Laptops count", attachment_type=allure.attachment_type.TEXT)
             assert laptops_count > 0, "В категории Laptops нет товаров"
 
         with allure.step("Выбрать категорию Monitors и запомнить количество"):
             page.click_monitors_category()
             monitors_count = page.get_product_count()
-            allure.attach(str(monitors_count), name="Monitors count", attachment_type=allure.attachment_type.TEXT)
+            attach(str(monitors_count), name="Monitors count", attachment_type=allure.attachment_type.TEXT)
             assert monitors_count > 0, "В категории Monitors нет товаров"
 
         with allure.step("Проверить, что количества различаются"):
             # Все категории должны иметь товары
             counts = [phones_count, laptops_count, monitors_count]
-            allure.attach(
+            attach(
                 f"Phones: {phones_count}\nLaptops: {laptops_count}\nMonitors: {monitors_count}",
                 name="Сравнение количества товаров",
                 attachment_type=allure.attachment_type.TEXT
@@ -258,6 +263,7 @@ class TestCategories:
     """)
     @allure.severity(allure.severity_level.NORMAL)
     @pytest.mark.regression
+    @pytest.mark.browserless
     def test_main_page_shows_all_products(self, driver):
         """Проверка отображения всех товаров на главной странице"""
         page = MainPage(driver)
@@ -267,7 +273,7 @@ class TestCategories:
 
         with allure.step("Получить количество товаров на главной странице"):
             total_count = page.get_product_count()
-            allure.attach(
+            attach(
                 str(total_count),
                 name="Общее количество товаров",
                 attachment_type=allure.attachment_type.TEXT
@@ -276,7 +282,7 @@ class TestCategories:
 
         with allure.step("Получить названия товаров"):
             titles = page.get_product_titles()
-            allure.attach(
+            attach(
                 "\n".join(titles),
                 name="Список всех товаров",
                 attachment_type=allure.attachment_type.TEXT
@@ -284,13 +290,9 @@ class TestCategories:
 
         with allure.step("Проверить разнообразие категорий"):
             # Проверяем, что есть хотя бы один телефон
-            phone_keywords = ['samsung', 'nokia', 'nexus', 'iphone', 'htc']
-            has_phones = any(
-                any(keyword in title.lower() for keyword in phone_keywords)
-                for title in titles
-            )
+            has_phones = any(item.category == "phone" for item in product_classifier.classify_all(titles))
 
-            allure.attach(
+            attach(
                 f"Есть телефоны: {has_phones}",
                 name="Проверка наличия категорий",
                 attachment_type=allure.attachment_type.TEXT
@@ -349,7 +351,7 @@ class TestCategories:
                 f"{cat}: {count} карточек, {titles} названий"
                 for cat, count, titles in categories_data
             ])
-            allure.attach(
+            attach(
                 report,
                 name="Статистика по категориям",
                 attachment_type=allure.attachment_type.TEXT
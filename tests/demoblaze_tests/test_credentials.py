@@ -0,0 +1,96 @@
+import pytest
+import allure
+from .utils.attachments import attach
+from .utils.credential_scenarios import needs_account, resolve_credentials, scenarios_for
+
+
+def pytest_generate_tests(metafunc):
+    """Каждый сценарий из таблицы - отдельный тест класса его формы"""
+    if "scenario" not in metafunc.fixturenames:
+        return
+    metafunc.parametrize("scenario", [
+        pytest.param(scenario, id=scenario.id, marks=pytest.mark.smoke if scenario.smoke else pytest.mark.regression)
+        for scenario in scenarios_for(metafunc.cls.FORM)
+    ])
+
+
+class CredentialScenarioFlow:
+    """
+    Один тест на все сценарии формы из таблицы CREDENTIAL_SCENARIOS
+    Сценарии класса идут подряд в одном браузере: страница и модальное окно открываются
+    один раз, между сценариями перезаписываются только поля формы
+    """
+
+    FORM = None
+
+    @allure.description("""
+    ЦЕЛЬ: Проверить, что форма отклоняет неверные учетные данные
+
+    ШАГИ:
+    1. Открыть главную страницу и модальное окно формы (если оно не осталось открытым)
+    2. Ввести username и password сценария
+    3. Нажать кнопку отправки формы
+
+    ОЖИДАЕМЫЙ РЕЗУЛЬТАТ:
+    - Появляется alert с сообщением об ошибке из таблицы сценариев
+    - Пользователь не залогинен
+    """)
+    def test_rejected_credentials(self, request, credential_form, scenario):
+        """Проверка сценария с неверными учетными данными"""
+        allure.dynamic.title(scenario.title)
+        allure.dynamic.severity(
+            allure.severity_level.CRITICAL if scenario.smoke else allure.severity_level.NORMAL
+        )
+        page = credential_form
+        account = request.getfixturevalue("account") if needs_account(scenario) else None
+        username, password = resolve_credentials(scenario, account)
+
+        with allure.step("Открыть форму"):
+            reopened = page.prepare_form(self.FORM)
+            attach(
+                "Страница и форма открыты заново" if reopened else "Форма открыта предыдущим сценарием",
+                name="Подготовка формы",
+                attachment_type=allure.attachment_type.TEXT
+            )
+
+        with allure.step("Отправить форму с данными сценария"):
+            attach(
+                f"Username: {username}\nPassword: {password}",
+                name="Учетные данные сценария",
+                attachment_type=allure.attachment_type.TEXT
+            )
+            page.submit_credentials(self.FORM, username, password)
+
+        with allure.step("Проверить появление alert с ошибкой"):
+            alert_text = page.get_alert_text_and_accept()
+            if scenario.expected is None:
+                assert alert_text != "", "Alert должен содержать сообщение об ошибке"
+            else:
+                assert scenario.expected in alert_text, \
+                    f"Ожидали сообщение '{scenario.expected}', получили: {alert_text}"
+
+        with allure.step("Проверить, что пользователь не залогинен"):
+            assert page.is_user_logged_out(), "Пользователь залогинен, хотя не должен был"
+
+        with allure.step("Сделать скриншот"):
+            page.take_screenshot(f"{self.FORM}_{scenario.id}")
+
+
+@allure.feature('Аутентификация')
+@allure.story('Вход в систему (Login)')
+@pytest.mark.read_only
+@pytest.mark.browserless
+class TestLoginCredentials(CredentialScenarioFlow):
+    """Неверные учетные данные в форме логина"""
+
+    FORM = "login"
+
+
+@allure.feature('Аутентификация')
+@allure.story('Регистрация (Sign up)')
+@pytest.mark.read_only
+@pytest.mark.browserless
+class TestSignupCredentials(CredentialScenarioFlow):
+    """Неверные учетные данные в форме регистрации"""
+
+    FORM = "signup"
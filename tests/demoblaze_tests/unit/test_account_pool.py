@@ -0,0 +1,107 @@
+import pytest
+import allure
+from ..utils import account_pool as account_pool_module
+from ..utils.account_pool import Account, AccountPool
+from ..utils.api_client import ApiError
+from ..utils.json_store import fcntl
+
+
+class FakeApi:
+    """API сайта в памяти: зарегистрированные пользователи и отказы регистрации"""
+
+    def __init__(self, users=None, refuse_signup=()):
+        self.users = dict(users or {})
+        self.refuse_signup = set(refuse_signup)
+        self.logins = []
+
+    def signup(self, username, password):
+        if username in self.refuse_signup:
+            raise ApiError("Signup failed")
+        if username in self.users:
+            raise ApiError("This user already exist.")
+        self.users[username] = password
+
+    def login(self, username, password):
+        self.logins.append(username)
+        if self.users.get(username) != password:
+            raise ApiError("Wrong password.")
+        return "token"
+
+
+class LockCheckingApi(FakeApi):
+    """API, которое при входе проверяет, что файл пула не заблокирован"""
+
+    def __init__(self, path, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self.locked = []
+
+    def login(self, username, password):
+        with open(self.path + ".lock", "a") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                self.locked.append(username)
+            else:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+        return super().login(username, password)
+
+
+def make_pool(tmp_path, site, api, accounts):
+    pool = AccountPool(str(tmp_path / "pool.json"), site=site, api=api, size=0)
+    data, stored = pool._load()
+    stored["accounts"] = [account._asdict() for account in accounts]
+    account_pool_module.save_json(pool.path, data)
+    return pool
+
+
+@allure.feature('Инфраструктура тестов')
+@allure.story('Пул аккаунтов')
+class TestAccountPool:
+    """Аренда аккаунтов: аккаунт, под которым нельзя войти, тесту не выдается"""
+
+    def test_stub_account_that_fails_registration_is_dropped(self, tmp_path):
+        broken, good = Account("broken", "secret"), Account("good", "secret")
+        api = FakeApi(refuse_signup={"broken"})
+        pool = make_pool(tmp_path, "stub", api, [broken, good])
+
+        assert pool.acquire() == good
+        assert [account["username"] for account in pool._load()[1]["accounts"]] == ["good"]
+
+    def test_live_account_is_verified_once_per_period(self, tmp_path):
+        account = Account("user", "secret")
+        api = FakeApi(users={"user": "secret"})
+        pool = make_pool(tmp_path, "live", api, [account])
+
+        assert pool.acquire() == account
+        pool.release(account)
+        assert pool.acquire() == account
+        assert api.logins == ["user"]
+
+    def test_deleted_live_account_is_replaced(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(account_pool_module, "VERIFY_AFTER_SECONDS", 0)
+        api = FakeApi()
+        pool = make_pool(tmp_path, "live", api, [Account("deleted", "secret")])
+
+        leased = pool.acquire()
+        assert leased.username != "deleted"
+        assert leased.username in api.users
+        assert "deleted" not in [account["username"] for account in pool._load()[1]["accounts"]]
+
+    @pytest.mark.skipif(fcntl is None, reason="Без fcntl файл пула не блокируется")
+    def test_account_is_verified_outside_file_lock(self, tmp_path):
+        account = Account("user", "secret")
+        api = LockCheckingApi(str(tmp_path / "pool.json"), users={"user": "secret"})
+        pool = make_pool(tmp_path, "stub", api, [account])
+
+        assert pool.acquire() == account
+        assert api.logins == ["user"] and api.locked == []
+        assert list(pool._load()[1]["leases"]) == ["user"]
+
+    def test_lease_of_rejected_account_is_returned(self, tmp_path):
+        broken, good = Account("broken", "secret"), Account("good", "secret")
+        api = FakeApi(refuse_signup={"broken"})
+        pool = make_pool(tmp_path, "stub", api, [broken, good])
+
+        pool.acquire()
+        assert list(pool._load()[1]["leases"]) == ["good"]
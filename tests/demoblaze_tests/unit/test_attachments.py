@@ -0,0 +1,72 @@
+import pytest
+import allure
+from ..stub.server import PLACEHOLDER_PNG
+from ..utils import attachments as attachments_module
+from ..utils.attachments import AttachmentPipeline
+
+
+class FakeDriver:
+    def get_screenshot_as_png(self):
+        return PLACEHOLDER_PNG
+
+
+@pytest.fixture
+def attached(monkeypatch):
+    """Вложения, переданные в allure.attach: (имя, тело)"""
+    calls = []
+    monkeypatch.setattr(
+        attachments_module.allure, "attach",
+        lambda body, name=None, attachment_type=None, extension=None: calls.append((name, body))
+    )
+    return calls
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """Очередь со сжатием скриншотов (Pillow заменен функцией перекодирования)"""
+    monkeypatch.setattr(attachments_module, "Image", object())
+    pipeline = AttachmentPipeline()
+    pipeline.configure(image_format="jpeg")
+    return pipeline
+
+
+@allure.feature('Инфраструктура тестов')
+@allure.story('Вложения')
+class TestAttachmentPipeline:
+    """Вложения попадают в отчет через allure.attach, в фоне только перекодирование"""
+
+    def test_screenshot_without_encoding_is_attached_at_once(self, attached):
+        pipeline = AttachmentPipeline()
+        assert pipeline.screenshot(FakeDriver(), name="page") == PLACEHOLDER_PNG
+        assert attached == [("page", PLACEHOLDER_PNG)]
+
+    def test_encoded_screenshot_is_attached_from_test_thread(self, attached, pipeline, monkeypatch):
+        monkeypatch.setattr(pipeline, "_convert_image", lambda png: b"jpeg")
+        assert pipeline.screenshot(FakeDriver(), name="page") == PLACEHOLDER_PNG
+        assert attached == []
+
+        pipeline.attach_pending()
+        assert attached == [("page", b"jpeg")]
+
+    def test_failed_encoding_loses_only_that_screenshot(self, attached, pipeline, monkeypatch):
+        results = iter([ValueError("broken image"), b"jpeg"])
+
+        def convert(png):
+            result = next(results)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        monkeypatch.setattr(pipeline, "_convert_image", convert)
+        pipeline.screenshot(FakeDriver(), name="broken")
+        pipeline.screenshot(FakeDriver(), name="page")
+        pipeline.attach_pending()
+
+        assert attached == [("page", b"jpeg")]
+        assert pipeline.stats["failed"] == 1
+
+    def test_screenshot_skipped_by_policy(self, attached):
+        pipeline = AttachmentPipeline()
+        pipeline.configure(screenshot_policy=AttachmentPipeline.ON_FAILURE)
+        assert pipeline.screenshot(FakeDriver()) is None
+        assert attached == [] and pipeline.stats["skipped_screenshots"] == 1
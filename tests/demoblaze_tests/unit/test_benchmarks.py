@@ -0,0 +1,45 @@
+import pytest
+import allure
+from ..utils.benchmarks import BenchmarkRegression, Benchmarks
+from ..utils.json_store import load_json, save_json
+
+
+def result(mean, commands=3):
+    return {"mean": mean, "commands": commands}
+
+
+@pytest.fixture
+def baseline_path(tmp_path):
+    path = str(tmp_path / "benchmarks.json")
+    save_json(path, {"firefox": {"open": result(0.1)}})
+    return path
+
+
+@allure.feature('Инфраструктура тестов')
+@allure.story('Бенчмарки Page Objects')
+class TestBenchmarks:
+    """Сравнение замеров с базовыми значениями, сохраненными до запуска"""
+
+    def test_report_compares_with_baseline_before_save(self, baseline_path):
+        bench = Benchmarks()
+        bench.configure(baseline_path, save_baseline=True)
+        bench.results = {"firefox": {"open": result(0.2)}}
+        bench.write_baseline()
+
+        assert load_json(baseline_path, {})["firefox"]["open"]["mean"] == 0.2
+        assert bench.rows() == [("firefox", "open", result(0.2), result(0.1))]
+
+    def test_regression(self, baseline_path):
+        bench = Benchmarks()
+        bench.configure(baseline_path, threshold=0.2)
+        bench.check("firefox", "open", result(0.11))
+        with pytest.raises(BenchmarkRegression):
+            bench.check("firefox", "open", result(0.13))
+        with pytest.raises(BenchmarkRegression):
+            bench.check("firefox", "open", result(0.1, commands=4))
+
+    def test_operation_without_baseline_is_not_checked(self, baseline_path):
+        bench = Benchmarks()
+        bench.configure(baseline_path)
+        bench.check("browserless", "open", result(10.0))
+        assert bench.rows() == []
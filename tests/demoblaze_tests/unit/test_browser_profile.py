@@ -0,0 +1,55 @@
+import allure
+from ..utils.browser_profile import BrowserProfile, FirefoxLauncher
+
+
+class FakeProcess:
+    """Процесс geckodriver: poll() возвращает код завершения после quit()"""
+
+    def __init__(self):
+        self.returncode = None
+
+    def poll(self):
+        return self.returncode
+
+
+class FakeService:
+    def __init__(self):
+        self.process = FakeProcess()
+
+
+class FakeDriver:
+    def __init__(self):
+        self.service = FakeService()
+
+    def quit(self):
+        self.service.process.returncode = 0
+
+
+def make_launcher(monkeypatch, tmp_path):
+    launcher = FirefoxLauncher(geckodriver_path="geckodriver", cache_dir=str(tmp_path))
+    monkeypatch.setattr(launcher, "_start", lambda profile, profile_dir=None: FakeDriver())
+    monkeypatch.setattr(FirefoxLauncher, "_browser_memory_mb", staticmethod(lambda driver: 100.0))
+    return launcher
+
+
+@allure.feature('Инфраструктура тестов')
+@allure.story('Запуск браузера')
+class TestFirefoxLauncher:
+    """Память замеряется только у браузеров, которые еще открыты"""
+
+    def test_quit_browsers_are_not_measured(self, monkeypatch, tmp_path):
+        launcher = make_launcher(monkeypatch, tmp_path)
+        closed = launcher.launch(BrowserProfile())
+        launcher.launch(BrowserProfile())
+        closed.quit()
+
+        launcher.measure_memory()
+        assert launcher.memory_mb == [100.0]
+        assert len(launcher.startup_times) == 2
+
+    def test_quit_browsers_are_forgotten_on_launch(self, monkeypatch, tmp_path):
+        launcher = make_launcher(monkeypatch, tmp_path)
+        for _ in range(3):
+            launcher.launch(BrowserProfile()).quit()
+        running = launcher.launch(BrowserProfile())
+        assert launcher._drivers == [running]
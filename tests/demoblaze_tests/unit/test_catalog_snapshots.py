@@ -0,0 +1,58 @@
+import allure
+from ..utils.catalog_snapshots import CatalogSnapshots
+from ..utils.product_classifier import VOCABULARY, ProductClassifier
+
+
+def run(path, titles, category="phone", verify=lambda titles: titles, classifier=None):
+    """Один запуск теста категории: проверить нужные названия и запомнить список"""
+    snapshots = CatalogSnapshots(path, "stub", classifier=classifier or ProductClassifier())
+    to_check = snapshots.titles_to_check(category, titles)
+    snapshots.remember(category, titles, {title: "ok" for title in verify(to_check)})
+    snapshots.save()
+    return to_check
+
+
+@allure.feature('Инфраструктура тестов')
+@allure.story('Снимки категорий')
+class TestCatalogSnapshots:
+    """Какие названия товаров проверяются подробно при повторных запусках"""
+
+    def test_unchanged_category_is_skipped(self, tmp_path):
+        path = str(tmp_path / "snapshots.json")
+        assert run(path, ["Nokia", "Iphone"]) == ["Nokia", "Iphone"]
+        assert run(path, ["Nokia", "Iphone"]) == []
+
+    def test_only_new_titles_are_checked(self, tmp_path):
+        path = str(tmp_path / "snapshots.json")
+        run(path, ["Nokia", "Iphone"])
+        assert run(path, ["Nokia", "Iphone", "Nexus"]) == ["Nexus"]
+        assert run(path, ["Nokia", "Iphone", "Nexus"]) == []
+
+    def test_removed_titles_are_forgotten(self, tmp_path):
+        path = str(tmp_path / "snapshots.json")
+        run(path, ["Nokia", "Iphone"])
+        assert run(path, ["Nokia"]) == []
+        # Товар вернулся в каталог - его снова нужно проверить
+        assert run(path, ["Nokia", "Iphone"]) == ["Iphone"]
+
+    def test_failed_check_is_not_remembered(self, tmp_path):
+        path = str(tmp_path / "snapshots.json")
+        run(path, ["Nokia", "Iphone"], verify=lambda titles: [title for title in titles if title != "Iphone"])
+        assert run(path, ["Nokia", "Iphone"]) == ["Iphone"]
+
+    def test_changed_vocabulary_rechecks_everything(self, tmp_path):
+        path = str(tmp_path / "snapshots.json")
+        run(path, ["Nokia", "Iphone"])
+        vocabulary = dict(VOCABULARY, phone=VOCABULARY["phone"] + ("pixel",))
+        assert run(path, ["Nokia", "Iphone"], classifier=ProductClassifier(vocabulary)) == ["Nokia", "Iphone"]
+        assert run(path, ["Nokia", "Iphone"], classifier=ProductClassifier(vocabulary)) == []
+
+    def test_classifier_version(self):
+        assert ProductClassifier().version == ProductClassifier(dict(VOCABULARY)).version
+        assert ProductClassifier().version != ProductClassifier(whole_words=False).version
+
+    def test_sites_are_stored_separately(self, tmp_path):
+        path = str(tmp_path / "snapshots.json")
+        run(path, ["Nokia"])
+        live = CatalogSnapshots(path, "live")
+        assert live.titles_to_check("phone", ["Nokia"]) == ["Nokia"]
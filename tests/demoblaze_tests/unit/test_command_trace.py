@@ -0,0 +1,91 @@
+import json
+import pytest
+import allure
+from ..utils.command_trace import TraceFile, read_trace, repeated_lookups, replay, summarize_traces
+
+
+def command(name, at=0.0, seconds=0.1, locator=None, element=None):
+    record = {"at": at, "command": name, "seconds": seconds, "request_bytes": 10, "response_bytes": 20, "ok": True}
+    if locator is not None:
+        record["locator"] = locator
+    if element is not None:
+        record["element"] = element
+    return record
+
+
+def write_trace(path, nodeid, commands):
+    with open(path, "w", encoding="utf-8") as file:
+        for record in [{"nodeid": nodeid}] + commands:
+            file.write(json.dumps(record) + "\n")
+
+
+@allure.feature('Инфраструктура тестов')
+@allure.story('Трассы команд WebDriver')
+class TestCommandTrace:
+    """Запись трасс, поиск повторных поисков, сводка и переигрывание"""
+
+    def test_trace_file_records_command(self, tmp_path):
+        path = str(tmp_path / "trace.jsonl")
+        trace = TraceFile(path, "tests/test_x.py::test_y")
+        trace.on_command("findChildElement", {"using": "css selector", "value": "h4 a", "id": "e1"}, 0.01,
+                         {"value": {"element-6066": "e2"}})
+        trace.on_command("click", {"id": "e2"}, 0.02, None)
+        trace.close()
+
+        nodeid, commands = read_trace(path)
+        assert nodeid == "tests/test_x.py::test_y"
+        assert commands[0]["locator"] == "css selector=h4 a" and commands[0]["element"] == "e1"
+        assert commands[0]["response_bytes"] == len(json.dumps({"element-6066": "e2"}))
+        assert commands[1]["ok"] is False and commands[1]["response_bytes"] == 0
+
+    def test_repeated_lookups(self):
+        commands = [
+            command("findElement", locator="id=login2"),
+            command("findElement", locator="id=login2"),
+            # Другой способ поиска или другой родительский элемент - не повтор
+            command("findElements", locator="id=login2"),
+            command("findChildElement", locator="css selector=a", element="card1"),
+            command("findChildElement", locator="css selector=a", element="card2"),
+            command("click", element="x"),
+            command("findElement", locator="id=login2"),
+            # После навигации элементы ищутся заново
+            command("get"),
+            command("findElement", locator="id=login2"),
+            command("findChildElement", locator="css selector=a", element="card1"),
+        ]
+        repeated = repeated_lookups(commands)
+        assert [item is commands[index] for item, index in zip(repeated, [1, 6])] == [True, True]
+        assert len(repeated) == 2
+
+    def test_summarize_traces(self, tmp_path):
+        write_trace(tmp_path / "a.jsonl", "test_a", [
+            command("get", seconds=0.5),
+            command("findElement", seconds=0.1, locator="id=x"),
+            command("findElement", seconds=0.3, locator="id=x"),
+        ])
+        write_trace(tmp_path / "b.jsonl", "test_b", [command("findElement", seconds=0.2, locator="id=y")])
+        (tmp_path / "notes.txt").write_text("не трасса")
+
+        summary = summarize_traces(str(tmp_path))
+        assert [(test["nodeid"], test["commands"], test["repeated_lookups"]) for test in summary["tests"]] == [
+            ("test_a", 3, 1), ("test_b", 1, 0)
+        ]
+        find = summary["commands"]["findElement"]
+        assert find["count"] == 3 and find["total"] == pytest.approx(0.6)
+        assert find["request_bytes"] == 30 and find["response_bytes"] == 60
+        assert summary["repeated_locators"] == {"id=x": 1}
+        assert summary["repeated_seconds"] == pytest.approx(0.3)
+
+    def test_replay_keeps_time_between_commands(self):
+        commands = [
+            command("get", at=0.0, seconds=0.5),
+            command("findElement", at=0.6, seconds=0.1, locator="id=x"),
+            command("findElement", at=0.8, seconds=0.1, locator="id=x"),
+        ]
+        assert replay(commands) == (pytest.approx(0.9), pytest.approx(0.9))
+        assert replay(commands, skip_repeated=True) == (pytest.approx(0.9), pytest.approx(0.8))
+        assert replay(commands, latency=0.02)[1] == pytest.approx(0.96)
+        assert replay(commands, skip_repeated=True, latency=0.02)[1] == pytest.approx(0.84)
+
+    def test_replay_empty_trace(self):
+        assert replay([]) == (0.0, 0.0)
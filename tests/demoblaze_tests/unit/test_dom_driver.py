@@ -0,0 +1,113 @@
+import os
+import re
+import pytest
+import allure
+from ..pages.main_page import MainPage
+from ..stub.server import SITE_DIR
+from ..utils import driver_pool, wait_engine
+from ..utils.dom_driver import DomDriver, SITE_ALERTS, card_html, parse_html
+
+# Модули и классы, которые объявляют скрипты execute_script (константы *_SCRIPT)
+SCRIPT_OWNERS = [MainPage, driver_pool, wait_engine]
+
+# Скрипты, которым не нужна реализация без браузера
+BROWSER_ONLY_SCRIPTS = {
+    # Общая часть других скриптов, отдельно не выполняется
+    wait_engine.WATCHER_SCRIPT,
+    # Асинхронный скрипт: у DomDriver нет execute_async_script, ожидания идут опросом
+    wait_engine.WAIT_FOR_CHANGE_SCRIPT,
+}
+
+# Аргументы скриптов для сравнения с браузером
+SCRIPT_ARGS = {wait_engine.PAGE_STATE_SCRIPT: (50, 500)}
+
+
+def site_source():
+    with open(os.path.join(SITE_DIR, "index.html"), encoding="utf-8") as file:
+        return file.read()
+
+
+def declared_scripts():
+    """Все скрипты execute_script, объявленные в коде тестов"""
+    return {
+        value.strip(): f"{getattr(owner, '__name__', owner)}.{name}"
+        for owner in SCRIPT_OWNERS
+        for name, value in vars(owner).items()
+        if name.endswith("_SCRIPT") and isinstance(value, str)
+    }
+
+
+def js_concat(expression, values):
+    """Значение JS-выражения из строк и переменных, соединенных через +"""
+    parts = []
+    for single, double, name in re.findall(r"'([^']*)'|\"([^\"]*)\"|([\w.]+)", expression):
+        parts.append(str(values[name]) if name else single or double)
+    return "".join(parts)
+
+
+def dump(node):
+    """Дерево узлов в виде, удобном для сравнения"""
+    if node.tag == "#text":
+        return node.data
+    return node.tag, sorted(node.attrs.items()), [dump(child) for child in node.children]
+
+
+@allure.feature('Инфраструктура тестов')
+@allure.story('Драйвер без браузера')
+class TestDomDriverMatchesSite:
+    """Python-копия поведения локального сайта совпадает со скриптом stub/site/index.html"""
+
+    def test_page_functions_match_site(self):
+        source = site_source()
+        onclick = set(re.findall(r'onclick="(\w+)\(', source))
+        functions = set(re.findall(r"function (\w+)\(", source))
+        assert onclick == set(DomDriver.PAGE_FUNCTIONS), "onclick сайта и DomDriver.PAGE_FUNCTIONS разошлись"
+        assert onclick <= functions
+        for method in DomDriver.PAGE_FUNCTIONS.values():
+            assert callable(getattr(DomDriver, method, None)), f"В DomDriver нет метода {method}"
+
+    def test_alerts_match_site(self):
+        alerts = set(re.findall(r'alert\("([^"]*)"\)', site_source()))
+        assert alerts == set(SITE_ALERTS)
+
+    def test_card_markup_matches_site(self):
+        source = site_source()
+        render = source[source.index("function renderItems"):source.index("function byCat")]
+        item = {"id": 7, "img": "imgs/nokia.jpg", "title": "Nokia lumia 1520", "price": 820, "desc": "Описание"}
+        values = {f"item.{key}": value for key, value in item.items()}
+        values["link"] = js_concat(re.search(r"var link = (.*?);", render).group(1), values)
+        site_card = js_concat(re.search(r'insertAdjacentHTML\("beforeend",(.*?)\);', render, re.S).group(1), values)
+        assert dump(parse_html(card_html(item))) == dump(parse_html(site_card))
+
+
+@allure.feature('Инфраструктура тестов')
+@allure.story('Драйвер без браузера')
+class TestBrowserlessScripts:
+    """Скрипты execute_script и их Python-реализации для DomDriver"""
+
+    def test_page_scripts_are_registered(self):
+        browser_only = {script.strip() for script in BROWSER_ONLY_SCRIPTS}
+        missing = [
+            name for script, name in declared_scripts().items()
+            if script not in browser_only and script not in DomDriver.SCRIPT_HANDLERS
+        ]
+        assert not missing, f"Нет реализации без браузера (@browserless_script): {', '.join(missing)}"
+
+    @pytest.mark.needs_browser
+    def test_handlers_match_browser(self, driver):
+        """Реализация без браузера возвращает то же, что скрипт в браузере (нужен настоящий браузер)"""
+        if isinstance(driver, DomDriver):
+            pytest.skip("Сравнение с браузером не имеет смысла для DomDriver")
+        page = MainPage(driver)
+        page.open()
+
+        def compare():
+            page.wait_for_stable_page()
+            for script, handler in DomDriver.SCRIPT_HANDLERS.items():
+                args = SCRIPT_ARGS.get(script, ())
+                assert handler(driver, *args) == driver.execute_script(script, *args), \
+                    f"Реализация {handler.__name__} разошлась со скриптом:\n{script}"
+
+        compare()
+        page.open_login_modal()
+        compare()
@@ -0,0 +1,139 @@
+import pytest
+import allure
+from selenium.common.exceptions import NoAlertPresentException, WebDriverException
+from ..utils.driver_pool import OPEN_MODALS_SCRIPT, DriverPool
+
+BASE_URL = "http://site.test/"
+
+
+class FakeAlert:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def dismiss(self):
+        self.driver.alert_open = False
+
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    @property
+    def alert(self):
+        if not self.driver.alive:
+            raise WebDriverException("Браузер закрыт")
+        if not self.driver.alert_open:
+            raise NoAlertPresentException()
+        return FakeAlert(self.driver)
+
+
+class FakeDriver:
+    """Браузер, состояние которого задает тест"""
+
+    def __init__(self):
+        self.alive = True
+        self.alert_open = False
+        self.open_modals = 0
+        self.cookies = {"session": "1"}
+        self.visited = []
+        self.quit_called = False
+        self.switch_to = FakeSwitchTo(self)
+
+    @property
+    def window_handles(self):
+        if not self.alive:
+            raise WebDriverException("Браузер закрыт")
+        return ["main"]
+
+    def get(self, url):
+        if not self.alive:
+            raise WebDriverException("Браузер закрыт")
+        self.visited.append(url)
+
+    def delete_all_cookies(self):
+        self.cookies.clear()
+
+    def execute_script(self, script):
+        if script == OPEN_MODALS_SCRIPT:
+            return self.open_modals
+        return None
+
+    def quit(self):
+        self.quit_called = True
+
+
+def make_pool(size=1):
+    started = []
+
+    def factory():
+        started.append(FakeDriver())
+        return started[-1]
+
+    return DriverPool(factory, BASE_URL, size=size), started
+
+
+@allure.feature('Инфраструктура тестов')
+@allure.story('Пул браузеров')
+class TestDriverPool:
+    """Сброс, проверка чистоты и повторное использование браузеров пула"""
+
+    def test_released_driver_is_reset_and_reused(self):
+        pool, started = make_pool()
+        driver = pool.acquire()
+        driver.alert_open = True
+        pool.release(driver)
+
+        assert pool.acquire() is driver
+        assert not driver.alert_open and driver.cookies == {}
+        assert driver.visited == [BASE_URL, BASE_URL]
+        assert pool.stats()["starts"] == 1 and pool.saved_starts == 1
+
+    def test_broken_driver_is_replaced(self):
+        pool, started = make_pool()
+        driver = pool.acquire()
+        pool.release(driver)
+        driver.alive = False
+
+        replacement = pool.acquire()
+        assert replacement is not driver and driver.quit_called
+        assert pool.replaced == 1 and len(started) == 2
+
+    def test_pool_keeps_at_most_size_idle_drivers(self):
+        pool, started = make_pool(size=1)
+        first, second = pool.acquire(), pool.acquire()
+        pool.release(first)
+        pool.release(second)
+        assert second.quit_called and not first.quit_called
+
+    @pytest.mark.parametrize("alert_open, open_modals, alive, clean", [
+        (False, 0, True, True),
+        (True, 0, True, False),
+        (False, 1, True, False),
+        (False, 0, False, False),
+    ])
+    def test_is_clean(self, alert_open, open_modals, alive, clean):
+        pool, _ = make_pool()
+        driver = FakeDriver()
+        driver.alert_open, driver.open_modals, driver.alive = alert_open, open_modals, alive
+        assert pool.is_clean(driver) is clean
+
+    def test_reuse_keeps_clean_driver_state(self):
+        pool, _ = make_pool()
+        driver = pool.acquire()
+        driver.cookies["token"] = "x"
+
+        assert pool.reuse(driver) is driver
+        assert driver.cookies["token"] == "x" and pool.shared_uses == 1
+
+    def test_reuse_recycles_dirty_driver(self):
+        pool, started = make_pool()
+        driver = pool.acquire()
+        driver.open_modals = 1
+
+        replacement = pool.reuse(driver)
+        assert replacement is not driver and driver.quit_called
+        assert pool.recycled == 1 and len(started) == 2
+
+    def test_merge_stats(self):
+        total = DriverPool.merge_stats([{"starts": 1, "leases": 3}, {"starts": 2, "leases": 2, "recycled": 1}])
+        assert total["starts"] == 3 and total["leases"] == 5 and total["recycled"] == 1
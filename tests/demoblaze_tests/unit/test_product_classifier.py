@@ -0,0 +1,49 @@
+import pytest
+import allure
+from ..utils.product_classifier import ProductClassifier, product_classifier
+
+
+@allure.feature('Инфраструктура тестов')
+@allure.story('Классификатор товаров')
+class TestProductClassifier:
+    """Категория товара по названию: самое длинное совпадение, веса слов и ничьи"""
+
+    @pytest.mark.parametrize("title, category, evidence", [
+        ("Samsung galaxy s6", "phone", ("samsung galaxy",)),
+        ("Sony xperia z5", "phone", ("sony xperia",)),
+        ("Sony vaio i5", "notebook", ("sony vaio",)),
+        ("MacBook air", "notebook", ("macbook",)),
+        ("ASUS Full HD", "monitor", ("asus full hd",)),
+        ("Apple monitor 24", "monitor", ("monitor",)),
+        ("Unknown gadget", None, ()),
+    ])
+    def test_site_titles(self, title, category, evidence):
+        assert product_classifier.classify(title) == (title, category, evidence)
+
+    def test_titles_do_not_share_evidence(self):
+        titles = ["Nokia lumia 1520", "", "Dell i7 8gb", "HTC One M9"]
+        result = product_classifier.classify_all(titles)
+        assert [item.title for item in result] == titles
+        assert [item.category for item in result] == ["phone", None, "notebook", "phone"]
+        assert result[0].evidence == ("nokia", "lumia")
+
+    def test_empty_list(self):
+        assert product_classifier.classify_all([]) == []
+
+    def test_whole_words(self):
+        assert product_classifier.classify("Nokiaphone").category is None
+        substring = ProductClassifier({"phone": ("nokia",)}, whole_words=False)
+        assert substring.classify("Nokiaphone").category == "phone"
+
+    def test_longer_evidence_wins(self):
+        classifier = ProductClassifier({"a": ("x1", "x2"), "b": ("longer",)})
+        assert classifier.classify("x1 x2 longer").category == "b"
+        assert classifier.classify("x1 x2 x1 long").category == "a"
+
+    def test_tie_goes_to_first_found_word(self):
+        classifier = ProductClassifier({"a": ("foo",), "b": ("bar",)})
+        assert classifier.classify("bar foo").category == "b"
+        assert classifier.classify("foo bar").category == "a"
+
+    def test_categories(self):
+        assert product_classifier.categories == ("phone", "notebook", "monitor")
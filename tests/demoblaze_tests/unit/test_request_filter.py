@@ -0,0 +1,46 @@
+import pytest
+import allure
+from ..utils.request_filter import FilterRules
+
+
+@allure.feature('Инфраструктура тестов')
+@allure.story('Фильтр запросов браузера')
+class TestFilterRules:
+    """Какие запросы блокирует фильтр и по какому правилу"""
+
+    @pytest.mark.parametrize("url, category", [
+        ("http://site.test/imgs/galaxy_s6.JPG", "images"),
+        ("http://site.test/imgs/logo.svg?v=2", "images"),
+        ("http://site.test/fonts/roboto.woff2", "fonts"),
+        ("https://www.google-analytics.com/analytics.js", "analytics"),
+        ("https://mc.yandex.ru/watch/1", "analytics"),
+        ("http://site.test/index.html", None),
+        # Совпадение по концу имени хоста, а не по подстроке
+        ("https://notdoubleclick.net/x.js", None),
+    ])
+    def test_categories(self, url, category):
+        rules = FilterRules(block=["images", "fonts", "analytics"])
+        assert rules.match(url) == category
+
+    def test_url_pattern(self):
+        rules = FilterRules(block=["*/api/bycat*"])
+        assert rules.match("http://site.test/api/bycat") == "*/api/bycat*"
+        assert rules.match("http://site.test/api/entries") is None
+
+    def test_allow_wins_over_block(self):
+        rules = FilterRules(block=["images"], allow=["*/imgs/logo.png"])
+        assert rules.match("http://site.test/imgs/logo.png") is None
+        assert rules.match("http://site.test/imgs/nokia.png") == "images"
+
+    def test_first_matching_rule_is_reported(self):
+        rules = FilterRules(block=["*/imgs/*", "images"])
+        assert rules.match("http://site.test/imgs/nokia.png") == "*/imgs/*"
+
+    def test_merged_test_rules(self):
+        run_rules = FilterRules(block=["images", "analytics"], allow=["*/keep/*"])
+        rules = run_rules.merged(block=["fonts"], allow=["*/cdn/*"], unblock=["images"])
+        assert rules.block == ("analytics", "fonts")
+        assert rules.allow == ("*/keep/*", "*/cdn/*")
+        assert rules.match("http://site.test/imgs/nokia.png") is None
+        # Правила запуска не меняются
+        assert run_rules.block == ("images", "analytics")
@@ -0,0 +1,171 @@
+import pytest
+import allure
+from selenium.common.exceptions import TimeoutException
+from ..pages import base_page as base_page_module
+from ..pages.base_page import BasePage
+from ..utils import retry_policy as retry_policy_module
+from ..utils.retry_policy import RetryPolicy
+
+
+class FakeClock:
+    """Время, которое идет только при паузах и ожиданиях"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def perf_counter(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+
+class Step:
+    """Ожидание, которое занимает весь таймаут и выполняется с попытки succeed_on (None - никогда)"""
+
+    def __init__(self, clock, succeed_on=None):
+        self.clock = clock
+        self.succeed_on = succeed_on
+        self.timeouts = []
+
+    def __call__(self, timeout):
+        self.timeouts.append(timeout)
+        if len(self.timeouts) == self.succeed_on:
+            return "ok"
+        self.clock.now += timeout
+        raise TimeoutException("Условие не выполнено")
+
+
+class FakeWaitEngine:
+    """Ожидание условия выполняется, только если действие шага выполнено succeed_on раз"""
+
+    def __init__(self, clock, actions, succeed_on):
+        self.clock = clock
+        self.actions = actions
+        self.succeed_on = succeed_on
+
+    def until(self, condition, timeout):
+        if len(self.actions) >= self.succeed_on:
+            return True
+        self.clock.now += timeout
+        raise TimeoutException("Условие не выполнено")
+
+
+class FakeDriver:
+    pass
+
+
+def make_page(clock, actions, succeed_on):
+    driver = FakeDriver()
+    driver._wait_engine = FakeWaitEngine(clock, actions, succeed_on)
+    return BasePage(driver)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(retry_policy_module, "time", clock)
+    return clock
+
+
+def make_policy(retries, test_budget=30.0, run_deadline=None):
+    policy = RetryPolicy()
+    policy.configure(retries, test_budget=test_budget, run_deadline=run_deadline)
+    policy.begin_test()
+    return policy
+
+
+@allure.feature('Инфраструктура тестов')
+@allure.story('Повторы шагов')
+class TestRetryPolicy:
+    """Повторы упавших шагов и учет бюджета теста"""
+
+    def test_disabled_policy_raises_immediately(self, clock):
+        policy = make_policy(0)
+        step = Step(clock)
+        with pytest.raises(TimeoutException):
+            policy.call("step", step, 10)
+        assert step.timeouts == [10] and clock.sleeps == []
+
+    def test_recovered_step(self, clock):
+        policy = make_policy(3)
+        step = Step(clock, succeed_on=3)
+        assert policy.call("step", step, 10) == "ok"
+        assert clock.sleeps == [0.5, 1.0]
+        assert step.timeouts == [10, 10, 10]
+        records = policy.end_test()
+        assert [(record["attempt"], record["recovered"]) for record in records] == [(1, False), (2, True)]
+        assert policy.totals == {"retries": 2, "recovered": 1, "seconds": pytest.approx(11.5), "tests": 1}
+
+    def test_retries_stop_when_budget_is_spent(self, clock):
+        policy = make_policy(5, test_budget=12)
+        step = Step(clock)
+        with pytest.raises(TimeoutException):
+            policy.call("step", step, 10)
+        # Первый повтор: пауза 0.5 + 10 с ожидания = 10.5 с из 12; на второй (пауза 1 с) остается 1.5 с
+        assert step.timeouts == [10, 10, 0.5]
+        assert policy.remaining() == pytest.approx(0)
+        # Бюджет исчерпан - следующий шаг теста не повторяется
+        step = Step(clock)
+        with pytest.raises(TimeoutException):
+            policy.call("next", step, 10)
+        assert step.timeouts == [10]
+
+    def test_budget_is_per_test(self, clock):
+        policy = make_policy(1, test_budget=5)
+        with pytest.raises(TimeoutException):
+            policy.call("step", Step(clock), 10)
+        assert policy.remaining() == pytest.approx(0)
+        policy.end_test()
+        policy.begin_test()
+        assert policy.remaining() == 5
+
+    def test_first_attempt_is_not_charged(self, clock):
+        policy = make_policy(1)
+        assert policy.call("step", Step(clock, succeed_on=1), 10) == "ok"
+        assert policy.remaining() == 30 and policy.end_test() == []
+
+    def test_no_retries_after_run_deadline(self, clock):
+        policy = make_policy(3, run_deadline=15)
+        clock.now = 14.8
+        step = Step(clock)
+        with pytest.raises(TimeoutException):
+            policy.call("step", step, 10)
+        assert step.timeouts == [10]
+
+    def test_delay_is_capped(self, clock):
+        policy = make_policy(6, test_budget=1000)
+        with pytest.raises(TimeoutException):
+            policy.call("step", Step(clock), 1)
+        assert clock.sleeps == [0.5, 1.0, 2.0, 4.0, 4.0, 4.0]
+
+    def test_step_repeats_action(self, clock, monkeypatch):
+        policy = make_policy(2)
+        monkeypatch.setattr(base_page_module, "retry_policy", policy)
+        actions = []
+        # Первый клик не сработал - результат появляется только после повторного клика
+        page = make_page(clock, actions, succeed_on=2)
+
+        assert page._step("click", lambda: actions.append("click"), condition=None, timeout=10)
+        assert actions == ["click", "click"]
+        assert [record["recovered"] for record in policy.end_test()] == [True]
+
+    def test_step_is_not_repeated_without_policy(self, clock, monkeypatch):
+        monkeypatch.setattr(base_page_module, "retry_policy", make_policy(0))
+        actions = []
+        page = make_page(clock, actions, succeed_on=2)
+
+        with pytest.raises(TimeoutException):
+            page._step("click", lambda: actions.append("click"), condition=None, timeout=10)
+        assert actions == ["click"]
+
+    def test_merge_totals(self):
+        policy = RetryPolicy()
+        policy.merge({"retries": 2, "recovered": 1, "seconds": 3.0, "tests": 1})
+        policy.merge({"retries": 1, "recovered": 0, "seconds": 1.0, "tests": 1})
+        assert policy.to_dict() == {"retries": 3, "recovered": 1, "seconds": 4.0, "tests": 2}
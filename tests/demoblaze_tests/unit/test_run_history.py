@@ -0,0 +1,68 @@
+import allure
+from ..utils.run_history import HISTORY_DEPTH, RunHistory
+
+
+def history_with(tmp_path, runs):
+    """История после нескольких запусков: runs - список {nodeid: (длительность, упал)}"""
+    history = RunHistory()
+    path = str(tmp_path / "history.json")
+    for run in runs:
+        history.load(path)
+        for nodeid, (duration, failed) in run.items():
+            history.record(nodeid, duration, failed)
+        history.save()
+    history.load(path)
+    return history
+
+
+@allure.feature('Инфраструктура тестов')
+@allure.story('Порядок тестов по истории')
+class TestRunHistory:
+    """Порядок тестов и прогноз времени запуска по истории"""
+
+    def test_phases_are_summed_and_history_is_trimmed(self, tmp_path):
+        history = RunHistory()
+        path = str(tmp_path / "history.json")
+        for run in range(HISTORY_DEPTH + 2):
+            history.load(path)
+            history.record("a", 1.0, False)
+            history.record("a", float(run), run == 0)
+            history.save()
+
+        history.load(path)
+        entry = history.tests["a"]
+        assert entry["durations"] == [1.0 + run for run in range(2, HISTORY_DEPTH + 2)]
+        assert entry["outcomes"] == [True] * HISTORY_DEPTH
+
+    def test_recent_failures_first_then_longest(self, tmp_path):
+        history = history_with(tmp_path, [
+            {"stable_short": (1, False), "stable_long": (9, False), "flaky": (2, True), "failed": (1, False)},
+            {"stable_short": (1, False), "stable_long": (9, False), "flaky": (2, False), "failed": (1, True)},
+        ])
+        order = history.order(["stable_short", "new", "flaky", "stable_long", "failed"])
+        # Нет истории - ожидаемая длительность равна медиане известных тестов (1.5 с)
+        assert order == ["failed", "flaky", "stable_long", "new", "stable_short"]
+
+    def test_group_stays_together(self, tmp_path):
+        history = history_with(tmp_path, [{"A::1": (2, False), "A::2": (2, False), "B::1": (3, False)}])
+        order = history.order(["B::1", "A::1", "A::2"], group_of=lambda nodeid: nodeid.split("::")[0])
+        # Группа A суммарно дольше (4 с) - идет первой, ее тесты рядом
+        assert order == ["A::1", "A::2", "B::1"]
+
+    def test_failed_test_pulls_its_group_forward(self, tmp_path):
+        history = history_with(tmp_path, [{"A::1": (5, False), "B::1": (1, True), "B::2": (1, False)}])
+        order = history.order(["A::1", "B::1", "B::2"], group_of=lambda nodeid: nodeid.split("::")[0])
+        assert order == ["B::1", "B::2", "A::1"]
+
+    def test_predict_makespan(self, tmp_path):
+        history = history_with(tmp_path, [{"a": (4, False), "b": (3, False), "c": (3, False), "d": (2, False)}])
+        assert history.predict_makespan(["a", "b", "c", "d"], workers=1) == 12
+        # a -> воркер 1, b -> воркер 2, c -> воркер 2 (3 < 4), d -> воркер 1
+        assert history.predict_makespan(["a", "b", "c", "d"], workers=2) == 6
+        assert history.predict_makespan(["a"], workers=0) == 4
+
+    def test_empty_history_uses_one_second_per_test(self, tmp_path):
+        history = RunHistory()
+        history.load(str(tmp_path / "missing.json"))
+        assert history.order(["b", "a"]) == ["b", "a"]
+        assert history.predict_makespan(["a", "b", "c"], workers=2) == 2.0
@@ -0,0 +1,91 @@
+import pytest
+import allure
+from ..pages.main_page import MainPage
+from ..stub import catalog
+from ..stub.server import StubServer
+from ..utils import wait_engine as wait_engine_module
+from ..utils.wait_engine import LATE_WATCHER_QUIET_SECONDS, WaitEngine, install_page_watcher
+
+# Задержка API локальной копии сайта: первый запрос каталога заканчивается после загрузки страницы,
+# но раньше, чем окно после поздней установки наблюдателя
+API_DELAY = LATE_WATCHER_QUIET_SECONDS / 2
+
+
+class FakeDriver:
+    """Драйвер, который отдает заранее заданные состояния страницы"""
+
+    def __init__(self, states, capabilities=None):
+        self.states = list(states)
+        self.capabilities = capabilities or {}
+        self.calls = []
+
+    def execute_script(self, script, *args):
+        self.calls.append(args)
+        return self.states.pop(0)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def perf_counter(self):
+        return self.now
+
+
+@pytest.fixture
+def slow_site():
+    server = StubServer(api_delay=API_DELAY).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def browser(firefox_launcher, browser_profile):
+    """Отдельный браузер: страницы медленного сайта не должны попасть в пул"""
+    driver = firefox_launcher.launch(browser_profile)
+    yield driver
+    driver.quit()
+
+
+def card_count(driver):
+    return len(driver.find_elements(*MainPage.PRODUCT_CARDS))
+
+
+@allure.feature('Инфраструктура тестов')
+@allure.story('Ожидания стабильной страницы')
+class TestPageWatcher:
+    """Страница не считается стабильной, пока не пришли запросы, начатые до установки наблюдателя"""
+
+    def test_late_watcher_settles_after_quiet_window(self, monkeypatch):
+        clock = FakeClock()
+        monkeypatch.setattr(wait_engine_module, "time", clock)
+        stable = {"stable": True, "reason": "", "settle_in": 0}
+        driver = FakeDriver([{"stable": False, "reason": "watcher", "settle_in": 400}, stable])
+
+        WaitEngine(driver).settle(timeout=5)
+
+        assert clock.sleeps == [0.4]
+        assert driver.calls[0] == (50, int(LATE_WATCHER_QUIET_SECONDS * 1000))
+
+    def test_watcher_is_not_preloaded_without_bidi(self):
+        assert install_page_watcher(FakeDriver([])) is False
+
+    @pytest.mark.needs_browser
+    def test_settle_waits_for_initial_catalog_request(self, browser, slow_site):
+        browser.get(slow_site.url)
+        WaitEngine(browser).settle(timeout=10)
+        assert card_count(browser) == len(catalog.entries()["Items"])
+
+    @pytest.mark.needs_browser
+    def test_settle_waits_after_late_watcher_install(self, browser, slow_site):
+        browser.get(slow_site.url)
+        # Наблюдатель из preload-скрипта убирается: следующий ставится в уже загруженную страницу
+        # и не видит запрос каталога, который начался до него
+        browser.execute_script("delete window.__pageWatcher;")
+        WaitEngine(browser).settle(timeout=10)
+        assert card_count(browser) == len(catalog.entries()["Items"])
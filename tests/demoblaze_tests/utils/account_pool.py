@@ -0,0 +1,201 @@
+"""
+Пул тестовых аккаунтов
+Аккаунты создаются заранее пачкой через API и выдаются тестам в эксклюзивную аренду:
+два теста (в том числе на разных воркерах xdist) никогда не работают под одним аккаунтом.
+Пул хранится в .cache/account_pool.json и переиспользуется между запусками.
+Перед арендой аккаунт проверяется входом через API, неработающие аккаунты удаляются из пула
+"""
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import URLError
+from .api_client import ApiError, DemoblazeApi
+from .config import Config
+from .json_store import file_lock, load_json, save_json
+from .parallel import worker_id
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+Account = namedtuple("Account", ["username", "password"])
+
+# Сколько аккаунтов регистрировать одновременно
+SIGNUP_THREADS = 8
+
+# Аккаунт живого сайта, который не проверялся дольше этого (секунды), перед арендой
+# проверяется входом через API: сайт мог удалить пользователя
+VERIFY_AFTER_SECONDS = 6 * 60 * 60
+
+
+def pid_alive(pid):
+    """Жив ли процесс, который арендовал аккаунт (аренды упавших запусков освобождаются)"""
+    if psutil is not None:
+        return psutil.pid_exists(pid)
+    if os.path.isdir("/proc"):
+        return os.path.exists(f"/proc/{pid}")
+    return True
+
+
+class AccountPool:
+    """Аккаунты для тестов логина с арендой через файл, общий для всех воркеров"""
+
+    def __init__(self, path, site, api=None, size=4):
+        # site - live или stub: у каждого сайта свои аккаунты
+        self.path = path
+        self.site = site
+        self.api = api or DemoblazeApi()
+        self.size = size
+
+    def provision(self):
+        """
+        Дополнить пул до size аккаунтов одной пачкой запросов
+        Локальная копия сайта хранит пользователей в памяти, поэтому на ней
+        сохраненные аккаунты регистрируются заново при каждом запуске
+        """
+        with file_lock(self.path):
+            data, pool = self._load()
+            accounts = [Account(**account) for account in pool["accounts"]]
+            new = [self._new_account() for _ in range(max(self.size - len(accounts), 0))]
+            if self.site == "stub":
+                accounts = self._register(accounts, existing_ok=True)
+                self._mark_verified(pool, accounts)
+            registered = self._register(new)
+            self._mark_verified(pool, registered)
+            accounts += registered
+            pool["accounts"] = [account._asdict() for account in accounts]
+            save_json(self.path, data)
+
+    def acquire(self):
+        """
+        Взять свободный аккаунт, под которым можно войти; если таких нет, создается еще один
+        Под блокировкой файла аккаунт только выбирается и помечается арендованным:
+        проверка через API идет без блокировки, чтобы воркеры не ждали друг друга.
+        Аккаунт, под которым войти не удалось, удаляется из пула
+        """
+        tried = set()
+        while True:
+            with file_lock(self.path):
+                data, pool = self._load()
+                leases = self._live_leases(pool)
+                account = next((
+                    Account(**account) for account in pool["accounts"]
+                    if account["username"] not in leases and account["username"] not in tried
+                ), None)
+                if account is not None:
+                    self._lease(data, pool, leases, account)
+                    verified_at = pool["verified"].get(account.username, 0)
+            if account is None:
+                break
+
+            tried.add(account.username)
+            verified = self._verify(account, verified_at)
+            if verified:
+                if verified_at != verified:
+                    with file_lock(self.path):
+                        data, pool = self._load()
+                        pool["verified"][account.username] = verified
+                        save_json(self.path, data)
+                return account
+            # Аккаунт не подошел: аренда снимается, неработающий аккаунт удаляется
+            with file_lock(self.path):
+                data, pool = self._load()
+                pool["leases"].pop(account.username, None)
+                if verified is False:
+                    self._drop(pool, account)
+                save_json(self.path, data)
+
+        registered = self._register([self._new_account()])
+        if not registered:
+            raise ApiError("Не удалось создать аккаунт для пула")
+        account = registered[0]
+        with file_lock(self.path):
+            data, pool = self._load()
+            pool["accounts"].append(account._asdict())
+            self._mark_verified(pool, registered)
+            self._lease(data, pool, self._live_leases(pool), account)
+        return account
+
+    def release(self, account):
+        """Вернуть аккаунт в пул после теста (браузер при сбросе разлогинивается)"""
+        with file_lock(self.path):
+            data, pool = self._load()
+            pool["leases"].pop(account.username, None)
+            save_json(self.path, data)
+
+    def _load(self):
+        data = load_json(self.path, {})
+        pool = data.setdefault(self.site, {})
+        pool.setdefault("accounts", [])
+        pool.setdefault("leases", {})
+        # username -> когда под аккаунтом последний раз удалось войти (или он был создан)
+        pool.setdefault("verified", {})
+        return data, pool
+
+    def _verify(self, account, verified_at):
+        """
+        Можно ли войти под аккаунтом (без блокировки файла пула)
+        Возвращает время успешной проверки (истина), False (аккаунт не работает) или None (API недоступно)
+        На локальной копии сайта аккаунт проверяется всегда, на живом сайте - если давно не проверялся
+        """
+        if self.site != "stub" and time.time() - verified_at < VERIFY_AFTER_SECONDS:
+            return verified_at
+        try:
+            if self.site == "stub":
+                # У каждого воркера своя локальная копия сайта, аккаунт мог быть создан другим воркером
+                try:
+                    self.api.signup(account.username, account.password)
+                except ApiError as error:
+                    if "already exist" not in str(error):
+                        raise
+            self.api.login(account.username, account.password)
+        except ApiError:
+            return False
+        except URLError:
+            return None
+        return time.time()
+
+    @staticmethod
+    def _live_leases(pool):
+        """Аренды живых процессов (аренды упавших запусков освобождаются)"""
+        return {username: lease for username, lease in pool["leases"].items() if pid_alive(lease["pid"])}
+
+    def _lease(self, data, pool, leases, account):
+        """Пометить аккаунт арендованным этим процессом и сохранить пул (под блокировкой файла)"""
+        leases[account.username] = {"pid": os.getpid(), "worker": worker_id()}
+        pool["leases"] = leases
+        save_json(self.path, data)
+
+    @staticmethod
+    def _mark_verified(pool, accounts):
+        now = time.time()
+        for account in accounts:
+            pool["verified"][account.username] = now
+
+    @staticmethod
+    def _drop(pool, account):
+        pool["accounts"] = [item for item in pool["accounts"] if item["username"] != account.username]
+        pool["verified"].pop(account.username, None)
+
+    def _new_account(self):
+        return Account(Config.generate_random_username("pool"), Config.generate_random_password())
+
+    def _register(self, accounts, existing_ok=False):
+        """Зарегистрировать аккаунты параллельно, вернуть успешно зарегистрированные"""
+        def signup(account):
+            try:
+                self.api.signup(account.username, account.password)
+                return True
+            except ApiError as error:
+                return existing_ok and "already exist" in str(error)
+            except URLError:
+                return False
+
+        if not accounts:
+            return []
+        with ThreadPoolExecutor(max_workers=min(SIGNUP_THREADS, len(accounts))) as executor:
+            results = list(executor.map(signup, accounts))
+        return [account for account, ok in zip(accounts, results) if ok]
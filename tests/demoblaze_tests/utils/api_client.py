@@ -0,0 +1,66 @@
+import base64
+import json
+import urllib.request
+from .config import Config
+
+
+class ApiError(Exception):
+    """Ошибка, которую вернуло API demoblaze"""
+
+
+class DemoblazeApi:
+    """
+    Клиент API demoblaze
+    Нужен для быстрой подготовки предусловий (создать пользователя, войти) без UI.
+    Методы signup и login принимают те же аргументы, что и одноименные методы MainPage
+    """
+
+    # Cookie, в которой сайт хранит токен авторизации
+    TOKEN_COOKIE = "tokenp_"
+
+    def __init__(self, api_url=None, timeout=10):
+        self.api_url = api_url or Config.API_URL
+        self.timeout = timeout
+
+    def post(self, path, data):
+        """Отправить POST-запрос с JSON и вернуть разобранный ответ"""
+        request = urllib.request.Request(
+            self.api_url + path,
+            data=json.dumps(data).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            body = response.read()
+        return json.loads(body) if body else ""
+
+    @staticmethod
+    def encode_password(password):
+        """Сайт передает пароль в base64 (btoa в JavaScript)"""
+        return base64.b64encode(password.encode()).decode()
+
+    def signup(self, username, password):
+        """Зарегистрировать пользователя, ApiError - если регистрация не удалась"""
+        result = self.post("signup", {"username": username, "password": self.encode_password(password)})
+        if isinstance(result, dict) and result.get("errorMessage"):
+            raise ApiError(result["errorMessage"])
+
+    def login(self, username, password):
+        """Войти и получить токен авторизации"""
+        result = self.post("login", {"username": username, "password": self.encode_password(password)})
+        if isinstance(result, dict):
+            raise ApiError(result.get("errorMessage", "Неожиданный ответ API"))
+        # Ответ в формате "Auth_token: <токен>"
+        return result.replace("Auth_token:", "").strip()
+
+    def check(self, token):
+        """Имя пользователя по токену или None, если токен недействителен"""
+        result = self.post("check", {"token": token})
+        if not isinstance(result, dict) or "Item" not in result:
+            return None
+        return result["Item"]["username"]
+
+    def by_category(self, category):
+        """Товары категории (phone, notebook, monitor) - тот же запрос, что делает byCat() на сайте"""
+        result = self.post("bycat", {"cat": category})
+        return result.get("Items", []) if isinstance(result, dict) else []
@@ -0,0 +1,173 @@
+"""
+Вложения Allure без лишней работы в тестовом потоке
+Вложения попадают в отчет через публичный allure.attach из потока теста.
+В фоновом потоке выполняется только перекодирование скриншотов (Pillow) и запись
+файлов потокового отчета; перекодированные скриншоты прикладываются к отчету
+из потока теста в конце фазы теста (attach_pending)
+"""
+import functools
+import hashlib
+import io
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+import allure
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+
+class AttachmentPipeline:
+    """Вложения отчета и фоновая очередь перекодирования и записи"""
+
+    # Политики скриншотов
+    ALWAYS = "always"
+    ON_FAILURE = "on-failure"
+    NEVER = "never"
+
+    def __init__(self):
+        # Потоковый отчет (--stream-report): вложения пишутся и в него
+        self.stream = None
+        self.screenshot_policy = self.ALWAYS
+        self.image_format = "png"
+        self.image_scale = 1.0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        # Скриншоты, которые перекодируются в фоне: (Future с байтами, имя, тип вложения)
+        self._pending = []
+        self.stats = {"attached": 0, "skipped_screenshots": 0, "failed": 0}
+
+    def configure(self, screenshot_policy=ALWAYS, image_format="png", image_scale=1.0, stream=None):
+        """
+        image_format - png или jpeg (jpeg и уменьшение работают только при установленном Pillow)
+        stream - StreamReport, если включен потоковый отчет
+        """
+        self.stream = stream
+        self.screenshot_policy = screenshot_policy
+        self.image_scale = image_scale
+        self.image_format = image_format if Image is not None else "png"
+
+    def attach(self, body, name=None, attachment_type=None, extension=None):
+        """allure.attach; в потоковый отчет вложение записывается в фоне"""
+        allure.attach(body, name=name, attachment_type=attachment_type, extension=extension)
+        self.stats["attached"] += 1
+        if self.stream is not None:
+            data = body.encode("utf-8") if isinstance(body, str) else body
+            suffix = attachment_type.extension if attachment_type is not None else extension or "txt"
+            write = self._stream(hashlib.sha1(data).hexdigest(), name, suffix)
+            self._enqueue(functools.partial(write, data))
+
+    def screenshot(self, driver, name="screenshot", force=False):
+        """
+        Скриншот страницы по политике скриншотов
+        force=True - снять независимо от политики (используется при падении теста)
+        Возвращает скриншот в PNG (как driver.get_screenshot_as_png) или None,
+        если по политике скриншот не снимался
+        """
+        if not force and self.screenshot_policy != self.ALWAYS:
+            self.stats["skipped_screenshots"] += 1
+            return None
+
+        png = driver.get_screenshot_as_png()
+        if not self._needs_encoding():
+            self.attach(png, name=name, attachment_type=allure.attachment_type.PNG)
+            return png
+
+        # Перекодирование - в фоновом потоке, в отчет скриншот попадет в attach_pending
+        attachment_type = allure.attachment_type.JPG if self.image_format == "jpeg" else allure.attachment_type.PNG
+        write = None
+        if self.stream is not None:
+            write = self._stream(hashlib.sha1(png).hexdigest(), name, attachment_type.extension)
+        future = Future()
+        with self._lock:
+            self._pending.append((future, name, attachment_type))
+        self._enqueue(functools.partial(self._encode, png, future, write))
+        return png
+
+    def attach_pending(self):
+        """Приложить к отчету скриншоты, перекодированные в фоне (вызывается из потока теста)"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for future, name, attachment_type in pending:
+            try:
+                body = future.result()
+            except Exception:
+                # Ошибка уже записана в лог фоновым потоком
+                continue
+            allure.attach(body, name=name, attachment_type=attachment_type)
+            self.stats["attached"] += 1
+
+    def flush(self):
+        """Дождаться фоновой очереди (в конце сессии)"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def _needs_encoding(self):
+        return Image is not None and (self.image_format != "png" or self.image_scale < 1)
+
+    def _encode(self, png, future, write):
+        try:
+            body = self._convert_image(png)
+        except Exception as error:
+            # Например, Pillow не смог прочитать картинку
+            future.set_exception(error)
+            raise
+        future.set_result(body)
+        if write is not None:
+            write(body)
+
+    def _stream(self, digest, name, extension):
+        """Привязать вложение к тесту в потоковом отчете; функция записи файла"""
+        path = self.stream.asset_path(digest, extension)
+        self.stream.add_asset(name, path)
+        return functools.partial(self.stream.write_asset, path)
+
+    def _enqueue(self, task):
+        self._ensure_thread()
+        self._queue.put(task)
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._worker, name="allure-attachments", daemon=True)
+            self._thread.start()
+
+    def _worker(self):
+        while True:
+            task = self._queue.get()
+            try:
+                task()
+            except Exception:
+                # Ошибка теряет только это вложение, поток продолжает работу
+                # (например, OSError при записи в папку отчета)
+                self.stats["failed"] += 1
+                logger.exception("Не удалось подготовить или записать вложение")
+            finally:
+                self._queue.task_done()
+
+    def _convert_image(self, png):
+        """PNG -> байты в нужном формате и масштабе"""
+        image = Image.open(io.BytesIO(png))
+        if self.image_scale < 1:
+            size = (max(1, int(image.width * self.image_scale)), max(1, int(image.height * self.image_scale)))
+            image = image.resize(size)
+        output = io.BytesIO()
+        if self.image_format == "jpeg":
+            image.convert("RGB").save(output, format="JPEG", quality=70)
+        else:
+            image.save(output, format="PNG", optimize=True)
+        return output.getvalue()
+
+
+# Общая очередь вложений для всего запуска
+attachment_pipeline = AttachmentPipeline()
+
+
+def attach(body, name=None, attachment_type=None, extension=None):
+    """allure.attach, который заодно пишет вложение в потоковый отчет"""
+    attachment_pipeline.attach(body, name=name, attachment_type=attachment_type, extension=extension)
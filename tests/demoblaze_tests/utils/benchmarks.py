@@ -0,0 +1,145 @@
+"""
+Бенчмарки операций Page Objects
+Каждая операция выполняется несколько раз подряд, замеряются время и число команд WebDriver.
+Результаты сравниваются с базовыми значениями из .cache/benchmarks.json
+"""
+import threading
+import time
+from .dom_driver import DomDriver
+from .driver_hooks import add_command_listener, remove_command_listener
+from .json_store import file_lock, load_json, save_json
+from .stats import summarize
+
+# Замедление меньше этого не считается регрессией (шум таймера на операциях короче миллисекунды)
+NOISE_FLOOR_SECONDS = 0.002
+
+
+class BenchmarkRegression(AssertionError):
+    """Операция стала медленнее базового значения больше допустимого или делает больше команд"""
+
+
+class Benchmarks:
+    """
+    Замеры бенчмарков за запуск и сравнение с базовыми значениями
+    Включается параметром --bench
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.path = None
+        self.rounds = 10
+        # Допустимое замедление среднего времени, 0.2 - на 20%
+        self.threshold = 0.2
+        # Сохранить результаты запуска как новые базовые значения
+        self.save_baseline = False
+        self._lock = threading.Lock()
+        # вид драйвера -> операция -> сводка
+        self.results = {}
+        # Базовые значения на момент начала запуска (--bench-save перезаписывает файл в конце)
+        self.baselines = {}
+
+    def configure(self, path, rounds=10, threshold=0.2, save_baseline=False):
+        self.enabled = True
+        self.path = path
+        self.rounds = rounds
+        self.threshold = threshold
+        self.save_baseline = save_baseline
+        self.baselines = load_json(path, {})
+
+    @staticmethod
+    def driver_kind(driver):
+        """Базовые значения браузера и драйвера без браузера хранятся отдельно"""
+        return "browserless" if isinstance(driver, DomDriver) else "firefox"
+
+    def run(self, name, driver, action, setup=None):
+        """
+        Выполнить action() rounds раз (плюс один прогрев), перед каждым разом - setup()
+        Время setup в замер не входит. Возвращает сводку; BenchmarkRegression - если операция
+        медленнее базового значения больше чем на threshold или делает больше команд WebDriver
+        """
+        counter = [0]
+
+        def count_command(command, params, seconds, response):
+            counter[0] += 1
+
+        add_command_listener(driver, count_command)
+        seconds = []
+        commands = []
+        try:
+            for round_number in range(self.rounds + 1):
+                if setup is not None:
+                    setup()
+                counter[0] = 0
+                start = time.perf_counter()
+                action()
+                elapsed = time.perf_counter() - start
+                # Первый прогон - прогрев (кеши браузера, первая загрузка страницы)
+                if round_number:
+                    seconds.append(elapsed)
+                    commands.append(counter[0])
+        finally:
+            remove_command_listener(driver, count_command)
+
+        result = summarize(seconds)
+        result["commands"] = sum(commands) / len(commands)
+        kind = self.driver_kind(driver)
+        with self._lock:
+            self.results.setdefault(kind, {})[name] = result
+
+        if not self.save_baseline:
+            self.check(kind, name, result)
+        return result
+
+    def baseline(self, kind, name):
+        return self.baselines.get(kind, {}).get(name)
+
+    def check(self, kind, name, result):
+        """Сравнить замер с базовым значением (без базового значения операция не проверяется)"""
+        baseline = self.baseline(kind, name)
+        if baseline is None:
+            return
+        problems = []
+        limit = max(baseline["mean"] * (1 + self.threshold), baseline["mean"] + NOISE_FLOOR_SECONDS)
+        if result["mean"] > limit:
+            problems.append(
+                f"среднее время {result['mean'] * 1000:.1f} мс > {limit * 1000:.1f} мс "
+                f"(базовое {baseline['mean'] * 1000:.1f} мс, допустимо +{self.threshold:.0%})"
+            )
+        # Число команд не зависит от нагрузки на машину, поэтому сравнивается строго
+        if result["commands"] > baseline["commands"] + 0.5:
+            problems.append(f"команд WebDriver {result['commands']:.1f} > {baseline['commands']:.1f}")
+        if problems:
+            raise BenchmarkRegression(f"РЕГРЕССИЯ {name} ({kind}): " + "; ".join(problems))
+
+    def to_dict(self):
+        """Результаты для передачи из воркера xdist"""
+        with self._lock:
+            return {kind: dict(results) for kind, results in self.results.items()}
+
+    def merge(self, data):
+        """Добавить результаты, полученные от воркера xdist"""
+        with self._lock:
+            for kind, results in data.items():
+                self.results.setdefault(kind, {}).update(results)
+
+    def rows(self):
+        """Строки отчета: (вид драйвера, операция, сводка, базовое значение до этого запуска)"""
+        return [
+            (kind, name, result, self.baseline(kind, name))
+            for kind, results in sorted(self.results.items())
+            for name, result in sorted(results.items())
+        ]
+
+    def write_baseline(self):
+        """Сохранить результаты запуска как базовые значения"""
+        if not self.results:
+            return
+        with file_lock(self.path):
+            data = load_json(self.path, {})
+            for kind, results in self.results.items():
+                data.setdefault(kind, {}).update(results)
+            save_json(self.path, data)
+
+
+# Общий объект бенчмарков для всего запуска
+benchmarks = Benchmarks()
@@ -0,0 +1,289 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.firefox.options import Options
+from selenium.webdriver.firefox.service import Service
+from .wait_engine import install_page_watcher
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+# Настройки, которые ускоряют запуск и не влияют на проверки
+BASE_PREFS = {
+    "app.update.enabled": False,
+    "app.update.auto": False,
+    "browser.shell.checkDefaultBrowser": False,
+    "browser.startup.homepage_override.mstone": "ignore",
+    "browser.aboutwelcome.enabled": False,
+    "datareporting.policy.dataSubmissionEnabled": False,
+    "datareporting.healthreport.uploadEnabled": False,
+    "toolkit.telemetry.enabled": False,
+    "extensions.update.enabled": False,
+    "extensions.autoDisableScopes": 15,
+    "browser.safebrowsing.malware.enabled": False,
+    "browser.safebrowsing.phishing.enabled": False,
+    "network.prefetch-next": False,
+}
+
+# Настройки для тестов, которым не нужны картинки и шрифты сайта
+NO_IMAGES_PREFS = {
+    "permissions.default.image": 2,
+    "browser.display.use_document_fonts": 0,
+}
+
+
+def proxy_prefs(address):
+    """Настройки Firefox для работы через локальный прокси host:port (в том числе для localhost)"""
+    host, port = address.rsplit(":", 1)
+    return {
+        "network.proxy.type": 1,
+        "network.proxy.http": host,
+        "network.proxy.http_port": int(port),
+        "network.proxy.ssl": host,
+        "network.proxy.ssl_port": int(port),
+        "network.proxy.no_proxies_on": "",
+        "network.proxy.allow_hijacking_localhost": True,
+    }
+
+
+# Файлы блокировки, которые нельзя копировать вместе с профилем
+PROFILE_LOCK_FILES = ("lock", ".parentlock", "parent.lock", "MarionetteActivePort")
+
+
+class BrowserProfile:
+    """Настройки запуска Firefox"""
+
+    def __init__(self, headless=False, window_size=(1366, 768), images=True, baked=False, proxy=None):
+        self.headless = headless
+        self.window_size = window_size
+        self.images = images
+        # baked - использовать заранее подготовленную папку профиля
+        self.baked = baked
+        # proxy - адрес host:port фильтра запросов (RequestFilter)
+        self.proxy = proxy
+
+    @property
+    def name(self):
+        """Короткое имя профиля, по нему различаются пулы браузеров"""
+        parts = ["headless" if self.headless else "gui", "{}x{}".format(*self.window_size)]
+        if not self.images:
+            parts.append("noimages")
+        if self.baked:
+            parts.append("baked")
+        if self.proxy:
+            parts.append("filtered")
+        return "-".join(parts)
+
+    def with_images(self):
+        """Тот же профиль, но с картинками"""
+        return BrowserProfile(self.headless, self.window_size, True, self.baked, self.proxy)
+
+    def with_proxy(self, proxy):
+        """Тот же профиль, но через фильтр запросов"""
+        return BrowserProfile(self.headless, self.window_size, self.images, self.baked, proxy)
+
+    def prefs(self):
+        """Настройки Firefox для этого профиля"""
+        prefs = dict(BASE_PREFS)
+        if not self.images:
+            prefs.update(NO_IMAGES_PREFS)
+        return prefs
+
+    def prefs_key(self):
+        """Хеш настроек - по нему выбирается подготовленная папка профиля"""
+        data = json.dumps(self.prefs(), sort_keys=True).encode()
+        return hashlib.sha1(data).hexdigest()[:12]
+
+    def options(self, profile_dir=None):
+        """Собрать Options для запуска Firefox"""
+        options = Options()
+        # WebDriver BiDi: через него наблюдатель ожиданий ставится в страницу до ее скриптов
+        options.enable_bidi = True
+        if self.headless:
+            options.add_argument("-headless")
+        prefs = self.prefs()
+        if self.proxy:
+            # Порт прокси меняется от запуска к запуску, поэтому в подготовленный профиль он не попадает
+            prefs.update(proxy_prefs(self.proxy))
+        for name, value in prefs.items():
+            options.set_preference(name, value)
+        if profile_dir:
+            options.add_argument("-profile")
+            options.add_argument(profile_dir)
+        return options
+
+    @classmethod
+    def from_config(cls, config):
+        """Собрать профиль из параметров запуска pytest"""
+        width, height = config.getoption("--window-size").lower().split("x")
+        return cls(
+            headless=config.getoption("--headless"),
+            window_size=(int(width), int(height)),
+            images=not config.getoption("--no-images"),
+            baked=config.getoption("--baked-profile")
+        )
+
+
+class FirefoxLauncher:
+    """
+    Запуск браузеров Firefox по профилю
+    Собирает время запуска и потребление памяти каждого браузера
+    """
+
+    def __init__(self, geckodriver_path, cache_dir):
+        self.geckodriver_path = geckodriver_path
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._drivers = []
+        self._profile_dirs = []
+        self.startup_times = []
+        self.memory_mb = []
+
+    def launch(self, profile):
+        """Запустить новый браузер"""
+        start = time.perf_counter()
+
+        profile_dir = self._copy_baked_profile(profile) if profile.baked else None
+        driver = self._start(profile, profile_dir)
+
+        with self._lock:
+            self.startup_times.append(time.perf_counter() - start)
+            # Браузеры, которые пул уже закрыл, больше не отслеживаются
+            self._drivers = [running for running in self._drivers if self._is_running(running)]
+            self._drivers.append(driver)
+        return driver
+
+    def measure_memory(self):
+        """Замерить память всех еще открытых браузеров (вызывать перед их закрытием)"""
+        with self._lock:
+            drivers, self._drivers = self._drivers, []
+        for driver in drivers:
+            if not self._is_running(driver):
+                continue
+            memory = self._browser_memory_mb(driver)
+            if memory is not None:
+                self.memory_mb.append(memory)
+
+    def cleanup(self):
+        """Удалить временные копии профиля"""
+        for profile_dir in self._profile_dirs:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+        self._profile_dirs = []
+
+    def stats(self):
+        """Статистика запуска для отчета"""
+        return {"startup_times": list(self.startup_times), "memory_mb": list(self.memory_mb)}
+
+    def _start(self, profile, profile_dir=None):
+        service = Service(self.geckodriver_path)
+        driver = webdriver.Firefox(service=service, options=profile.options(profile_dir))
+
+        # Без неявного ожидания: все ожидания явные (BasePage), иначе каждая
+        # проверка отсутствия элемента внутри явного ожидания длилась бы еще 10 секунд
+        # Фиксированный размер окна вместо maximize - одинаковые и небольшие скриншоты
+        driver.set_window_size(*profile.window_size)
+        install_page_watcher(driver)
+        return driver
+
+    def _copy_baked_profile(self, profile):
+        """Скопировать подготовленный профиль во временную папку (Firefox блокирует профиль)"""
+        template = self._baked_template(profile)
+        profile_dir = tempfile.mkdtemp(prefix="firefox-profile-")
+        shutil.copytree(
+            template,
+            profile_dir,
+            dirs_exist_ok=True,
+            ignore=shutil.ignore_patterns(*PROFILE_LOCK_FILES)
+        )
+        with self._lock:
+            self._profile_dirs.append(profile_dir)
+        return profile_dir
+
+    def _baked_template(self, profile):
+        """
+        Подготовленная папка профиля: Firefox один раз запускается на ней,
+        после чего все следующие запуски пропускают создание профиля с нуля
+        """
+        template = os.path.join(self.cache_dir, f"firefox-{profile.prefs_key()}")
+        if os.path.isdir(template):
+            return template
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        build_dir = tempfile.mkdtemp(prefix="bake-", dir=self.cache_dir)
+        with open(os.path.join(build_dir, "user.js"), "w") as file:
+            for name, value in profile.prefs().items():
+                file.write(f"user_pref({json.dumps(name)}, {json.dumps(value)});\n")
+
+        driver = self._start(profile, build_dir)
+        driver.quit()
+        for name in PROFILE_LOCK_FILES:
+            path = os.path.join(build_dir, name)
+            if os.path.lexists(path):
+                os.remove(path)
+
+        try:
+            os.rename(build_dir, template)
+        except OSError:
+            # Другой воркер успел подготовить профиль раньше
+            shutil.rmtree(build_dir, ignore_errors=True)
+        return template
+
+    @staticmethod
+    def _is_running(driver):
+        """Не закрыт ли браузер: после driver.quit() процесс geckodriver завершен"""
+        process = getattr(getattr(driver, "service", None), "process", None)
+        return process is not None and process.poll() is None
+
+    @staticmethod
+    def _browser_memory_mb(driver):
+        """Память процесса Firefox и его дочерних процессов в МБ"""
+        try:
+            pid = driver.capabilities.get("moz:processID")
+        except WebDriverException:
+            return None
+        if not pid:
+            return None
+
+        if psutil is not None:
+            try:
+                process = psutil.Process(pid)
+                processes = [process] + process.children(recursive=True)
+                return sum(p.memory_info().rss for p in processes) / 1024 / 1024
+            except psutil.Error:
+                return None
+
+        # Без psutil считаем через /proc (только Linux)
+        if not os.path.isdir("/proc"):
+            return None
+        children = {}
+        rss_kb = {}
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/status") as file:
+                    fields = dict(line.split(":", 1) for line in file if ":" in line)
+            except OSError:
+                continue
+            children.setdefault(int(fields["PPid"]), []).append(int(entry))
+            rss_kb[int(entry)] = int(fields.get("VmRSS", "0 kB").split()[0])
+
+        if pid not in rss_kb:
+            # Процесс Firefox уже завершился
+            return None
+        total = 0
+        stack = [pid]
+        while stack:
+            current = stack.pop()
+            total += rss_kb.get(current, 0)
+            stack.extend(children.get(current, []))
+        return total / 1024
@@ -0,0 +1,62 @@
+"""
+Снимки списков товаров по категориям
+Для каждой категории хранятся уже проверенные названия товаров и версия классификатора,
+который их проверял. Тест проверяет подробно только названия, которых нет в снимке.
+После изменения словарей классификатора снимок не действует и проверяется весь список
+"""
+import threading
+from .json_store import file_lock, load_json, save_json
+from .product_classifier import product_classifier
+
+
+class CatalogSnapshots:
+    """Проверенные названия по категориям, хранятся в .cache/catalog_snapshots.json"""
+
+    def __init__(self, path, site, classifier=product_classifier):
+        # site - live или stub: у каждого сайта свой каталог
+        self.path = path
+        self.site = site
+        self.classifier_version = classifier.version
+        self._lock = threading.Lock()
+        self._snapshots = load_json(path, {}).get(site, {})
+        # Категории, обновленные в этом процессе
+        self._updated = {}
+
+    def _verified(self, category):
+        """Проверенные названия категории (пусто, если их проверял другой классификатор)"""
+        snapshot = self._snapshots.get(category, {})
+        if snapshot.get("classifier") != self.classifier_version:
+            return {}
+        return snapshot.get("verified", {})
+
+    def titles_to_check(self, category, titles):
+        """
+        Названия, которые нужно проверить подробно
+        Пустой список - все названия уже проверены этой версией классификатора
+        """
+        with self._lock:
+            verified = self._verified(category)
+        return [title for title in titles if title not in verified]
+
+    def remember(self, category, titles, evidence):
+        """
+        Запомнить проверенный список категории
+        titles - все названия на странице, evidence - название -> чем подтверждена категория
+        для названий, проверенных подробно
+        Названия, которых больше нет на странице, забываются
+        """
+        with self._lock:
+            verified = {title: value for title, value in self._verified(category).items() if title in titles}
+            verified.update(evidence)
+            snapshot = {"classifier": self.classifier_version, "verified": verified}
+            self._snapshots[category] = snapshot
+            self._updated[category] = snapshot
+
+    def save(self):
+        """Дописать обновленные категории в файл (воркеры xdist пишут по очереди)"""
+        if not self._updated:
+            return
+        with file_lock(self.path):
+            data = load_json(self.path, {})
+            data.setdefault(self.site, {}).update(self._updated)
+            save_json(self.path, data)
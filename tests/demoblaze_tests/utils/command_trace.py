@@ -0,0 +1,281 @@
+"""
+Трассы команд WebDriver
+С --trace-commands каждая команда браузера теста (endpoint, локатор, время, размер запроса
+и ответа) пишется строкой в reports/traces/<тест>.jsonl. Сводка по всем трассам запуска:
+
+    python -m tests.demoblaze_tests.utils.command_trace reports/traces
+
+Трассы можно переиграть без браузера: время теста пересчитывается по записанной
+временной шкале, если повторные поиски брать из кеша элементов и/или если каждая
+команда будет дороже (например, браузер на удаленной машине):
+
+    python -m tests.demoblaze_tests.utils.command_trace reports/traces --replay-cache --replay-latency-ms 20
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from .driver_hooks import add_command_listener, remove_command_listener
+from .element_cache import NAVIGATION_COMMANDS
+from .stats import summarize
+
+# Команды поиска: повторный поиск того же локатора на той же странице - кандидат в кеш элементов
+LOOKUP_COMMANDS = {"findElement", "findElements", "findChildElement", "findChildElements"}
+
+
+def payload_size(value):
+    """Размер данных команды в байтах (как в JSON запроса или ответа WebDriver)"""
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value)
+    try:
+        return len(json.dumps(value, ensure_ascii=False))
+    except (TypeError, ValueError):
+        # В ответе могут быть объекты WebElement
+        return len(str(value))
+
+
+class TraceFile:
+    """Трасса одного теста"""
+
+    def __init__(self, path, nodeid):
+        self.path = path
+        self._file = open(path, "w", encoding="utf-8")
+        self._start = time.perf_counter()
+        self._write({"nodeid": nodeid})
+
+    def on_command(self, command, params, seconds, response):
+        """Слушатель команд WebDriver"""
+        params = params or {}
+        record = {
+            # Когда команда началась, секунды от начала теста
+            "at": round(time.perf_counter() - seconds - self._start, 6),
+            "command": command,
+            "seconds": round(seconds, 6),
+            "request_bytes": payload_size(params),
+            "response_bytes": payload_size(response.get("value") if response else None),
+            "ok": response is not None,
+        }
+        if "using" in params:
+            record["locator"] = f"{params['using']}={params.get('value')}"
+        if "id" in params:
+            record["element"] = params["id"]
+        self._write(record)
+
+    def close(self):
+        self._file.close()
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class CommandTracer:
+    """
+    Запись трасс команд по тестам
+    Включается параметром --trace-commands
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.directory = None
+
+    def configure(self, directory, clean=True):
+        """clean - удалить трассы прошлого запуска (только главный процесс)"""
+        self.enabled = True
+        self.directory = directory
+        if clean:
+            shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, nodeid):
+        """Имя файла трассы из id теста"""
+        return os.path.join(self.directory, re.sub(r"[^\w.-]+", "_", nodeid).strip("_") + ".jsonl")
+
+    @contextmanager
+    def recording(self, driver, nodeid):
+        """Записывать команды driver, пока выполняется тест"""
+        if not self.enabled:
+            yield
+            return
+
+        trace = TraceFile(self.path_for(nodeid), nodeid)
+        add_command_listener(driver, trace.on_command)
+        try:
+            yield
+        finally:
+            remove_command_listener(driver, trace.on_command)
+            trace.close()
+
+
+# Общий объект записи трасс для всего запуска
+command_tracer = CommandTracer()
+
+
+def read_trace(path):
+    """id теста и команды одной трассы"""
+    with open(path, encoding="utf-8") as file:
+        records = [json.loads(line) for line in file if line.strip()]
+    return records[0]["nodeid"], records[1:]
+
+
+def repeated_lookups(commands):
+    """
+    Повторные поиски: тот же локатор на той же странице (без навигации между поисками)
+    Возвращает список таких команд - их можно было бы взять из кеша элементов
+    """
+    seen = set()
+    repeated = []
+    for command in commands:
+        if command["command"] in NAVIGATION_COMMANDS:
+            seen.clear()
+        elif command["command"] in LOOKUP_COMMANDS and "locator" in command:
+            key = (command["command"], command.get("element"), command["locator"])
+            if key in seen:
+                repeated.append(command)
+            seen.add(key)
+    return repeated
+
+
+def summarize_traces(directory):
+    """Сводка по всем трассам папки"""
+    tests = []
+    by_command = defaultdict(lambda: {"seconds": [], "request_bytes": 0, "response_bytes": 0})
+    repeated_locators = Counter()
+    repeated_seconds = 0.0
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".jsonl"):
+            continue
+        nodeid, commands = read_trace(os.path.join(directory, name))
+        for command in commands:
+            entry = by_command[command["command"]]
+            entry["seconds"].append(command["seconds"])
+            entry["request_bytes"] += command["request_bytes"]
+            entry["response_bytes"] += command["response_bytes"]
+        repeated = repeated_lookups(commands)
+        repeated_locators.update(command["locator"] for command in repeated)
+        repeated_seconds += sum(command["seconds"] for command in repeated)
+        tests.append({
+            "nodeid": nodeid,
+            "commands": len(commands),
+            "seconds": sum(command["seconds"] for command in commands),
+            "repeated_lookups": len(repeated),
+        })
+
+    commands = {}
+    for name, entry in by_command.items():
+        summary = summarize(entry["seconds"])
+        summary["total"] = sum(entry["seconds"])
+        summary["request_bytes"] = entry["request_bytes"]
+        summary["response_bytes"] = entry["response_bytes"]
+        commands[name] = summary
+    return {
+        "tests": tests,
+        "commands": commands,
+        "repeated_locators": repeated_locators,
+        "repeated_seconds": repeated_seconds,
+    }
+
+
+def replay(commands, skip_repeated=False, latency=0.0):
+    """
+    Переиграть трассу без браузера: команды идут в записанном порядке, время между
+    командами (код теста, паузы) сохраняется, меняется только цена самих команд
+    skip_repeated - повторные поиски берутся из кеша элементов (команда не отправляется)
+    latency - добавка к каждой отправленной команде, секунды
+    Возвращает (записанное время теста, время после переигрывания), секунды от начала трассы
+    """
+    skipped = {id(command) for command in repeated_lookups(commands)} if skip_repeated else set()
+    recorded_end = 0.0
+    replayed = 0.0
+    for command in commands:
+        # Время вне команд WebDriver между концом прошлой команды и началом этой
+        replayed += max(command["at"] - recorded_end, 0.0)
+        recorded_end = max(recorded_end, command["at"] + command["seconds"])
+        if id(command) not in skipped:
+            replayed += command["seconds"] + latency
+    return recorded_end, replayed
+
+
+def replay_traces(directory, skip_repeated=False, latency=0.0):
+    """Переигрывание всех трасс папки: id теста, записанное и пересчитанное время"""
+    results = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".jsonl"):
+            continue
+        nodeid, commands = read_trace(os.path.join(directory, name))
+        recorded, replayed = replay(commands, skip_repeated, latency)
+        results.append({"nodeid": nodeid, "recorded": recorded, "replayed": replayed})
+    return results
+
+
+def print_replay(results, skip_repeated, latency, top=10):
+    recorded = sum(result["recorded"] for result in results)
+    replayed = sum(result["replayed"] for result in results)
+    scenario = []
+    if skip_repeated:
+        scenario.append("повторные поиски из кеша элементов")
+    if latency:
+        scenario.append(f"+{latency * 1000:.0f} мс на команду")
+    print(f"\nПереигрывание трасс ({', '.join(scenario)}): {recorded:.2f} с -> {replayed:.2f} с")
+    print(f"{'записано, с':>12} {'переиграно, с':>14} {'разница, с':>11}  тест")
+    ordered = sorted(results, key=lambda result: abs(result["replayed"] - result["recorded"]), reverse=True)
+    for result in ordered[:top]:
+        print(f"{result['recorded']:>12.2f} {result['replayed']:>14.2f} "
+              f"{result['replayed'] - result['recorded']:>+11.2f}  {result['nodeid']}")
+
+
+def print_summary(summary, top=10):
+    tests = summary["tests"]
+    print(f"Тестов: {len(tests)}, команд: {sum(test['commands'] for test in tests)}, "
+          f"время в командах: {sum(test['seconds'] for test in tests):.2f} с")
+
+    print("\nБольше всего команд:")
+    for test in sorted(tests, key=lambda test: test["commands"], reverse=True)[:top]:
+        print(f"{test['commands']:>6}  {test['seconds']:7.2f} с  повторных поисков: {test['repeated_lookups']:>3}  "
+              f"{test['nodeid']}")
+
+    print("\nСамые долгие команды (по суммарному времени):")
+    print(f"{'команда':<24} {'вызовов':>8} {'всего, с':>9} {'p50, мс':>8} {'p95, мс':>8} {'запрос, КБ':>11} {'ответ, КБ':>10}")
+    ordered = sorted(summary["commands"].items(), key=lambda item: item[1]["total"], reverse=True)
+    for name, command in ordered[:top]:
+        print(f"{name:<24} {command['count']:>8} {command['total']:>9.2f} {command['p50'] * 1000:>8.1f} "
+              f"{command['p95'] * 1000:>8.1f} {command['request_bytes'] / 1024:>11.1f} "
+              f"{command['response_bytes'] / 1024:>10.1f}")
+
+    repeated = summary["repeated_locators"]
+    print(f"\nПовторных поисков того же локатора на той же странице: {sum(repeated.values())}, "
+          f"на них ушло {summary['repeated_seconds']:.2f} с")
+    print("(верхняя оценка экономии от --element-cache: после перерисовки страницы элемент нужно искать заново)")
+    for locator, count in repeated.most_common(top):
+        print(f"{count:>6}  {locator}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сводка по трассам команд WebDriver")
+    parser.add_argument("directory", nargs="?", default="reports/traces", help="Папка с трассами")
+    parser.add_argument("--top", type=int, default=10, help="Сколько строк выводить в каждой таблице")
+    parser.add_argument("--json", help="Сохранить сводку в JSON")
+    parser.add_argument("--replay-cache", action="store_true",
+                        help="Переиграть трассы: повторные поиски берутся из кеша элементов")
+    parser.add_argument("--replay-latency-ms", type=float, default=0.0,
+                        help="Переиграть трассы: добавить столько миллисекунд к каждой команде")
+    args = parser.parse_args()
+
+    summary = summarize_traces(args.directory)
+    print_summary(summary, args.top)
+    if args.replay_cache or args.replay_latency_ms:
+        latency = args.replay_latency_ms / 1000
+        summary["replay"] = replay_traces(args.directory, args.replay_cache, latency)
+        print_replay(summary["replay"], args.replay_cache, latency, args.top)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(summary, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,21 @@
 import random
 import string
 from datetime import datetime
+from .parallel import worker_id
 
 
 class Config:
     """Настройки и константы для тестов"""
 
-    # URL сайта
-    BASE_URL = "https://www.demoblaze.com/"
+    # Настоящий сайт и его API
+    LIVE_URL = "https://www.demoblaze.com/"
+    LIVE_API_URL = "https://api.demoblaze.com/"
+
+    # URL сайта, на котором идут тесты
+    # При запуске с --site=stub заменяется на адрес локальной копии
+    SITE = "live"
+    BASE_URL = LIVE_URL
+    API_URL = LIVE_API_URL
 
     # Тестовые данные для успешного логина
     # Примечание: эти данные нужно создать вручную на сайте
@@ -31,6 +39,10 @@ class Config:
         """Генерация случайного имени пользователя"""
         timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
         random_str = ''.join(random.choices(string.ascii_lowercase + string.digits, k=4))
+        # При параллельном запуске добавляем id воркера, чтобы имена не пересекались
+        worker = worker_id()
+        if worker != "master":
+            return f"{prefix}_{timestamp}_{worker}_{random_str}"
         return f"{prefix}_{timestamp}_{random_str}"
 
     @staticmethod
@@ -0,0 +1,57 @@
+"""
+Таблица сценариев с неверными учетными данными для форм логина и регистрации
+Все сценарии проходят по одному тесту: ввести данные в открытую форму, отправить,
+проверить текст alert. В username и password можно подставить:
+{random} - случайное значение, {account} - логин аккаунта из пула, {existing} - занятый логин
+"""
+from collections import namedtuple
+from .config import Config
+
+# expected - подстрока текста alert; None - подойдет любое непустое сообщение
+CredentialScenario = namedtuple(
+    "CredentialScenario", ["id", "form", "title", "username", "password", "expected", "smoke"]
+)
+
+CREDENTIAL_SCENARIOS = [
+    CredentialScenario("empty_fields", "login", "Вход с пустыми полями", "", "", None, False),
+    CredentialScenario(
+        "invalid_username", "login", "Вход с некорректным логином",
+        "nonexistent_user_12345", "anypassword", "User does not exist", True
+    ),
+    CredentialScenario(
+        "wrong_password", "login", "Вход с некорректным паролем",
+        "{account}", "wrong_password_123", "Wrong password", True
+    ),
+    CredentialScenario(
+        "existing_username", "signup", "Повторная регистрация с существующим логином",
+        "{existing}", "anypassword123", "This user already exist", True
+    ),
+    CredentialScenario("empty_fields", "signup", "Регистрация с пустыми полями", "", "", None, False),
+    CredentialScenario(
+        "empty_password", "signup", "Регистрация только с username (пустой пароль)", "{random}", "", None, False
+    ),
+    CredentialScenario(
+        "empty_username", "signup", "Регистрация только с паролем (пустой username)", "", "{random}", None, False
+    ),
+]
+
+
+def scenarios_for(form):
+    """Сценарии одной формы (login или signup)"""
+    return [scenario for scenario in CREDENTIAL_SCENARIOS if scenario.form == form]
+
+
+def needs_account(scenario):
+    """Нужен ли сценарию аккаунт из пула"""
+    return "{account}" in scenario.username + scenario.password
+
+
+def resolve_credentials(scenario, account=None):
+    """Username и password сценария с подставленными значениями"""
+    values = {
+        "account": account.username if account is not None else "",
+        "existing": Config.EXISTING_USERNAME,
+    }
+    username = scenario.username.format(random=Config.generate_random_username(), **values)
+    password = scenario.password.format(random=Config.generate_random_password(), **values)
+    return username, password
@@ -0,0 +1,611 @@
+"""
+Драйвер без браузера для локальной копии сайта (--site=stub)
+HTML разбирается в дерево на Python, поведение страницы (модальные окна, byCat, logIn,
+register, logOut) повторяется на Python поверх того же API, что вызывает сайт.
+Интерфейс совпадает с тем, что использует BasePage: get, find_element(s), .text,
+.click, .send_keys, switch_to.alert, execute_script.
+Скрипты execute_script драйвер не выполняет: модуль, которому принадлежит скрипт,
+регистрирует рядом с ним Python-реализацию через @browserless_script.
+Совпадение с сайтом и с браузером проверяет tests/demoblaze_tests/unit/test_dom_driver.py
+"""
+import base64
+import re
+import urllib.request
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+from selenium.common.exceptions import (
+    InvalidSelectorException,
+    NoAlertPresentException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    WebDriverException,
+)
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
+from .api_client import ApiError, DemoblazeApi
+from ..stub.server import PLACEHOLDER_PNG
+
+# Теги без закрывающего тега
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+# Теги, содержимое которых никогда не отображается
+HIDDEN_TAGS = {"head", "script", "style", "title", "template"}
+
+# Сообщения alert из скрипта stub/site/index.html
+FILL_FORM_ALERT = "Please fill out Username and Password."
+SIGNUP_SUCCESS_ALERT = "Sign up successful."
+SITE_ALERTS = (FILL_FORM_ALERT, SIGNUP_SUCCESS_ALERT)
+
+
+def card_html(item):
+    """Разметка карточки товара, как ее строит renderItems() на сайте"""
+    link = f"prod.html?idp_={item['id']}"
+    return (
+        '<div class="col-lg-4 col-md-6 mb-4"><div class="card h-100">'
+        f'<a href="{link}" class="hrefch"><img class="card-img-top img-fluid" src="{item["img"]}" alt=""></a>'
+        f'<div class="card-block"><h4 class="card-title"><a href="{link}" class="hrefch">{item["title"]}</a></h4>'
+        f'<h5>${item["price"]}</h5><p class="card-text" id="article">{item["desc"]}</p></div></div></div>'
+    )
+
+
+class Node:
+    """Узел DOM: элемент или текст (tag == '#text')"""
+
+    def __init__(self, tag, attrs=None, parent=None, data=""):
+        self.tag = tag
+        self.attrs = dict(attrs or {})
+        self.parent = parent
+        self.children = []
+        self.data = data
+        # Текущее значение поля ввода
+        self.value = self.attrs.get("value") or ""
+
+    def elements(self):
+        """Дочерние элементы (без текстовых узлов)"""
+        return [child for child in self.children if child.tag != "#text"]
+
+    def descendants(self):
+        """Все вложенные элементы в порядке документа"""
+        for child in self.elements():
+            yield child
+            yield from child.descendants()
+
+    def classes(self):
+        return self.attrs.get("class", "").split()
+
+    def text_content(self):
+        """Аналог textContent: весь текст, включая скрытый"""
+        if self.tag == "#text":
+            return self.data
+        return "".join(child.text_content() for child in self.children)
+
+    def closest(self, predicate):
+        """Ближайший узел (сам или предок), подходящий под условие"""
+        node = self
+        while node is not None:
+            if node.tag != "#text" and predicate(node):
+                return node
+            node = node.parent
+        return None
+
+
+class _TreeBuilder(HTMLParser):
+    """Сборка дерева Node из HTML"""
+
+    def __init__(self, root):
+        super().__init__(convert_charrefs=True)
+        self.stack = [root]
+
+    def handle_starttag(self, tag, attrs):
+        node = Node(tag, {name: value or "" for name, value in attrs}, parent=self.stack[-1])
+        self.stack[-1].children.append(node)
+        if tag not in VOID_TAGS:
+            self.stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        node = Node(tag, {name: value or "" for name, value in attrs}, parent=self.stack[-1])
+        self.stack[-1].children.append(node)
+
+    def handle_endtag(self, tag):
+        # Закрываем до ближайшего открытого тега с таким именем
+        for index in range(len(self.stack) - 1, 0, -1):
+            if self.stack[index].tag == tag:
+                del self.stack[index:]
+                return
+
+    def handle_data(self, data):
+        parent = self.stack[-1]
+        parent.children.append(Node("#text", parent=parent, data=data))
+
+
+def parse_html(html, root=None):
+    """Разобрать HTML; если передан root, узлы добавляются в него"""
+    root = root or Node("#document")
+    builder = _TreeBuilder(root)
+    builder.feed(html)
+    builder.close()
+    return root
+
+
+# ========== ПОИСК ЭЛЕМЕНТОВ ==========
+
+_XPATH_STEP = re.compile(r"(//|/)([\w*-]+)((?:\[[^\]]+\])*)")
+_XPATH_PREDICATE = re.compile(r"\[@([\w-]+)=(['\"])(.*?)\2\]")
+
+
+def _xpath(context, expression):
+    """
+    Подмножество XPath, которого хватает локаторам проекта:
+    //tag, /tag, * и предикаты [@attr='value']
+    """
+    expression = expression.strip()
+    if expression.startswith("."):
+        expression = expression[1:]
+    steps = []
+    position = 0
+    for match in _XPATH_STEP.finditer(expression):
+        if match.start() != position:
+            break
+        predicates = _XPATH_PREDICATE.findall(match.group(3))
+        if "".join(f"[@{name}={quote}{value}{quote}]" for name, quote, value in predicates) != match.group(3):
+            raise InvalidSelectorException(f"Неподдерживаемый предикат XPath: {match.group(3)}")
+        steps.append((match.group(1), match.group(2), [(name, value) for name, _, value in predicates]))
+        position = match.end()
+    if not steps or position != len(expression):
+        raise InvalidSelectorException(f"Неподдерживаемый XPath: {expression}")
+
+    nodes = [context]
+    for axis, tag, predicates in steps:
+        found = []
+        for node in nodes:
+            candidates = node.descendants() if axis == "//" else node.elements()
+            for candidate in candidates:
+                if tag != "*" and candidate.tag != tag:
+                    continue
+                if all(candidate.attrs.get(name) == value for name, value in predicates):
+                    if candidate not in found:
+                        found.append(candidate)
+        nodes = found
+    return nodes
+
+
+_CSS_COMPOUND = re.compile(r"^([\w-]+|\*)?((?:[#.][\w-]+)*)$")
+
+
+def _css_matches(node, compound):
+    match = _CSS_COMPOUND.match(compound)
+    if not match:
+        raise InvalidSelectorException(f"Неподдерживаемый CSS селектор: {compound}")
+    tag, rest = match.group(1), match.group(2)
+    if tag and tag != "*" and node.tag != tag:
+        return False
+    for kind, name in re.findall(r"([#.])([\w-]+)", rest):
+        if kind == "#" and node.attrs.get("id") != name:
+            return False
+        if kind == "." and name not in node.classes():
+            return False
+    return True
+
+
+def _css(context, selector):
+    """Подмножество CSS: tag#id.class, потомки через пробел и дети через '>'"""
+    tokens = selector.replace(">", " > ").split()
+    nodes = [context]
+    axis = " "
+    for token in tokens:
+        if token == ">":
+            axis = ">"
+            continue
+        found = []
+        for node in nodes:
+            candidates = node.elements() if axis == ">" else node.descendants()
+            for candidate in candidates:
+                if _css_matches(candidate, token) and candidate not in found:
+                    found.append(candidate)
+        nodes = found
+        axis = " "
+    return nodes
+
+
+def find_nodes(context, by, value):
+    """Найти узлы по локатору Selenium"""
+    if by == By.ID:
+        return [node for node in context.descendants() if node.attrs.get("id") == value]
+    if by == By.XPATH:
+        return _xpath(context, value)
+    if by == By.CSS_SELECTOR:
+        return _css(context, value)
+    if by == By.NAME:
+        return [node for node in context.descendants() if node.attrs.get("name") == value]
+    if by == By.TAG_NAME:
+        return [node for node in context.descendants() if node.tag == value]
+    if by == By.CLASS_NAME:
+        return [node for node in context.descendants() if value in node.classes()]
+    raise InvalidSelectorException(f"Способ поиска {by} не поддерживается")
+
+
+# ========== ОТОБРАЖЕНИЕ ==========
+
+def _has_display_none(node):
+    return re.search(r"display\s*:\s*none", node.attrs.get("style", "")) is not None
+
+
+def is_displayed(node):
+    """Виден ли элемент с учетом стилей сайта (display: none и .modal без .show)"""
+    current = node
+    while current is not None and current.tag != "#document":
+        if current.tag in HIDDEN_TAGS or _has_display_none(current):
+            return False
+        if "modal" in current.classes() and "show" not in current.classes():
+            return False
+        if current.tag == "input" and current.attrs.get("type") == "hidden":
+            return False
+        current = current.parent
+    return True
+
+
+def set_displayed(node, visible):
+    """Аналог element.style.display = 'block' / 'none'"""
+    style = re.sub(r"display\s*:\s*[\w-]+;?", "", node.attrs.get("style", "")).strip()
+    node.attrs["style"] = f"{style} display: {'block' if visible else 'none'};".strip()
+
+
+def rendered_text(node):
+    """Аналог WebElement.text: только видимый текст, пробелы схлопнуты"""
+    if not is_displayed(node):
+        return ""
+
+    parts = []
+
+    def collect(current):
+        for child in current.children:
+            if child.tag == "#text":
+                parts.append(child.data)
+            elif is_displayed(child):
+                collect(child)
+
+    collect(node)
+    return " ".join("".join(parts).split())
+
+
+# ========== ЭЛЕМЕНТЫ, ALERT И ДРАЙВЕР ==========
+
+class DomElement(WebElement):
+    """Элемент DOM с интерфейсом WebElement"""
+
+    def __init__(self, driver, node):
+        self._parent = driver
+        self._id = f"dom-{id(node)}"
+        self.node = node
+
+    def _checked(self):
+        """Узел, если он еще в документе; иначе StaleElementReferenceException"""
+        node = self.node
+        while node.parent is not None:
+            node = node.parent
+        if node is not self._parent.document:
+            raise StaleElementReferenceException("Элемент больше не находится в документе")
+        return self.node
+
+    @property
+    def tag_name(self):
+        return self._checked().tag
+
+    @property
+    def text(self):
+        return rendered_text(self._checked())
+
+    def click(self):
+        self._parent._click(self._checked())
+
+    def clear(self):
+        self._checked().value = ""
+
+    def send_keys(self, *value):
+        self._checked().value += "".join(str(part) for part in value)
+
+    def is_displayed(self):
+        return is_displayed(self._checked())
+
+    def is_enabled(self):
+        return "disabled" not in self._checked().attrs
+
+    def is_selected(self):
+        return "checked" in self._checked().attrs or "selected" in self._checked().attrs
+
+    def get_attribute(self, name):
+        node = self._checked()
+        if name == "value":
+            return node.value
+        return node.attrs.get(name)
+
+    def get_dom_attribute(self, name):
+        return self._checked().attrs.get(name)
+
+    def get_property(self, name):
+        node = self._checked()
+        if name == "textContent":
+            return node.text_content()
+        if name in ("href", "src"):
+            # Свойства ссылок в браузере - абсолютные URL
+            value = node.attrs.get(name)
+            return urljoin(self._parent.current_url, value) if value is not None else None
+        return self.get_attribute(name)
+
+    def find_element(self, by=By.ID, value=None):
+        return self._parent._first(self._checked(), by, value)
+
+    def find_elements(self, by=By.ID, value=None):
+        return [DomElement(self._parent, node) for node in find_nodes(self._checked(), by, value)]
+
+    def __repr__(self):
+        return f"<DomElement {self.node.tag} id={self.node.attrs.get('id')!r}>"
+
+
+class DomAlert:
+    """Alert, вызванный кодом страницы"""
+
+    def __init__(self, driver):
+        self._driver = driver
+
+    @property
+    def text(self):
+        return self._driver._alerts[0]
+
+    def accept(self):
+        self._driver._alerts.pop(0)
+
+    def dismiss(self):
+        self._driver._alerts.pop(0)
+
+
+class DomSwitchTo:
+    """Аналог driver.switch_to (только alert)"""
+
+    def __init__(self, driver):
+        self._driver = driver
+
+    @property
+    def alert(self):
+        if not self._driver._alerts:
+            raise NoAlertPresentException("Alert не открыт")
+        return DomAlert(self._driver)
+
+
+class DomDriver:
+    """Драйвер без браузера для локальной копии demoblaze"""
+
+    # Обработчики execute_script: текст скрипта -> функция(driver, *args)
+    SCRIPT_HANDLERS = {}
+
+    # Функции страницы из onclick -> методы, которые их повторяют
+    PAGE_FUNCTIONS = {
+        "byCat": "_by_cat",
+        "logIn": "_log_in",
+        "register": "_register",
+        "logOut": "_log_out",
+    }
+
+    def __init__(self):
+        self.document = Node("#document")
+        self.current_url = "about:blank"
+        self.cookies = {}
+        self.switch_to = DomSwitchTo(self)
+        self._alerts = []
+        self._closed = False
+
+    @classmethod
+    def register_script(cls, script, handler):
+        """Зарегистрировать Python-реализацию скрипта для execute_script"""
+        cls.SCRIPT_HANDLERS[script.strip()] = handler
+
+    # ----- навигация -----
+
+    def get(self, url):
+        self._ensure_open()
+        with urllib.request.urlopen(url, timeout=10) as response:
+            html = response.read().decode("utf-8")
+        self.current_url = url
+        self.document = parse_html(html)
+        self._alerts = []
+        self._on_load()
+
+    def refresh(self):
+        self.get(self.current_url)
+
+    @property
+    def title(self):
+        titles = find_nodes(self.document, By.TAG_NAME, "title")
+        return titles[0].text_content().strip() if titles else ""
+
+    @property
+    def page_source(self):
+        return self.document.text_content()
+
+    # ----- поиск -----
+
+    def find_element(self, by=By.ID, value=None):
+        return self._first(self.document, by, value)
+
+    def find_elements(self, by=By.ID, value=None):
+        return [DomElement(self, node) for node in find_nodes(self.document, by, value)]
+
+    def _first(self, context, by, value):
+        nodes = find_nodes(context, by, value)
+        if not nodes:
+            raise NoSuchElementException(f"Элемент не найден: {by}={value}")
+        return DomElement(self, nodes[0])
+
+    # ----- скрипты, cookies, окно -----
+
+    def execute_script(self, script, *args):
+        handler = self.SCRIPT_HANDLERS.get(script.strip())
+        if handler is None:
+            raise WebDriverException(
+                "Скрипт не поддерживается драйвером без браузера - зарегистрируйте его реализацию "
+                f"через @browserless_script: {script.strip()[:80]}"
+            )
+        return handler(self, *args)
+
+    def execute(self, driver_command, params=None):
+        # Команд WebDriver нет - метод нужен только для совместимости со слушателями команд
+        raise WebDriverException(f"Команда {driver_command} не поддерживается драйвером без браузера")
+
+    def add_cookie(self, cookie):
+        self.cookies[cookie["name"]] = cookie["value"]
+
+    def get_cookie(self, name):
+        if name not in self.cookies:
+            return None
+        return {"name": name, "value": self.cookies[name]}
+
+    def get_cookies(self):
+        return [{"name": name, "value": value} for name, value in self.cookies.items()]
+
+    def delete_cookie(self, name):
+        self.cookies.pop(name, None)
+
+    def delete_all_cookies(self):
+        self.cookies.clear()
+
+    def get_screenshot_as_base64(self):
+        # Страница не рисуется - вместо скриншота картинка-заглушка
+        return base64.b64encode(PLACEHOLDER_PNG).decode()
+
+    def get_screenshot_as_png(self):
+        return PLACEHOLDER_PNG
+
+    @property
+    def window_handles(self):
+        self._ensure_open()
+        return ["dom"]
+
+    def implicitly_wait(self, seconds):
+        pass
+
+    def set_window_size(self, width, height):
+        pass
+
+    def quit(self):
+        self._closed = True
+
+    def _ensure_open(self):
+        if self._closed:
+            raise WebDriverException("Драйвер закрыт")
+
+    # ----- поведение страницы (повторяет скрипт stub/site/index.html) -----
+
+    def _api(self):
+        return DemoblazeApi(urljoin(self.current_url, "api/"))
+
+    def _by_id(self, element_id):
+        nodes = find_nodes(self.document, By.ID, element_id)
+        return nodes[0] if nodes else None
+
+    def _on_load(self):
+        self._render_items(self._api().post("entries", {})["Items"])
+        self._check_session()
+
+    def _render_items(self, items):
+        tbody = self._by_id("tbodyid")
+        if tbody is None:
+            return
+        for child in tbody.children:
+            child.parent = None
+        tbody.children = []
+        for item in items:
+            parse_html(card_html(item), root=tbody)
+
+    def _check_session(self):
+        token = self.cookies.get(DemoblazeApi.TOKEN_COOKIE)
+        if not token:
+            return
+        username = self._api().check(token)
+        if username is None:
+            return
+        name = self._by_id("nameofuser")
+        name.children = [Node("#text", parent=name, data=f"Welcome {username}")]
+        set_displayed(name, True)
+        set_displayed(self._by_id("logout2"), True)
+        set_displayed(self._by_id("login2"), False)
+        set_displayed(self._by_id("signin2"), False)
+
+    def _click(self, node):
+        toggle = node.closest(lambda n: n.attrs.get("data-toggle") == "modal")
+        if toggle is not None:
+            modal = self._by_id(toggle.attrs.get("data-target", "").lstrip("#"))
+            if modal is not None and "show" not in modal.classes():
+                modal.attrs["class"] = f"{modal.attrs.get('class', '')} show".strip()
+
+        dismiss = node.closest(lambda n: n.attrs.get("data-dismiss") == "modal")
+        if dismiss is not None:
+            self._hide_modal(dismiss.closest(lambda n: "modal" in n.classes()))
+
+        handler = node.closest(lambda n: "onclick" in n.attrs)
+        if handler is not None:
+            self._run_onclick(handler.attrs["onclick"])
+            return
+
+        link = node.closest(lambda n: n.tag == "a" and n.attrs.get("href"))
+        if link is not None and toggle is None and not link.attrs["href"].startswith("#"):
+            self.get(urljoin(self.current_url, link.attrs["href"]))
+
+    def _hide_modal(self, modal):
+        if modal is not None:
+            modal.attrs["class"] = " ".join(name for name in modal.classes() if name != "show")
+
+    def _run_onclick(self, code):
+        match = re.match(r"\s*(\w+)\((.*)\)\s*;?\s*$", code)
+        if not match:
+            raise WebDriverException(f"Неподдерживаемый обработчик onclick: {code}")
+        name, raw_args = match.groups()
+        args = [arg.strip().strip("'\"") for arg in raw_args.split(",") if arg.strip()]
+        if name not in self.PAGE_FUNCTIONS:
+            raise WebDriverException(f"Неподдерживаемый обработчик onclick: {code}")
+        getattr(self, self.PAGE_FUNCTIONS[name])(*args)
+
+    def _by_cat(self, cat):
+        self._render_items(self._api().post("bycat", {"cat": cat})["Items"])
+
+    def _log_in(self):
+        username = self._by_id("loginusername").value
+        password = self._by_id("loginpassword").value
+        if not username or not password:
+            self._alerts.append(FILL_FORM_ALERT)
+            return
+        try:
+            token = self._api().login(username, password)
+        except ApiError as error:
+            self._alerts.append(str(error))
+            return
+        self.cookies[DemoblazeApi.TOKEN_COOKIE] = token
+        self.get(urljoin(self.current_url, "index.html"))
+
+    def _register(self):
+        username = self._by_id("sign-username").value
+        password = self._by_id("sign-password").value
+        if not username or not password:
+            self._alerts.append(FILL_FORM_ALERT)
+            return
+        try:
+            self._api().signup(username, password)
+        except ApiError as error:
+            self._alerts.append(str(error))
+            return
+        self._alerts.append(SIGNUP_SUCCESS_ALERT)
+        self._hide_modal(self._by_id("signInModal"))
+
+    def _log_out(self):
+        self.cookies.pop(DemoblazeApi.TOKEN_COOKIE, None)
+        self.get(urljoin(self.current_url, "index.html"))
+
+
+def browserless_script(script):
+    """
+    Декоратор: Python-реализация скрипта для DomDriver, handler(driver, *args)
+    Реализация пишется через API WebElement, поэтому ее можно сравнить со скриптом в браузере
+    """
+    def register(handler):
+        DomDriver.register_script(script, handler)
+        return handler
+    return register
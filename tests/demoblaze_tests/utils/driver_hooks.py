@@ -0,0 +1,37 @@
+import time
+
+
+def add_command_listener(driver, listener):
+    """
+    Подписаться на все команды WebDriver этого браузера
+    Все вызовы (в том числе от WebElement) проходят через driver.execute,
+    listener вызывается как listener(command, params, seconds, response);
+    если команда упала, response равен None
+    """
+    listeners = getattr(driver, "_command_listeners", None)
+    if listeners is None:
+        listeners = driver._command_listeners = []
+        original_execute = driver.execute
+
+        def execute(driver_command, params=None):
+            start = time.perf_counter()
+            response = None
+            try:
+                response = original_execute(driver_command, params)
+                return response
+            finally:
+                seconds = time.perf_counter() - start
+                for callback in list(listeners):
+                    callback(driver_command, params, seconds, response)
+
+        driver.execute = execute
+
+    if listener not in listeners:
+        listeners.append(listener)
+
+
+def remove_command_listener(driver, listener):
+    """Отписаться от команд WebDriver"""
+    listeners = getattr(driver, "_command_listeners", [])
+    if listener in listeners:
+        listeners.remove(listener)
@@ -0,0 +1,170 @@
+import threading
+from selenium.common.exceptions import NoAlertPresentException, WebDriverException
+from selenium.webdriver.common.by import By
+from .dom_driver import browserless_script
+
+# Количество открытых модальных окон Bootstrap (у открытого окна есть класс show)
+OPEN_MODALS_SCRIPT = "return document.querySelectorAll('.modal.show').length;"
+
+
+@browserless_script(OPEN_MODALS_SCRIPT)
+def _open_modals(driver):
+    return len(driver.find_elements(By.CSS_SELECTOR, ".modal.show"))
+
+
+class DriverPool:
+    """
+    Пул переиспользуемых браузеров
+    Тест берет браузер в аренду, после теста браузер возвращается в пул
+    """
+
+    def __init__(self, factory, base_url, size=1):
+        # factory - функция без аргументов, которая запускает новый браузер
+        self.factory = factory
+        self.base_url = base_url
+        self.size = size
+        self._idle = []
+        self._lock = threading.Lock()
+
+        # Статистика работы пула
+        self.starts = 0
+        self.leases = 0
+        self.replaced = 0
+        self.shared_uses = 0
+        self.recycled = 0
+
+    @property
+    def saved_starts(self):
+        """Сколько запусков браузера удалось сэкономить"""
+        return self.leases - self.starts
+
+    def acquire(self):
+        """Взять браузер из пула (или запустить новый) и сбросить его состояние"""
+        with self._lock:
+            driver = self._idle.pop() if self._idle else None
+
+        if driver is not None and not self.reset(driver):
+            # Браузер сломан - закрываем и заменяем новым
+            self._quit(driver)
+            self.replaced += 1
+            driver = None
+
+        if driver is None:
+            driver = self._start()
+
+        self.leases += 1
+        return driver
+
+    def release(self, driver, broken=False):
+        """Вернуть браузер в пул после теста"""
+        with self._lock:
+            if not broken and len(self._idle) < self.size:
+                self._idle.append(driver)
+                return
+        self._quit(driver)
+
+    def close(self):
+        """Закрыть все браузеры пула"""
+        with self._lock:
+            drivers, self._idle = self._idle, []
+        for driver in drivers:
+            self._quit(driver)
+
+    def is_alive(self, driver):
+        """Проверить, что браузер еще отвечает"""
+        try:
+            # Получение списка окон не блокируется открытым alert
+            return len(driver.window_handles) > 0
+        except WebDriverException:
+            return False
+
+    def reset(self, driver):
+        """
+        Дешевый сброс состояния между тестами:
+        закрыть alert, очистить cookies и localStorage, открыть BASE_URL
+        Возвращает False, если браузер сломан
+        """
+        if not self.is_alive(driver):
+            return False
+        try:
+            try:
+                driver.switch_to.alert.dismiss()
+            except NoAlertPresentException:
+                pass
+
+            driver.delete_all_cookies()
+            try:
+                driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+            except WebDriverException:
+                # На about:blank localStorage недоступен
+                pass
+
+            driver.get(self.base_url)
+            return True
+        except WebDriverException:
+            return False
+
+    def is_clean(self, driver):
+        """Браузер без открытого alert и модального окна (тест не оставил после себя мусор)"""
+        try:
+            driver.switch_to.alert
+            return False
+        except NoAlertPresentException:
+            pass
+        except WebDriverException:
+            return False
+        try:
+            return not driver.execute_script(OPEN_MODALS_SCRIPT)
+        except WebDriverException:
+            return False
+
+    def reuse(self, driver):
+        """
+        Следующий тест read-only класса в том же браузере
+        Чистый браузер только переходит на BASE_URL (cookies и localStorage не трогаем),
+        браузер с открытым alert или модальным окном заменяется на другой из пула
+        Возвращает браузер для теста
+        """
+        if self.is_clean(driver):
+            try:
+                driver.get(self.base_url)
+                self.shared_uses += 1
+                return driver
+            except WebDriverException:
+                pass
+
+        self.recycled += 1
+        self.release(driver, broken=True)
+        return self.acquire()
+
+    def stats(self):
+        """Статистика пула для отчета"""
+        return {
+            "starts": self.starts,
+            "leases": self.leases,
+            "replaced": self.replaced,
+            "saved_starts": self.saved_starts,
+            "shared_uses": self.shared_uses,
+            "recycled": self.recycled,
+        }
+
+    @staticmethod
+    def merge_stats(stats_list):
+        """Сложить статистику нескольких пулов (по одному на воркер)"""
+        total = {"starts": 0, "leases": 0, "replaced": 0, "saved_starts": 0, "shared_uses": 0, "recycled": 0}
+        for stats in stats_list:
+            for key in total:
+                total[key] += stats.get(key, 0)
+        return total
+
+    def _start(self):
+        driver = self.factory()
+        self.starts += 1
+        driver.get(self.base_url)
+        return driver
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
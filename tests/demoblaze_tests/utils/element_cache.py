@@ -0,0 +1,80 @@
+import threading
+from .driver_hooks import add_command_listener
+
+# Команды WebDriver, после которых открывается новый документ
+NAVIGATION_COMMANDS = {"get", "refresh", "goBack", "goForward"}
+
+
+class ElementCacheStats:
+    """
+    Счетчики кеша элементов за весь запуск
+    Кеш включается параметром --element-cache
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "stale_recoveries": 0, "invalidations": 0}
+
+    def add(self, name, value=1):
+        with self._lock:
+            self.counters[name] += value
+
+    def to_dict(self):
+        """Счетчики для передачи из воркера xdist"""
+        return dict(self.counters)
+
+    def merge(self, data):
+        """Добавить счетчики, полученные от воркера xdist"""
+        for name, value in data.items():
+            self.add(name, value)
+
+
+# Общие счетчики для всего запуска
+element_cache_stats = ElementCacheStats()
+
+
+class ElementCache:
+    """
+    Кеш найденных элементов одного браузера, ключ - локатор
+    Сбрасывается при навигации (get/refresh/back/forward) и при смене поколения DOM,
+    которую Page Object отмечает сам (например, после перерисовки списка товаров)
+    """
+
+    def __init__(self):
+        self._elements = {}
+        self.generation = 0
+
+    def get(self, locator):
+        """Элемент из кеша или None"""
+        element = self._elements.get(locator)
+        element_cache_stats.add("hits" if element is not None else "misses")
+        return element
+
+    def put(self, locator, element):
+        self._elements[locator] = element
+
+    def discard(self, locator):
+        """Убрать устаревший элемент из кеша"""
+        self._elements.pop(locator, None)
+
+    def invalidate(self):
+        """Сбросить кеш целиком и начать новое поколение DOM"""
+        if self._elements:
+            element_cache_stats.add("invalidations")
+        self._elements.clear()
+        self.generation += 1
+
+    def on_command(self, command, params, seconds, response):
+        """Слушатель команд WebDriver: после навигации старые элементы недействительны"""
+        if command in NAVIGATION_COMMANDS:
+            self.invalidate()
+
+
+def element_cache_for(driver):
+    """Кеш элементов браузера (общий для всех Page Objects этого браузера)"""
+    cache = getattr(driver, "_element_cache", None)
+    if cache is None:
+        cache = driver._element_cache = ElementCache()
+        add_command_listener(driver, cache.on_command)
+    return cache
@@ -0,0 +1,11 @@
+import os
+
+
+def worker_id():
+    """Идентификатор воркера pytest-xdist (gw0, gw1, ...) или 'master' при обычном запуске"""
+    return os.environ.get("PYTEST_XDIST_WORKER", "master")
+
+
+def is_worker(config):
+    """Запущен ли процесс как воркер pytest-xdist"""
+    return hasattr(config, "workerinput")
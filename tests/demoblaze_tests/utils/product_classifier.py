@@ -0,0 +1,82 @@
+"""
+Классификатор товаров по названию
+Все словари категорий собраны в одно регулярное выражение: список названий
+проверяется за один проход, для каждого товара возвращается категория и найденные слова
+"""
+import bisect
+import hashlib
+import json
+import re
+from collections import namedtuple
+
+# Характерные слова категорий (категории называются так же, как в byCat на сайте)
+# Неоднозначные бренды указаны вместе с линейкой: sony xperia - телефон, sony vaio - ноутбук
+VOCABULARY = {
+    "phone": ("samsung galaxy", "galaxy", "nokia", "lumia", "nexus", "iphone", "htc", "sony xperia", "xperia"),
+    "notebook": ("sony vaio", "vaio", "macbook", "dell", "laptop"),
+    "monitor": ("monitor", "asus full hd", "full hd", "cinema display"),
+}
+
+# Результат классификации: category - None, если ни одно слово не найдено
+Classification = namedtuple("Classification", ["title", "category", "evidence"])
+
+
+class ProductClassifier:
+    """Одно скомпилированное регулярное выражение на все словари"""
+
+    def __init__(self, vocabulary=VOCABULARY, whole_words=True):
+        # whole_words=False - искать слова как подстроки ("sam" найдется в "Samsung")
+        self.vocabulary = vocabulary
+        self.whole_words = whole_words
+        self._categories = {
+            keyword.lower(): category for category, keywords in vocabulary.items() for keyword in keywords
+        }
+        # Длинные слова первыми: "sony vaio" находится раньше, чем "vaio"
+        alternation = "|".join(re.escape(keyword) for keyword in sorted(self._categories, key=len, reverse=True))
+        boundary = r"\b" if whole_words else ""
+        self._pattern = re.compile(rf"{boundary}(?:{alternation}){boundary}", re.IGNORECASE)
+
+    @property
+    def categories(self):
+        return tuple(self.vocabulary)
+
+    @property
+    def version(self):
+        """Хеш словарей и правил поиска: после их изменения старые результаты проверок не действуют"""
+        data = json.dumps({"vocabulary": self.vocabulary, "whole_words": self.whole_words}, sort_keys=True)
+        return hashlib.sha1(data.encode()).hexdigest()[:12]
+
+    def classify(self, title):
+        """Категория одного названия"""
+        return self.classify_all([title])[0]
+
+    def classify_all(self, titles):
+        """
+        Классифицировать весь список за один проход регулярного выражения
+        Категория товара - та, чьи найденные слова длиннее в сумме (самое точное совпадение)
+        """
+        # Все названия склеиваются в один текст, по смещению совпадения находится его товар
+        starts = []
+        offset = 0
+        for title in titles:
+            starts.append(offset)
+            offset += len(title) + 1
+        text = "\n".join(titles)
+
+        evidence = [[] for _ in titles]
+        for match in self._pattern.finditer(text):
+            evidence[bisect.bisect_right(starts, match.start()) - 1].append(match.group().lower())
+
+        results = []
+        for title, words in zip(titles, evidence):
+            weights = {}
+            for word in words:
+                category = self._categories[word]
+                weights[category] = weights.get(category, 0) + len(word)
+            category = max(weights, key=weights.get) if weights else None
+            results.append(Classification(title, category, tuple(words)))
+        return results
+
+
+# Общий классификатор со словарями всех категорий
+product_classifier = ProductClassifier()
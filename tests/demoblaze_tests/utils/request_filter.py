@@ -0,0 +1,297 @@
+"""
+Фильтр запросов браузера через локальный прокси
+Firefox настраивается на прокси (см. BrowserProfile.proxy), прокси по правилам теста
+подменяет картинки заглушкой, а шрифты и аналитику не пропускает совсем.
+HTTPS идет через CONNECT-туннель: в нем виден только хост, поэтому для HTTPS
+блокируются целые хосты (аналитика), а картинки отключаются настройками браузера
+"""
+import http.client
+import select
+import socket
+import threading
+from fnmatch import fnmatch
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+from ..stub.server import PLACEHOLDER_PNG
+
+# Категории запросов, которые можно блокировать по имени
+CATEGORY_EXTENSIONS = {
+    "images": (".png", ".jpg", ".jpeg", ".gif", ".webp", ".svg", ".ico", ".bmp"),
+    "fonts": (".woff", ".woff2", ".ttf", ".otf", ".eot"),
+}
+ANALYTICS_HOSTS = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+    "facebook.net", "hotjar.com", "yandex.ru", "mc.yandex.ru", "cloudflareinsights.com",
+)
+
+# Заголовки, которые относятся к одному соединению и не передаются дальше
+HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-connection", "proxy-authorization",
+    "te", "trailers", "transfer-encoding", "upgrade",
+}
+
+
+class FilterRules:
+    """
+    Правила фильтра
+    block - категории (images, fonts, analytics) и/или шаблоны URL (*/imgs/*)
+    allow - шаблоны URL, которые пропускаются, даже если попали под block
+    """
+
+    def __init__(self, block=(), allow=()):
+        self.block = tuple(block)
+        self.allow = tuple(allow)
+
+    def merged(self, block=(), allow=(), unblock=()):
+        """Правила теста поверх правил запуска; unblock - категории, которые тесту нужны"""
+        return FilterRules(
+            [rule for rule in self.block + tuple(block) if rule not in unblock],
+            self.allow + tuple(allow)
+        )
+
+    def match(self, url):
+        """Категория, под которую попал URL (или шаблон), None - запрос пропускается"""
+        if any(fnmatch(url, pattern) for pattern in self.allow):
+            return None
+        parts = urlsplit(url)
+        host = parts.hostname or ""
+        path = parts.path.lower()
+        for rule in self.block:
+            if rule == "analytics":
+                if any(host == name or host.endswith("." + name) for name in ANALYTICS_HOSTS):
+                    return rule
+            elif rule in CATEGORY_EXTENSIONS:
+                if path.endswith(CATEGORY_EXTENSIONS[rule]):
+                    return rule
+            elif fnmatch(url, rule):
+                return rule
+        return None
+
+
+class RequestFilterStats:
+    """
+    Заблокированные запросы и байты по тестам
+    Размер заблокированного ресурса узнается HEAD-запросом уже после ответа браузеру
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        # тест -> {"blocked": {категория: запросов}, "blocked_bytes": n, "passed": n, "passed_bytes": n}
+        self._data = {}
+
+    def _entry(self, test):
+        return self._data.setdefault(test, {"blocked": {}, "blocked_bytes": 0, "passed": 0, "passed_bytes": 0})
+
+    def record_blocked(self, test, category, size):
+        with self._lock:
+            entry = self._entry(test)
+            entry["blocked"][category] = entry["blocked"].get(category, 0) + 1
+            entry["blocked_bytes"] += size or 0
+
+    def record_passed(self, test, size):
+        with self._lock:
+            entry = self._entry(test)
+            entry["passed"] += 1
+            entry["passed_bytes"] += size
+
+    def to_dict(self):
+        """Данные статистики для передачи из воркера xdist"""
+        with self._lock:
+            return {test: dict(entry, blocked=dict(entry["blocked"])) for test, entry in self._data.items()}
+
+    def merge(self, data):
+        """Добавить статистику, полученную от воркера xdist"""
+        with self._lock:
+            for test, other in data.items():
+                entry = self._entry(test)
+                for category, count in other["blocked"].items():
+                    entry["blocked"][category] = entry["blocked"].get(category, 0) + count
+                for key in ("blocked_bytes", "passed", "passed_bytes"):
+                    entry[key] += other[key]
+
+    def totals(self):
+        """Итоги запуска: заблокировано по категориям, байты, пропущено"""
+        blocked = {}
+        totals = {"blocked_bytes": 0, "passed": 0, "passed_bytes": 0}
+        for entry in self._data.values():
+            for category, count in entry["blocked"].items():
+                blocked[category] = blocked.get(category, 0) + count
+            for key in totals:
+                totals[key] += entry[key]
+        return dict(totals, blocked=blocked)
+
+    def rows(self):
+        """Тесты, отсортированные по заблокированным байтам"""
+        return sorted(self._data.items(), key=lambda item: item[1]["blocked_bytes"], reverse=True)
+
+
+# Общий объект статистики для всего запуска
+request_filter_stats = RequestFilterStats()
+
+
+class FilterProxyHandler(BaseHTTPRequestHandler):
+    """HTTP-прокси: запросы по http:// разбираются, https:// проходит туннелем"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._proxy()
+
+    do_POST = do_PUT = do_DELETE = do_HEAD = do_OPTIONS = do_PATCH = do_GET
+
+    def do_CONNECT(self):
+        host, _, port = self.path.rpartition(":")
+        proxy = self.server.request_filter
+        test = proxy.test
+        category = proxy.rules.match(f"https://{host}/")
+        if category is not None:
+            self.send_error(403, "Blocked by request filter")
+            request_filter_stats.record_blocked(test, category, None)
+            return
+
+        try:
+            upstream = socket.create_connection((host, int(port or 443)), timeout=30)
+        except OSError:
+            self.send_error(502)
+            return
+        self.send_response(200, "Connection Established")
+        self.end_headers()
+        transferred = self._tunnel(upstream)
+        request_filter_stats.record_passed(test, transferred)
+
+    def _proxy(self):
+        proxy = self.server.request_filter
+        test = proxy.test
+        url = self.path
+        category = proxy.rules.match(url)
+        if category is not None:
+            if category == "images" or url.lower().endswith(CATEGORY_EXTENSIONS["images"]):
+                # Заглушка вместо картинки: у <img> срабатывает onload, верстка не ломается
+                self._send(200, PLACEHOLDER_PNG, "image/png")
+            else:
+                self._send(204, b"", None)
+            request_filter_stats.record_blocked(test, category, self._remote_size(url))
+            return
+
+        parts = urlsplit(url)
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        headers = {
+            name: value for name, value in self.headers.items() if name.lower() not in HOP_BY_HOP_HEADERS
+        }
+        connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        connection = connection_class(parts.hostname, parts.port, timeout=30)
+        try:
+            target = parts.path or "/"
+            if parts.query:
+                target += "?" + parts.query
+            connection.request(self.command, target, body=body or None, headers=headers)
+            response = connection.getresponse()
+            data = response.read()
+        except OSError:
+            self.send_error(502)
+            return
+        finally:
+            connection.close()
+
+        self.send_response(response.status, response.reason)
+        for name, value in response.getheaders():
+            if name.lower() not in HOP_BY_HOP_HEADERS and name.lower() != "content-length":
+                self.send_header(name, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Connection", "close")
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(data)
+        if self.command == "GET" and response.status == 200:
+            proxy.sizes[url] = len(data)
+        request_filter_stats.record_passed(test, len(data))
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+        self.wfile.flush()
+
+    def _remote_size(self, url):
+        """Размер заблокированного ресурса (ответ браузеру уже отправлен, тест не ждет)"""
+        sizes = self.server.request_filter.sizes
+        if url in sizes:
+            return sizes[url]
+        parts = urlsplit(url)
+        connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        connection = connection_class(parts.hostname, parts.port, timeout=10)
+        size = None
+        try:
+            connection.request("HEAD", parts.path or "/")
+            response = connection.getresponse()
+            if response.status == 200 and response.getheader("Content-Length"):
+                size = int(response.getheader("Content-Length"))
+        except (OSError, ValueError):
+            pass
+        finally:
+            connection.close()
+        sizes[url] = size
+        return size
+
+    def _tunnel(self, upstream):
+        """Передавать байты в обе стороны, пока одна из сторон не закроет соединение"""
+        transferred = 0
+        sockets = [self.connection, upstream]
+        try:
+            while True:
+                readable, _, errored = select.select(sockets, [], sockets, 30)
+                if errored or not readable:
+                    break
+                for source in readable:
+                    data = source.recv(65536)
+                    if not data:
+                        return transferred
+                    (upstream if source is self.connection else self.connection).sendall(data)
+                    transferred += len(data)
+        except OSError:
+            pass
+        finally:
+            upstream.close()
+        return transferred
+
+
+class RequestFilter:
+    """Локальный прокси-фильтр в фоновом потоке (один на процесс pytest)"""
+
+    def __init__(self, rules=None, host="127.0.0.1", port=0):
+        self.default_rules = rules or FilterRules()
+        self.rules = self.default_rules
+        # Тест, которому сейчас принадлежат запросы браузера
+        self.test = None
+        # Размеры заблокированных ресурсов по URL
+        self.sizes = {}
+        self.httpd = ThreadingHTTPServer((host, port), FilterProxyHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.request_filter = self
+        self._thread = None
+
+    @property
+    def address(self):
+        """host:port прокси для настроек браузера"""
+        host, port = self.httpd.server_address[:2]
+        return f"{host}:{port}"
+
+    def use(self, test, rules=None):
+        """Правила и имя теста для следующих запросов браузера"""
+        self.test = test
+        self.rules = rules or self.default_rules
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
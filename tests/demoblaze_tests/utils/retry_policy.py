@@ -0,0 +1,115 @@
+"""
+Повтор отдельных шагов Page Objects при таймауте
+Повторяется только упавший шаг (а не весь тест): действие шага (клик, переход, отправка формы)
+выполняется заново вместе с ожиданием его результата, с экспоненциальной паузой.
+На повторы у каждого теста есть бюджет времени, после общего дедлайна запуска повторов нет
+"""
+import threading
+import time
+from selenium.common.exceptions import TimeoutException
+
+
+class RetryPolicy:
+    """
+    Политика повторов шагов
+    Включается параметром --step-retries
+    """
+
+    def __init__(self):
+        self.enabled = False
+        # Сколько раз повторить шаг после первого таймаута
+        self.retries = 0
+        # Сколько секунд один тест может потратить на повторы (паузы + повторные ожидания)
+        self.test_budget = 30.0
+        self.base_delay = 0.5
+        self.max_delay = 4.0
+        # time.monotonic(), после которого шаги больше не повторяются (None - без дедлайна)
+        self.deadline = None
+        self._lock = threading.Lock()
+        self._spent = 0.0
+        self._records = []
+        # Итоги запуска
+        self.totals = {"retries": 0, "recovered": 0, "seconds": 0.0, "tests": 0}
+
+    def configure(self, retries, test_budget=30.0, run_deadline=None):
+        """run_deadline - сколько секунд от текущего момента разрешены повторы"""
+        self.enabled = retries > 0
+        self.retries = retries
+        self.test_budget = test_budget
+        self.deadline = time.monotonic() + run_deadline if run_deadline else None
+
+    def begin_test(self):
+        """Новый тест - новый бюджет"""
+        with self._lock:
+            self._spent = 0.0
+            self._records = []
+
+    def end_test(self):
+        """Повторы шагов закончившегося теста (для отчета)"""
+        with self._lock:
+            records, self._records = self._records, []
+            if records:
+                self.totals["tests"] += 1
+            return records
+
+    def remaining(self):
+        """Сколько секунд еще можно потратить на повторы в текущем тесте"""
+        remaining = self.test_budget - self._spent
+        if self.deadline is not None:
+            remaining = min(remaining, self.deadline - time.monotonic())
+        return remaining
+
+    def call(self, name, attempt, timeout):
+        """
+        Выполнить шаг attempt(timeout) - действие и ожидание его результата;
+        при TimeoutException повторить шаг целиком с паузой 0.5, 1, 2... с
+        Повторное ожидание не дольше исходного timeout и остатка бюджета
+        """
+        try:
+            return attempt(timeout)
+        except TimeoutException as error:
+            if not self.enabled:
+                raise
+            last_error = error
+
+        for number in range(1, self.retries + 1):
+            delay = min(self.base_delay * 2 ** (number - 1), self.max_delay)
+            remaining = self.remaining()
+            if remaining <= delay:
+                break
+            time.sleep(delay)
+            start = time.perf_counter()
+            try:
+                result = attempt(min(timeout, remaining - delay))
+                self._record(name, number, delay, time.perf_counter() - start, True)
+                return result
+            except TimeoutException as error:
+                self._record(name, number, delay, time.perf_counter() - start, False)
+                last_error = error
+        raise last_error
+
+    def _record(self, name, number, delay, seconds, recovered):
+        with self._lock:
+            self._spent += delay + seconds
+            self._records.append(
+                {"step": name, "attempt": number, "delay": delay, "seconds": seconds, "recovered": recovered}
+            )
+            self.totals["retries"] += 1
+            self.totals["seconds"] += delay + seconds
+            if recovered:
+                self.totals["recovered"] += 1
+
+    def to_dict(self):
+        """Итоги для передачи из воркера xdist"""
+        with self._lock:
+            return dict(self.totals)
+
+    def merge(self, data):
+        """Добавить итоги, полученные от воркера xdist"""
+        with self._lock:
+            for key, value in data.items():
+                self.totals[key] += value
+
+
+# Общая политика повторов для всего запуска
+retry_policy = RetryPolicy()
@@ -0,0 +1,114 @@
+import heapq
+import time
+from .json_store import load_json, save_json
+from .stats import percentile
+
+# Сколько последних запусков теста хранить
+HISTORY_DEPTH = 5
+
+
+class RunHistory:
+    """
+    История запусков тестов: длительности и падения за последние запуски
+    По ней тесты упорядочиваются: недавно упавшие первыми, затем самые долгие
+    """
+
+    def __init__(self):
+        self.path = None
+        # nodeid -> {"durations": [...], "outcomes": [True/False, ...], "last_run": timestamp}
+        self.tests = {}
+        self._current = {}
+
+    def load(self, path):
+        """Прочитать историю прошлых запусков (если файла еще нет - история пустая)"""
+        self.path = path
+        self.tests = load_json(path, {}).get("tests", {})
+        self._current = {}
+
+    def record(self, nodeid, duration, failed):
+        """Добавить длительность фазы теста (setup/call/teardown) в текущий запуск"""
+        current = self._current.setdefault(nodeid, {"duration": 0.0, "failed": False})
+        current["duration"] += duration
+        current["failed"] = current["failed"] or failed
+
+    def executed(self):
+        """Тесты, выполненные в текущем запуске"""
+        return list(self._current)
+
+    def save(self):
+        """Сохранить результаты текущего запуска в файл истории"""
+        if not self._current or self.path is None:
+            return
+        now = time.time()
+        for nodeid, current in self._current.items():
+            entry = self.tests.setdefault(nodeid, {"durations": [], "outcomes": []})
+            entry["durations"] = (entry["durations"] + [current["duration"]])[-HISTORY_DEPTH:]
+            entry["outcomes"] = (entry["outcomes"] + [not current["failed"]])[-HISTORY_DEPTH:]
+            entry["last_run"] = now
+        save_json(self.path, {"tests": self.tests})
+
+    def default_duration(self):
+        """Ожидаемая длительность теста без истории - медиана известных тестов"""
+        known = [self.duration(nodeid) for nodeid in self.tests]
+        return percentile(known, 50) if known else 1.0
+
+    def duration(self, nodeid, default=None):
+        """Ожидаемая длительность теста - среднее по последним запускам"""
+        entry = self.tests.get(nodeid)
+        if not entry or not entry["durations"]:
+            return default if default is not None else self.default_duration()
+        return sum(entry["durations"]) / len(entry["durations"])
+
+    def failure_priority(self, nodeid):
+        """0 - упал в прошлый раз, 1 - падал в последних запусках, 2 - стабилен или нет истории"""
+        outcomes = self.tests.get(nodeid, {}).get("outcomes", [])
+        if outcomes and not outcomes[-1]:
+            return 0
+        if not all(outcomes):
+            return 1
+        return 2
+
+    def order(self, nodeids, group_of=None):
+        """
+        Порядок запуска: недавно упавшие, затем самые долгие (лучше раскладывается по воркерам)
+        group_of(nodeid) - ключ группы, тесты одной группы остаются рядом
+        (группа сортируется по своему самому приоритетному тесту и суммарной длительности)
+        """
+        default = self.default_duration()
+        group_of = group_of or (lambda nodeid: nodeid)
+
+        groups = {}
+        for index, nodeid in enumerate(nodeids):
+            groups.setdefault(group_of(nodeid), []).append((index, nodeid))
+
+        def test_key(entry):
+            index, nodeid = entry
+            return self.failure_priority(nodeid), -self.duration(nodeid, default), index
+
+        def group_key(members):
+            return (
+                min(self.failure_priority(nodeid) for _, nodeid in members),
+                -sum(self.duration(nodeid, default) for _, nodeid in members),
+                members[0][0],
+            )
+
+        ordered = []
+        for members in sorted(groups.values(), key=group_key):
+            ordered.extend(nodeid for _, nodeid in sorted(members, key=test_key))
+        return ordered
+
+    def predict_makespan(self, nodeids, workers):
+        """
+        Ожидаемое время всего запуска: тесты по очереди отдаются самому свободному воркеру
+        (так же, как их раздает xdist при упорядочивании от долгих к коротким)
+        """
+        default = self.default_duration()
+        loads = [0.0] * max(workers, 1)
+        for nodeid in nodeids:
+            least = heapq.heappop(loads)
+            heapq.heappush(loads, least + self.duration(nodeid, default))
+        return max(loads)
+
+
+# Общая история для всего запуска
+run_history = RunHistory()
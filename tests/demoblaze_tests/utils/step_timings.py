@@ -0,0 +1,109 @@
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from .stats import summarize
+
+
+class StepTimings:
+    """
+    Время выполнения шагов Page Objects и число команд WebDriver на шаг
+    Включается параметром --step-timings
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        # имя шага -> {"seconds": [...], "commands": [...]}
+        self._samples = {}
+        # Стек вложенных шагов текущего потока (click_element вызывает find_clickable_element и т.д.)
+        self._local = threading.local()
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def measure(self, name):
+        """Замерить шаг: время и количество команд WebDriver внутри него"""
+        if not self.enabled:
+            yield
+            return
+
+        frame = [0]
+        stack = self._stack()
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            stack.pop()
+            with self._lock:
+                samples = self._samples.setdefault(name, {"seconds": [], "commands": []})
+                samples["seconds"].append(seconds)
+                samples["commands"].append(frame[0])
+
+    def on_command(self, command, params, seconds, response):
+        """Слушатель команд WebDriver: засчитать команду всем открытым шагам"""
+        for frame in self._stack():
+            frame[0] += 1
+
+    def to_dict(self):
+        """Сырые замеры для передачи из воркера xdist"""
+        with self._lock:
+            return {name: {key: list(values) for key, values in samples.items()}
+                    for name, samples in self._samples.items()}
+
+    def merge(self, data):
+        """Добавить замеры, полученные от воркера xdist"""
+        with self._lock:
+            for name, samples in data.items():
+                target = self._samples.setdefault(name, {"seconds": [], "commands": []})
+                target["seconds"].extend(samples["seconds"])
+                target["commands"].extend(samples["commands"])
+
+    def summary(self):
+        """Сводка по шагам: p50/p95/max времени и число команд"""
+        result = {}
+        for name, samples in self._samples.items():
+            step = summarize(samples["seconds"])
+            step["total"] = sum(samples["seconds"])
+            step["commands_mean"] = sum(samples["commands"]) / len(samples["commands"])
+            step["commands_total"] = sum(samples["commands"])
+            result[name] = step
+        return result
+
+    def write_json(self, path):
+        """Сохранить сводку в JSON, шаги отсортированы по p95"""
+        summary = self.summary()
+        steps = dict(sorted(summary.items(), key=lambda item: item[1]["p95"], reverse=True))
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"steps": steps}, file, ensure_ascii=False, indent=2)
+
+
+# Общий объект замеров для всего запуска
+step_timings = StepTimings()
+
+
+def timed_step(func):
+    """Декоратор: замерить вызов метода Page Object"""
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if not step_timings.enabled:
+            return func(self, *args, **kwargs)
+        with step_timings.measure(func.__qualname__):
+            return func(self, *args, **kwargs)
+    return wrapper
+
+
+def instrument_page(cls):
+    """Декоратор класса: замерять все публичные методы Page Object"""
+    for name, value in list(vars(cls).items()):
+        if callable(value) and not name.startswith("_") and not isinstance(value, (staticmethod, classmethod)):
+            setattr(cls, name, timed_step(value))
+    return cls
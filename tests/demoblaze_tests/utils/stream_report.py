@@ -0,0 +1,190 @@
+"""
+Потоковый отчет о запуске
+Результат каждого теста сразу дописывается строкой в reports/stream/results.jsonl,
+скриншоты и текстовые вложения лежат отдельными файлами в reports/stream/assets/.
+В памяти ничего не накапливается, а после падения запуска в файле остаются все тесты,
+которые успели закончиться. HTML для просмотра строится из JSONL только по запросу:
+
+    python -m tests.demoblaze_tests.utils.stream_report reports/stream
+"""
+import argparse
+import html
+import json
+import os
+import shutil
+import threading
+import time
+from collections import Counter
+
+RESULTS_FILE = "results.jsonl"
+ASSETS_DIR = "assets"
+INDEX_FILE = "index.html"
+
+
+class StreamReport:
+    """
+    Запись потокового отчета
+    Вложения собирают все процессы, строки отчета пишет только главный процесс xdist
+    (отчеты воркеров приходят в него вместе со ссылками на вложения)
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.directory = None
+        # Пишет ли этот процесс строки отчета (главный процесс или запуск без xdist)
+        self.writer = False
+        self._lock = threading.Lock()
+        self._file = None
+        # Вложения текущей фазы теста, до отчета об этой фазе
+        self._assets = []
+
+    def configure(self, directory, writer=True):
+        """Главный процесс начинает новый отчет: старые результаты и вложения удаляются"""
+        self.enabled = True
+        self.directory = directory
+        self.writer = writer
+        if not writer:
+            return
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(os.path.join(directory, ASSETS_DIR))
+        # Построчная буферизация: каждая строка попадает в файл сразу
+        self._file = open(os.path.join(directory, RESULTS_FILE), "a", encoding="utf-8", buffering=1)
+        self._write_line({"type": "run", "started": time.time()})
+
+    @staticmethod
+    def asset_path(digest, extension):
+        """Имя файла вложения по хешу содержимого (одинаковые вложения хранятся один раз)"""
+        return f"{ASSETS_DIR}/{digest}.{extension}"
+
+    def add_asset(self, name, path):
+        """Привязать вложение к текущей фазе теста (файл пишется в фоне через write_asset)"""
+        with self._lock:
+            self._assets.append({"name": name, "path": path})
+
+    def write_asset(self, path, body):
+        """Записать файл вложения (вызывается из фонового потока вложений)"""
+        full_path = os.path.join(self.directory, path)
+        if os.path.exists(full_path):
+            return
+        tmp_path = f"{full_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(body.encode("utf-8") if isinstance(body, str) else body)
+        os.replace(tmp_path, full_path)
+
+    def take_assets(self):
+        """Вложения, добавленные с прошлого вызова (для отчета о фазе теста)"""
+        with self._lock:
+            assets, self._assets = self._assets, []
+            return assets
+
+    def write(self, report):
+        """Дописать строку с результатом фазы теста: call всегда, setup и teardown - если не passed"""
+        if not self.writer:
+            return
+        if report.when != "call" and report.passed and not getattr(report, "stream_assets", None):
+            return
+        self._write_line({
+            "type": "test",
+            "nodeid": report.nodeid,
+            "when": report.when,
+            "outcome": report.outcome,
+            "duration": report.duration,
+            # Воркер xdist, выполнивший тест (None без xdist)
+            "worker": getattr(report, "worker_id", None),
+            "longrepr": str(report.longrepr) if report.failed or report.skipped else None,
+            "user_properties": [[str(name), str(value)] for name, value in report.user_properties],
+            "assets": getattr(report, "stream_assets", []),
+        })
+
+    def finish(self, exitstatus):
+        """Последняя строка: запуск закончился (ее нет, если запуск упал)"""
+        if self._file is None:
+            return
+        self._write_line({"type": "finished", "finished": time.time(), "exitstatus": int(exitstatus)})
+        self._file.close()
+        self._file = None
+
+    def _write_line(self, record):
+        with self._lock:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+# Общий потоковый отчет для всего запуска
+stream_report = StreamReport()
+
+
+def read_records(directory):
+    """Строки отчета по одной (файл не загружается в память целиком)"""
+    with open(os.path.join(directory, RESULTS_FILE), encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # Последняя строка могла оборваться при падении запуска
+                continue
+
+
+def build_index(directory, force=False):
+    """
+    HTML для просмотра отчета; строится заново, только если results.jsonl изменился
+    Возвращает путь к index.html
+    """
+    results_path = os.path.join(directory, RESULTS_FILE)
+    index_path = os.path.join(directory, INDEX_FILE)
+    if not force and os.path.exists(index_path) and os.path.getmtime(index_path) >= os.path.getmtime(results_path):
+        return index_path
+
+    # Первый проход - итоги, второй - строки таблицы
+    counts = Counter()
+    finished = None
+    for record in read_records(directory):
+        if record["type"] == "test" and (record["when"] == "call" or record["outcome"] != "passed"):
+            counts[record["outcome"]] += 1
+        elif record["type"] == "finished":
+            finished = record
+
+    with open(index_path, "w", encoding="utf-8") as page:
+        page.write(
+            "<!DOCTYPE html><html><head><meta charset='utf-8'><title>Отчет о запуске</title><style>"
+            "body{font-family:sans-serif} td{vertical-align:top;padding:4px 8px;border-bottom:1px solid #ddd}"
+            ".passed{color:#080} .failed{color:#c00} .skipped{color:#888} img{max-width:320px}"
+            "</style></head><body><h1>Отчет о запуске</h1>"
+        )
+        page.write("<p>" + ", ".join(f"{outcome}: {count}" for outcome, count in sorted(counts.items())))
+        if finished is None:
+            page.write(" - <b>запуск не завершен</b>, показаны тесты, которые успели закончиться")
+        page.write("</p><table><tr><th>Тест</th><th>Фаза</th><th>Результат</th><th>Время, с</th><th>Вложения</th></tr>")
+        for record in read_records(directory):
+            if record["type"] != "test":
+                continue
+            page.write(
+                f"<tr><td>{html.escape(record['nodeid'])}</td><td>{record['when']}</td>"
+                f"<td class='{record['outcome']}'>{record['outcome']}</td><td>{record['duration']:.2f}</td><td>"
+            )
+            for asset in record["assets"]:
+                path = html.escape(asset["path"], quote=True)
+                name = html.escape(asset["name"] or asset["path"])
+                if path.endswith((".png", ".jpg")):
+                    page.write(f"<a href='{path}'><img src='{path}' alt='{name}' loading='lazy'></a><br>")
+                else:
+                    page.write(f"<a href='{path}'>{name}</a><br>")
+            if record["longrepr"]:
+                page.write(f"<details><summary>Подробности</summary><pre>{html.escape(record['longrepr'])}</pre></details>")
+            page.write("</td></tr>")
+        page.write("</table></body></html>")
+    return index_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML для просмотра потокового отчета")
+    parser.add_argument("directory", nargs="?", default="reports/stream", help="Папка потокового отчета")
+    parser.add_argument("--force", action="store_true", help="Построить HTML заново, даже если отчет не менялся")
+    args = parser.parse_args()
+    print(build_index(args.directory, force=args.force))
+
+
+if __name__ == "__main__":
+    main()
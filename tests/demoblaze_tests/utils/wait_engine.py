@@ -0,0 +1,371 @@
+"""
+Ожидания Page Objects без опроса с фиксированным интервалом
+В страницу один раз ставится MutationObserver; ожидание блокируется в одном асинхронном
+скрипте до следующего изменения DOM и только после этого проверяет условие снова.
+Если асинхронные скрипты недоступны (драйвер без браузера, ошибка скрипта), условие
+опрашивается с паузой, которая начинается с нескольких миллисекунд и растет
+
+Наблюдатель регистрируется в браузере как preload-скрипт (WebDriver BiDi) и ставится
+в каждую страницу до ее скриптов, поэтому видит и первые запросы страницы (entries, bycat).
+Если preload-скрипты недоступны, наблюдатель ставится первым скриптом ожидания, когда
+страница уже загружена, и не знает о запросах, начатых до него: такая страница считается
+нестабильной, пока после установки наблюдателя не пройдет LATE_WATCHER_QUIET_SECONDS
+"""
+import threading
+import time
+from selenium.common.exceptions import (
+    NoAlertPresentException,
+    NoSuchElementException,
+    TimeoutException,
+    UnexpectedAlertPresentException,
+    WebDriverException,
+)
+from .dom_driver import browserless_script
+
+# Наблюдатель за страницей, ставится один раз на страницу (общая часть скриптов ниже)
+# Считает изменения DOM и запросы fetch/XHR, которые сейчас выполняются;
+# конец запроса и конец анимации тоже считаются изменением страницы.
+# late - наблюдатель поставлен после начала загрузки страницы (не preload-скриптом)
+# и мог пропустить запросы, начатые до установки
+WATCHER_SCRIPT = """
+var watcher = window.__pageWatcher;
+if (!watcher) {
+    watcher = window.__pageWatcher = {
+        token: Math.random().toString(36).slice(2), seq: 0, waiters: [], requests: 0,
+        installedAt: performance.now(), lastChange: performance.now(),
+        late: document.readyState !== 'loading'
+    };
+    var wake = function () {
+        watcher.seq += 1;
+        watcher.lastChange = performance.now();
+        var waiters = watcher.waiters;
+        watcher.waiters = [];
+        for (var i = 0; i < waiters.length; i++) {
+            waiters[i]();
+        }
+    };
+    var finished = function () {
+        watcher.requests -= 1;
+        wake();
+    };
+    new MutationObserver(wake).observe(document, {
+        subtree: true, childList: true, attributes: true, characterData: true
+    });
+    // Анимации (например, появление модального окна) заканчиваются без изменения DOM
+    document.addEventListener('transitionend', wake, true);
+    document.addEventListener('animationend', wake, true);
+    var originalFetch = window.fetch;
+    if (originalFetch) {
+        window.fetch = function () {
+            watcher.requests += 1;
+            var request = originalFetch.apply(this, arguments);
+            request.then(finished, finished);
+            return request;
+        };
+    }
+    var originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        watcher.requests += 1;
+        this.addEventListener('loadend', finished);
+        return originalSend.apply(this, arguments);
+    };
+}
+"""
+
+# Скрипт ожидания изменения DOM
+# Аргументы: токен страницы и номер изменения, которые видел Python, и сколько ждать (мс).
+# Если страница или DOM уже изменились после прошлого вызова, скрипт возвращается сразу
+WAIT_FOR_CHANGE_SCRIPT = """
+var token = arguments[0], seq = arguments[1], timeout = arguments[2];
+var done = arguments[arguments.length - 1];
+""" + WATCHER_SCRIPT + """
+var start = performance.now();
+var result = function () {
+    return {token: watcher.token, seq: watcher.seq, waited: performance.now() - start};
+};
+if (watcher.token !== token || watcher.seq !== seq) {
+    done(result());
+    return;
+}
+var timer;
+var waiter = function () {
+    clearTimeout(timer);
+    done(result());
+};
+timer = setTimeout(function () {
+    var index = watcher.waiters.indexOf(waiter);
+    if (index >= 0) {
+        watcher.waiters.splice(index, 1);
+    }
+    done(result());
+}, timeout);
+watcher.waiters.push(waiter);
+"""
+
+# Состояние страницы для проверок отсутствия
+# Аргументы: сколько мс DOM должен не меняться и сколько мс после установки считать
+# нестабильной страницу с поздно поставленным наблюдателем.
+# stable - страница загружена, нет запросов и анимаций, видимость модальных окон не меняется
+# и DOM не менялся quiet мс; settle_in - сколько мс еще ждать тишины в DOM
+PAGE_STATE_SCRIPT = """
+var quiet = arguments[0], lateQuiet = arguments[1];
+""" + WATCHER_SCRIPT + """
+var state = function (reason, settleIn) {
+    return {stable: !reason, reason: reason, settle_in: settleIn || 0};
+};
+if (document.readyState !== 'complete') {
+    return state('loading');
+}
+var sinceInstall = performance.now() - watcher.installedAt;
+if (watcher.late && sinceInstall < lateQuiet) {
+    return state('watcher', lateQuiet - sinceInstall);
+}
+if (watcher.requests > 0) {
+    return state('requests');
+}
+var animating = document.getAnimations && document.getAnimations().some(function (animation) {
+    return animation.playState === 'running';
+});
+var switching = Array.prototype.some.call(document.querySelectorAll('.modal'), function (modal) {
+    return modal.classList.contains('show') !== (getComputedStyle(modal).display !== 'none');
+});
+if (animating || switching) {
+    return state('animation');
+}
+var sinceChange = performance.now() - watcher.lastChange;
+return sinceChange < quiet ? state('dom', quiet - sinceChange) : state('');
+"""
+
+
+@browserless_script(PAGE_STATE_SCRIPT)
+def _page_state(driver, quiet, late_quiet):
+    # Без браузера код страницы выполняется синхронно: запросов и анимаций в фоне не бывает.
+    # Как и браузер, при открытом alert скрипт не выполняется
+    try:
+        alert = driver.switch_to.alert
+    except NoAlertPresentException:
+        return {"stable": True, "reason": "", "settle_in": 0}
+    raise UnexpectedAlertPresentException(alert_text=alert.text)
+
+# Один вызов скрипта ждет не дольше этого (меньше стандартного таймаута скриптов WebDriver, 30 с)
+EVENT_SLICE_SECONDS = 5.0
+
+# Опрос: первая пауза, рост паузы и ее предел
+POLL_START_SECONDS = 0.005
+POLL_FACTOR = 2
+POLL_MAX_SECONDS = 0.25
+
+# Сколько DOM должен не меняться, чтобы страница считалась стабильной
+QUIET_SECONDS = 0.05
+
+# Сколько после установки наблюдателя ждать, если он поставлен в уже загруженную страницу
+# (без preload-скрипта): столько обычно идут первые запросы каталога demoblaze
+LATE_WATCHER_QUIET_SECONDS = 0.5
+
+# После стольких ошибок скрипта подряд браузер переходит на опрос
+MAX_SCRIPT_ERRORS = 3
+
+# Исключения, при которых условие считается невыполненным (как в WebDriverWait)
+IGNORED_EXCEPTIONS = (NoSuchElementException,)
+
+
+class WaitEngineStats:
+    """
+    Сколько ожиданий закончилось сразу, сколько раз условие проверялось повторно
+    и на сколько ожидание опоздало: время от момента, когда условие могло стать истинным
+    (изменение DOM или последняя неудачная проверка), до его проверки.
+    Для опроса это верхняя оценка. Выводится вместе с --wait-report
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        # режим (events/polling) -> счетчики
+        self._data = {}
+        # Браузеры, перешедшие на опрос из-за ошибок скрипта
+        self.fallbacks = 0
+
+    @staticmethod
+    def _empty():
+        return {"waits": 0, "immediate": 0, "rechecks": 0, "overshoot": 0.0, "max_overshoot": 0.0}
+
+    def record(self, mode, rechecks, overshoot):
+        """Записать одно выполненное ожидание"""
+        if not self.enabled:
+            return
+        with self._lock:
+            entry = self._data.setdefault(mode, self._empty())
+            entry["waits"] += 1
+            entry["rechecks"] += rechecks
+            if not rechecks:
+                entry["immediate"] += 1
+            entry["overshoot"] += overshoot
+            entry["max_overshoot"] = max(entry["max_overshoot"], overshoot)
+
+    def add_fallback(self):
+        with self._lock:
+            self.fallbacks += 1
+
+    def to_dict(self):
+        """Счетчики для передачи из воркера xdist"""
+        with self._lock:
+            return {"modes": {mode: dict(entry) for mode, entry in self._data.items()}, "fallbacks": self.fallbacks}
+
+    def merge(self, data):
+        """Добавить счетчики, полученные от воркера xdist"""
+        with self._lock:
+            for mode, values in data.get("modes", {}).items():
+                entry = self._data.setdefault(mode, self._empty())
+                for key, value in values.items():
+                    entry[key] = max(entry[key], value) if key == "max_overshoot" else entry[key] + value
+            self.fallbacks += data.get("fallbacks", 0)
+
+    def rows(self):
+        """Строки отчета: (режим, ожиданий, сразу, повторных проверок, среднее опоздание, максимум)"""
+        rows = []
+        for mode, entry in sorted(self._data.items()):
+            delayed = entry["waits"] - entry["immediate"]
+            mean = entry["overshoot"] / delayed if delayed else 0.0
+            rows.append((mode, entry["waits"], entry["immediate"], entry["rechecks"], mean, entry["max_overshoot"]))
+        return rows
+
+
+# Общие счетчики для всего запуска
+wait_engine_stats = WaitEngineStats()
+
+
+class WaitEngine:
+    """Ожидания одного браузера (общие для всех Page Objects этого браузера)"""
+
+    # Ждать изменений DOM через MutationObserver; False (--wait-engine=polling) - только опрос
+    use_events = True
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.events = self.use_events and hasattr(driver, "execute_async_script")
+        # Какую страницу и какое изменение DOM ожидание видело последним
+        self._token = None
+        self._seq = None
+        self._script_errors = 0
+
+    def until(self, condition, timeout):
+        """
+        Ждать, пока condition(driver) вернет истинное значение, и вернуть его
+        TimeoutException - если условие не выполнилось за timeout секунд
+        """
+        end = time.perf_counter() + timeout
+        poll_delay = POLL_START_SECONDS
+        rechecks = 0
+        # Когда условие могло стать истинным: конец последней неудачной проверки
+        # или момент изменения DOM, о котором сообщил скрипт
+        ready_since = None
+        last_error = None
+        while True:
+            checked_at = time.perf_counter()
+            try:
+                value = condition(self.driver)
+                if value:
+                    overshoot = checked_at - ready_since if ready_since is not None else 0.0
+                    wait_engine_stats.record("events" if self.events else "polling", rechecks, max(overshoot, 0.0))
+                    return value
+            except IGNORED_EXCEPTIONS as error:
+                last_error = error
+
+            now = time.perf_counter()
+            if now >= end:
+                raise TimeoutException(f"Условие не выполнено за {timeout} с") from last_error
+            rechecks += 1
+            ready_since = now
+
+            if self.events:
+                waited = self._wait_for_change(end - now)
+                if waited is not None:
+                    # Условие не могло выполниться раньше, чем изменился DOM
+                    ready_since += waited
+                    continue
+            time.sleep(min(poll_delay, end - now))
+            poll_delay = min(poll_delay * POLL_FACTOR, POLL_MAX_SECONDS)
+
+    def settle(self, timeout, quiet=QUIET_SECONDS):
+        """
+        Ждать стабильного состояния страницы: alert закрыт, запросов и анимаций нет,
+        DOM не менялся quiet секунд. После этого проверка отсутствия элемента
+        отвечает сразу, без ожидания полного таймаута
+        TimeoutException - если страница не стабилизировалась за timeout секунд
+        """
+        end = time.perf_counter() + timeout
+        poll_delay = POLL_START_SECONDS
+        while True:
+            try:
+                state = self.driver.execute_script(
+                    PAGE_STATE_SCRIPT, int(quiet * 1000), int(LATE_WATCHER_QUIET_SECONDS * 1000)
+                )
+            except UnexpectedAlertPresentException:
+                state = {"stable": False, "reason": "alert", "settle_in": 0}
+            if state["stable"]:
+                return
+
+            now = time.perf_counter()
+            if now >= end:
+                raise TimeoutException(f"Страница не стабилизировалась за {timeout} с: {state['reason']}")
+            if state["settle_in"]:
+                # Осталось только дождаться тишины в DOM (или конца окна после поздней установки
+                # наблюдателя) - изменение DOM начнет ожидание заново
+                time.sleep(min(state["settle_in"] / 1000, end - now))
+                continue
+            # Конец запроса и конец анимации будят скрипт ожидания, остальное проверяется опросом
+            if self.events and state["reason"] in ("requests", "animation"):
+                if self._wait_for_change(end - now) is not None:
+                    continue
+            time.sleep(min(poll_delay, end - now))
+            poll_delay = min(poll_delay * POLL_FACTOR, POLL_MAX_SECONDS)
+
+    def _wait_for_change(self, remaining):
+        """
+        Дождаться изменения DOM (но не дольше remaining)
+        Возвращает, сколько секунд браузер ждал до изменения, или None, если ждать
+        через скрипт не получилось и нужно подождать паузу опроса
+        """
+        timeout_ms = int(min(remaining, EVENT_SLICE_SECONDS) * 1000)
+        try:
+            result = self.driver.execute_async_script(WAIT_FOR_CHANGE_SCRIPT, self._token, self._seq, timeout_ms)
+        except UnexpectedAlertPresentException:
+            # Пока открыт alert, DOM не меняется и скрипты не выполняются
+            return None
+        except WebDriverException:
+            # Чаще всего - страница перезагрузилась во время скрипта
+            self._script_errors += 1
+            if self._script_errors >= MAX_SCRIPT_ERRORS:
+                self.events = False
+                wait_engine_stats.add_fallback()
+            return 0.0
+        self._script_errors = 0
+        if not result:
+            # Скрипт прерван (например, страница открыла alert) - проверяем условие сразу
+            return 0.0
+        self._token, self._seq = result["token"], result["seq"]
+        return result["waited"] / 1000
+
+
+def install_page_watcher(driver):
+    """
+    Поставить наблюдатель в каждую следующую страницу браузера до скриптов страницы
+    (preload-скрипт WebDriver BiDi; вызывать сразу после запуска браузера)
+    Возвращает False, если браузер не поддерживает preload-скрипты: тогда наблюдатель
+    ставится при первом ожидании на странице
+    """
+    if not driver.capabilities.get("webSocketUrl"):
+        return False
+    try:
+        driver.script.add_preload_script(f"() => {{ {WATCHER_SCRIPT} }}")
+    except WebDriverException:
+        return False
+    return True
+
+
+def wait_engine_for(driver):
+    """Движок ожиданий браузера (создается один раз на браузер)"""
+    engine = getattr(driver, "_wait_engine", None)
+    if engine is None:
+        engine = driver._wait_engine = WaitEngine(driver)
+    return engine
@@ -0,0 +1,54 @@
+import threading
+
+
+class WaitStats:
+    """
+    Учет времени, потраченного на ожидания в Page Objects
+    Включается параметром --wait-report
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        # имя метода -> [количество ожиданий, суммарное время, максимальное время]
+        self._data = {}
+
+    def record(self, name, seconds):
+        """Записать время одного ожидания"""
+        if not self.enabled:
+            return
+        with self._lock:
+            entry = self._data.setdefault(name, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def to_dict(self):
+        """Данные статистики для передачи из воркера xdist"""
+        with self._lock:
+            return {name: list(entry) for name, entry in self._data.items()}
+
+    def merge(self, data):
+        """Добавить статистику, полученную от воркера xdist"""
+        with self._lock:
+            for name, (count, total, maximum) in data.items():
+                entry = self._data.setdefault(name, [0, 0.0, 0.0])
+                entry[0] += count
+                entry[1] += total
+                entry[2] = max(entry[2], maximum)
+
+    def total(self):
+        """Суммарное время ожиданий за весь запуск"""
+        return sum(entry[1] for entry in self._data.values())
+
+    def rows(self):
+        """Строки отчета, отсортированные по суммарному времени"""
+        return sorted(
+            ((name, count, total, maximum) for name, (count, total, maximum) in self._data.items()),
+            key=lambda row: row[2],
+            reverse=True
+        )
+
+
+# Общий объект статистики для всего запуска
+wait_stats = WaitStats()